@@ -1,11 +1,12 @@
 #!/usr/bin/env bash
 # lib/monitor.sh
 # 此脚本通过 SSH 在远程执行
-# 参数: $1=系统服务列表, $2=用户服务列表
+# 参数: $1=系统服务列表, $2=用户服务列表, $3=OLED 状态端点 (可选)
 
 # 1. 接收参数
 SYS_SERVICES="${1:-}"
 USER_SERVICES="${2:-}"
+OLED_STATUS_URL="${3:-http://127.0.0.1:9099/status}"
 
 # 2. 关键修复：设置用户级服务所需的环境变量
 # SSH 非交互模式下通常缺少此变量，导致 systemctl --user 失败
@@ -93,4 +94,37 @@ for svc in $USER_SERVICES; do
     [[ -n "$svc" ]] && check_svc "$svc" "user"
 done
 
+# OLED 服务自身报告的状态（一次本地 HTTP 请求，不需要 fork pactl / 翻 journal）
+show_oled_status() {
+    local json
+    if ! command -v curl &> /dev/null; then
+        echo -e " ${Y}未安装 curl，跳过${NC}"
+        return
+    fi
+    if ! json=$(curl -s --max-time 2 "$OLED_STATUS_URL"); then
+        echo -e " ${R}状态端点无响应${NC} ($OLED_STATUS_URL)"
+        return
+    fi
+    python3 -c '
+import json, sys
+s = json.loads(sys.argv[1])
+if not s.get("ready"):
+    print(" 启动中，尚未发布状态"); sys.exit()
+p, ss, b = s["player"], s["screensaver"], s["backends"]
+flag = lambda v: "-" if v is None else ("OK" if v else "回退")
+screen = "已关闭" if ss["off"] else "已变暗" if ss["dimmed"] else "亮"
+print(" 音源:     %s%s" % (s["source"], " (暂停)" if p["is_paused"] else ""))
+print(" 画面:     %s / %s" % (p["top_text"], p["bottom_text"]))
+print(" 音量:     %s" % (s["volume"] if s["volume"] >= 0 else "N/A"))
+print(" 屏保:     %s (空闲 %.0fs)" % (screen, ss["idle_s"]))
+print(" 后端:     " + "  ".join("%s=%s" % (k, flag(b[k])) for k in ("lms_events", "bluez_dbus", "pactl_subscribe")))
+if b.get("lms_breaker_open"):
+    print(" LMS:      熔断中 (服务器不可达)")
+print(" 快照:     %ss 前" % s["age_s"])
+' "$json" 2>/dev/null || echo -e " ${R}无法解析状态${NC}"
+}
+
+echo -e "\n${Y}=== 🖥️  OLED 状态 ===${NC}"
+show_oled_status
+
 echo ""
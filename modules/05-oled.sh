@@ -49,7 +49,7 @@ fi
 
 # 安装/升级 Python 库
 # [修复] 添加空格
-sudo -u "$USER_NAME" "$VENV_DIR/bin/pip" install --upgrade pip luma.oled requests >/dev/null 2>&1 || \
+sudo -u "$USER_NAME" "$VENV_DIR/bin/pip" install --upgrade pip luma.oled requests jeepney >/dev/null 2>&1 || \
     error "Python 库安装失败"
 
 # ============================================
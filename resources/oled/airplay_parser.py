@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# resources/oled/airplay_parser.py
+#
+# shairport-sync 元数据管道的增量字节解析器
+#
+# 管道格式（每个 item 一段 XML 风格文本）:
+#   <item><type>636f7265</type><code>6d696e6d</code><length>5</length>
+#   <data encoding="base64">
+#   SGVsbG8=</data></item>
+#
+# 解析器直接处理 bytearray，只解码关心的 code，其余 item 在流中跳过、不缓存；
+# 单个 item 超过上限时丢弃并重新同步，内存占用有硬上限。PICT 封面默认不解析，
+# 启用封面时加入 codes 并通过 item_limits 单独放宽它的大小上限。
+
+import binascii
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 关心的 code (十六进制 ASCII) -> 名称
+CODE_TITLE = b"6d696e6d"     # minm
+CODE_ARTIST = b"61736172"    # asar
+CODE_VOLUME = b"70766f6c"    # pvol
+CODE_PROGRESS = b"70726772"  # prgr
+CODE_PICTURE = b"50494354"   # PICT (封面图片，JPEG/PNG)
+
+DEFAULT_CODES = {
+    CODE_TITLE: "minm",
+    CODE_ARTIST: "asar",
+    CODE_VOLUME: "pvol",
+    CODE_PROGRESS: "prgr",
+}
+
+ITEM_START = b"<item>"
+ITEM_END = b"</item>"
+LENGTH_END = b"</length>"
+DATA_START = b'<data encoding="base64">'
+DATA_END = b"</data>"
+
+# item 头部（type/code/length）的最大长度，超过视为流损坏
+HEADER_MAX = 256
+
+_SEEK, _HEADER, _COLLECT, _SKIP = range(4)
+
+
+def _between(buf, start_tag, end_tag):
+    i = buf.find(start_tag)
+    if i < 0:
+        return None
+    i += len(start_tag)
+    j = buf.find(end_tag, i)
+    if j < 0:
+        return None
+    return buf[i:j]
+
+
+class AirplayMetadataParser:
+    """
+    增量解析器：feed() 接收任意切分的字节块，返回已完成的 (name, payload) 列表
+
+    内存上限约为 max(max_item_bytes, item_limits) + 单次 feed 的数据量。
+    """
+
+    def __init__(self, codes=None, max_item_bytes=16 * 1024, item_limits=None):
+        self.codes = dict(DEFAULT_CODES if codes is None else codes)
+        self.max_item_bytes = max_item_bytes
+        self.item_limits = dict(item_limits or {})   # name -> 该 item 的字节上限
+
+        self._buf = bytearray()
+        self._state = _SEEK
+        self._scan_from = 0      # 已扫描过的位置，避免重复查找
+        self._item_name = None
+
+        # 统计
+        self.items_decoded = 0
+        self.items_skipped = 0
+        self.items_dropped = 0
+        self.bytes_fed = 0
+        self.peak_buffer = 0
+
+    def reset(self):
+        self._buf.clear()
+        self._state = _SEEK
+        self._scan_from = 0
+        self._item_name = None
+
+    def feed(self, data):
+        """
+        输入一段管道数据
+
+        Returns:
+            list: [(name, payload_bytes), ...]，name 为 minm/asar/pvol/prgr/PICT 等
+        """
+        self.bytes_fed += len(data)
+        buf = self._buf
+        buf += data
+        if len(buf) > self.peak_buffer:
+            self.peak_buffer = len(buf)
+
+        out = []
+        while True:
+            if self._state == _SEEK:
+                i = buf.find(ITEM_START, self._scan_from)
+                if i < 0:
+                    # 只保留可能是半个 <item> 的尾部
+                    self._discard(len(buf) - (len(ITEM_START) - 1))
+                    break
+                del buf[:i + len(ITEM_START)]
+                self._scan_from = 0
+                self._state = _HEADER
+
+            elif self._state == _HEADER:
+                j = buf.find(LENGTH_END)
+                if j < 0:
+                    if len(buf) > HEADER_MAX:
+                        logger.debug("AirPlay 元数据头部损坏，重新同步")
+                        self.items_dropped += 1
+                        self._state = _SEEK
+                        continue
+                    break
+                header = bytes(buf[:j])
+                code = _between(header, b"<code>", b"</code>")
+                name = self.codes.get(code) if code is not None else None
+                if name is None:
+                    self.items_skipped += 1
+                    self._state = _SKIP
+                else:
+                    self._item_name = name
+                    self._state = _COLLECT
+                del buf[:j + len(LENGTH_END)]
+                self._scan_from = 0
+
+            elif self._state == _COLLECT:
+                k = buf.find(ITEM_END, self._scan_from)
+                if k < 0:
+                    limit = self.item_limits.get(self._item_name, self.max_item_bytes)
+                    if len(buf) > limit:
+                        logger.debug(f"AirPlay 元数据 item 超过上限 ({self._item_name})，丢弃")
+                        self.items_dropped += 1
+                        self._state = _SKIP
+                        self._scan_from = 0
+                        continue
+                    self._scan_from = max(0, len(buf) - (len(ITEM_END) - 1))
+                    break
+                payload = self._decode(buf, k)
+                if payload is not None:
+                    out.append((self._item_name, payload))
+                    self.items_decoded += 1
+                del buf[:k + len(ITEM_END)]
+                self._scan_from = 0
+                self._state = _SEEK
+
+            else:  # _SKIP
+                k = buf.find(ITEM_END, self._scan_from)
+                if k < 0:
+                    self._discard(len(buf) - (len(ITEM_END) - 1))
+                    break
+                del buf[:k + len(ITEM_END)]
+                self._scan_from = 0
+                self._state = _SEEK
+
+        return out
+
+    def _discard(self, n):
+        """丢弃缓冲区前 n 字节（跳过不关心的数据）"""
+        if n > 0:
+            del self._buf[:n]
+        self._scan_from = 0
+
+    @staticmethod
+    def _decode(buf, end):
+        """解码 buf[:end] 中 <data> 段的 base64 内容（只在 item 范围内查找）"""
+        i = buf.find(DATA_START, 0, end)
+        if i < 0:
+            # length=0 的 item 没有 data 段
+            return b""
+        i += len(DATA_START)
+        j = buf.find(DATA_END, i, end)
+        if j < 0:
+            return None
+        try:
+            return binascii.a2b_base64(buf[i:j])
+        except binascii.Error:
+            return None
+
+
+# ============================================
+# 值解码
+# ============================================
+def decode_text(payload):
+    return payload.decode("utf-8", errors="ignore")
+
+
+def pvol_to_percent(payload):
+    """
+    pvol: "airplay_volume,volume,lowest,highest" (dB)
+
+    Returns:
+        int: 0-100，无法解析时返回 None
+    """
+    try:
+        parts = payload.decode("utf-8", errors="ignore").split(",")
+        curr_db = float(parts[0])
+        min_db = -30.0
+        max_db = 0.0
+        if len(parts) >= 4:
+            max_db = float(parts[3])
+    except (ValueError, IndexError):
+        return None
+
+    if curr_db < -100:
+        return 0
+    if curr_db >= max_db:
+        return 100
+    if curr_db <= min_db:
+        return 0
+    pct = (curr_db - min_db) / (max_db - min_db) * 100
+    return int(max(0, min(100, pct)))
+
+
+def prgr_to_seconds(payload, sample_rate=44100):
+    """
+    prgr: "start/current/end" (RTP 时间戳)
+
+    Returns:
+        tuple: (position_s, duration_s)，无法解析时返回 None
+    """
+    try:
+        start, current, end = (int(x) for x in payload.decode("ascii").split("/"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    # RTP 时间戳为 32 位，可能回绕
+    position = ((current - start) & 0xFFFFFFFF) / sample_rate
+    duration = ((end - start) & 0xFFFFFFFF) / sample_rate
+    return position, duration
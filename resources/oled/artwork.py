@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# resources/oled/artwork.py
+#
+# 专辑封面：后台解码 + 磁盘 1-bit 缩略图缓存
+#
+# 封面来源有两种：AirPlay 管道中的 PICT（原始 JPEG/PNG 字节）和 LMS 的
+# /music/<coverid>/cover。解码、缩放、抖动为 1-bit 都在单个后台线程中完成，
+# 结果以 PBM 文件保存在缓存目录，文件名为 (来源 key, 尺寸) 的哈希：
+# AirPlay 的 key 是图片内容的 SHA-1，LMS 的 coverid 本身就是服务器按封面内容生成的 ID，
+# 因此重复播放和同专辑曲目直接命中缓存。缓存目录按总大小做 LRU（mtime）淘汰。
+#
+# get() 从不阻塞：命中内存缓存直接返回图像，否则排队给后台线程并返回 None，
+# 处理完成后调用 on_ready（通常为 wakeup.notify）让主循环重新取用。
+
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from PIL import Image, ImageOps
+
+import metrics
+import wakeup
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".pbm"
+# 内存中保留的缩略图数量（每张只有几十字节）
+MEMORY_ITEMS = 32
+# 记住的失败 key 数量上限
+FAILED_ITEMS = 256
+# 失败的 key 多久之后允许重试（秒）：LMS 重启、网络超时等临时错误不会让封面一直空白
+FAILED_RETRY = 300.0
+# 下载 LMS 封面的超时（秒）
+FETCH_TIMEOUT = 3.0
+
+
+def content_key(data):
+    """按图片内容生成缓存 key（用于 AirPlay PICT）"""
+    return "sha1:" + hashlib.sha1(data).hexdigest()
+
+
+def to_thumbnail(data, size):
+    """
+    将 JPEG/PNG 字节解码为 size x size 的 1-bit 缩略图（居中裁剪 + Floyd-Steinberg 抖动）
+
+    JPEG 通过 draft() 在解码阶段直接按 1/2~1/8 缩小，大尺寸封面的耗时主要省在这里。
+    """
+    image = Image.open(io.BytesIO(data))
+    image.draft("L", (size * 2, size * 2))
+    image = image.convert("L")
+    image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    image = ImageOps.autocontrast(image)
+    return image.convert("1")
+
+
+class ArtworkStore:
+    """封面缩略图的内存 + 磁盘缓存，以及处理它们的后台线程"""
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024, size=16, on_ready=wakeup.notify):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.size = size
+        self.on_ready = on_ready
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # key -> Image
+        self._pending = set()
+        self._failed = OrderedDict()    # key -> 失败时刻 (time.monotonic)
+        self._jobs = queue.Queue()
+        self._disk_bytes = None         # 首次写入时扫描目录
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="artwork", daemon=True)
+        self._thread.start()
+
+    def get(self, key, source=None):
+        """
+        取缩略图（不阻塞）
+
+        Args:
+            key: 缓存 key（content_key() 或 "lms:<coverid>"）
+            source: 未命中时的数据来源：图片字节或下载 URL；None 表示只查磁盘缓存
+
+        Returns:
+            Image: 1-bit 缩略图；尚未就绪或无法获取时返回 None
+        """
+        if not key:
+            return None
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                return image
+            if key in self._pending:
+                return None
+            failed_at = self._failed.get(key)
+            if failed_at is not None:
+                if time.monotonic() - failed_at < FAILED_RETRY:
+                    return None
+                del self._failed[key]
+            self._pending.add(key)
+        self._jobs.put((key, source))
+        return None
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "memory_items": len(self._memory),
+                "pending": len(self._pending),
+                "failed": len(self._failed),
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # -------------------------------
+    # 后台线程
+    # -------------------------------
+    def _run(self):
+        while True:
+            key, source = self._jobs.get()
+            failed = False
+            try:
+                image = self._load(key, source)
+            except Exception as e:
+                logger.debug(f"封面处理失败 ({key}): {e}")
+                metrics.inc("artwork.errors")
+                image = None
+                failed = True
+            with self._lock:
+                self._pending.discard(key)
+                if failed:
+                    # FAILED_RETRY 秒内不再重复尝试；内容不同的封面 key 也不同
+                    self._failed[key] = time.monotonic()
+                    self._failed.move_to_end(key)
+                    while len(self._failed) > FAILED_ITEMS:
+                        self._failed.popitem(last=False)
+                    continue
+                if image is None:
+                    # 没有数据来源且磁盘缓存已淘汰：不算失败，有来源时再取
+                    continue
+                self._memory[key] = image
+                while len(self._memory) > MEMORY_ITEMS:
+                    self._memory.popitem(last=False)
+            if self.on_ready:
+                self.on_ready()
+
+    def _path(self, key):
+        name = hashlib.sha1(f"{key}@{self.size}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + CACHE_SUFFIX)
+
+    def _load(self, key, source):
+        """磁盘缓存 -> 来源解码；磁盘未命中且没有来源时返回 None，解码 / 下载失败时抛出异常"""
+        path = self._path(key)
+        try:
+            with Image.open(path) as cached:
+                image = cached.convert("1")
+            os.utime(path)
+            metrics.inc("artwork.disk_hits")
+            return image
+        except FileNotFoundError:
+            pass
+
+        if source is None:
+            return None
+        if isinstance(source, str):
+            with metrics.timed("artwork.fetch"):
+                response = requests.get(source, timeout=FETCH_TIMEOUT)
+                response.raise_for_status()
+                source = response.content
+
+        with metrics.timed("artwork.decode"):
+            image = to_thumbnail(source, self.size)
+        self._store(path, image)
+        return image
+
+    def _store(self, path, image):
+        tmp = path + ".tmp"
+        image.save(tmp, format="PPM")
+        os.replace(tmp, path)
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._scan())
+        else:
+            self._disk_bytes += os.path.getsize(path)
+        if self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _scan(self):
+        """返回缓存目录中的 [(path, size, mtime), ...]"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    st = entry.stat()
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self):
+        """按 mtime 从旧到新删除，直到总大小降到上限的 90%"""
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._disk_bytes = total
+        metrics.inc("artwork.evicted", removed)
+        logger.debug(f"封面缓存淘汰 {removed} 个文件，当前 {total} 字节")
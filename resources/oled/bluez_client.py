@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+# resources/oled/bluez_client.py
+#
+# 进程内 BlueZ D-Bus 客户端（基于 jeepney，纯 Python）
+# 保持一条总线长连接：启动时 GetManagedObjects 一次，之后通过
+# PropertiesChanged / InterfacesAdded / InterfacesRemoved 信号增量更新本地缓存，
+# 蓝牙曲目、状态、音量查询直接读缓存，不再 fork dbus-send。
+#
+# BluezIndex 记录 adapter / device / transport / player 的对象路径，
+# 客户端按信号增量维护；dbus-send 回退路径也用它，只查询已知路径。
+
+import logging
+import re
+import threading
+from collections import deque
+
+import metrics
+
+try:
+    from jeepney import DBusAddress, HeaderFields, MatchRule, MessageType, new_method_call
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+    HAS_JEEPNEY = True
+except ImportError:
+    HAS_JEEPNEY = False
+
+logger = logging.getLogger(__name__)
+
+BLUEZ_SERVICE = "org.bluez"
+BLUEZ_ROOT = "/org/bluez"
+IFACE_PROPERTIES = "org.freedesktop.DBus.Properties"
+IFACE_OBJECT_MANAGER = "org.freedesktop.DBus.ObjectManager"
+IFACE_ADAPTER = "org.bluez.Adapter1"
+IFACE_DEVICE = "org.bluez.Device1"
+IFACE_PLAYER = "org.bluez.MediaPlayer1"
+IFACE_TRANSPORT = "org.bluez.MediaTransport1"
+
+BT_VOLUME_MAX = 127  # Bluetooth A2DP volume range: 0-127
+CALL_TIMEOUT = 2.0
+
+
+def volume_to_percent(raw):
+    """A2DP 音量 (0-127) 转换为百分比"""
+    return int((int(raw) / BT_VOLUME_MAX) * 100)
+
+
+# ============================================
+# 变体解包
+# ============================================
+def _unwrap_variant(variant):
+    """jeepney 的变体为 (signature, value) 元组，递归解包 a{sv}"""
+    sig, value = variant
+    if sig == "v":
+        return _unwrap_variant(value)
+    if sig == "a{sv}":
+        return unwrap_props(value)
+    return value
+
+
+def unwrap_props(props):
+    """a{sv} 字典 -> 普通字典"""
+    return {k: _unwrap_variant(v) for k, v in props.items()}
+
+
+# ============================================
+# 对象路径索引
+# ============================================
+# 索引的接口 -> 名称
+INDEXED_INTERFACES = {
+    IFACE_ADAPTER: "adapters",
+    IFACE_DEVICE: "devices",
+    IFACE_TRANSPORT: "transports",
+    IFACE_PLAYER: "players",
+}
+
+_OBJECT_PATH_RE = re.compile(r'^\s*object path "([^"]+)"\s*$')
+_INTERFACE_RE = re.compile(r'^\s*string "(org\.[\w.]+)"\s*$')
+
+
+def parse_managed_objects_text(output):
+    """
+    解析 `dbus-send --print-reply ... GetManagedObjects` 的文本输出
+
+    接口名总是单独一行的 string "org.xxx"（属性值前面带 variant），据此归属到上一个对象路径。
+
+    Returns:
+        dict: {path: set(interfaces)}
+    """
+    objects = {}
+    path = None
+    for line in output.splitlines():
+        m = _OBJECT_PATH_RE.match(line)
+        if m:
+            path = m.group(1)
+            objects.setdefault(path, set())
+            continue
+        if path is not None:
+            m = _INTERFACE_RE.match(line)
+            if m:
+                objects[path].add(m.group(1))
+    return objects
+
+
+class BluezIndex:
+    """BlueZ 对象路径索引（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = {iface: set() for iface in INDEXED_INTERFACES}
+
+    def replace(self, objects):
+        """用完整对象表重建索引，objects: {path: interfaces}"""
+        paths = {iface: set() for iface in INDEXED_INTERFACES}
+        for path, ifaces in objects.items():
+            for iface in ifaces:
+                if iface in paths:
+                    paths[iface].add(path)
+        with self._lock:
+            self._paths = paths
+
+    def add(self, path, ifaces):
+        with self._lock:
+            for iface in ifaces:
+                if iface in self._paths:
+                    self._paths[iface].add(path)
+
+    def remove(self, path, ifaces=None):
+        with self._lock:
+            for iface, paths in self._paths.items():
+                if ifaces is None or iface in ifaces:
+                    paths.discard(path)
+
+    def clear(self):
+        self.replace({})
+
+    def paths(self, iface):
+        with self._lock:
+            return sorted(self._paths.get(iface, ()))
+
+    @property
+    def adapters(self):
+        return self.paths(IFACE_ADAPTER)
+
+    @property
+    def devices(self):
+        return self.paths(IFACE_DEVICE)
+
+    @property
+    def transports(self):
+        return self.paths(IFACE_TRANSPORT)
+
+    @property
+    def players(self):
+        return self.paths(IFACE_PLAYER)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: sorted(self._paths[iface]) for iface, name in INDEXED_INTERFACES.items()}
+
+
+# ============================================
+# 客户端
+# ============================================
+class BluezClient:
+    """BlueZ 对象缓存（后台线程维护，读取线程安全）"""
+
+    def __init__(self, bus="SYSTEM", service=BLUEZ_SERVICE, on_change=None, on_volume=None,
+                 retry_interval=10.0):
+        if not HAS_JEEPNEY:
+            raise RuntimeError("jeepney 未安装，无法使用进程内 D-Bus 客户端")
+        self.bus = bus.upper()
+        self.service = service
+        self.on_change = on_change
+        self.on_volume = on_volume      # on_volume(percent)：MediaTransport1.Volume 变化时立即调用
+        self.retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._objects = {}          # path -> {interface: {prop: value}}
+        self.index = BluezIndex()
+        self._ready = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bluez-dbus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+
+    # -------------------------------
+    # 缓存查询
+    # -------------------------------
+    def get_volume(self):
+        """返回第一个带 Volume 的 A2DP transport 的音量百分比，没有则 -1"""
+        with self._lock:
+            for path in self.index.transports:
+                props = self._objects.get(path, {}).get(IFACE_TRANSPORT)
+                if props and "Volume" in props:
+                    return volume_to_percent(props["Volume"])
+        return -1
+
+    def get_metadata(self):
+        """返回 (Artist, Title, Status)，优先选择正在播放的 MediaPlayer1"""
+        with self._lock:
+            players = [
+                self._objects[path][IFACE_PLAYER]
+                for path in self.index.players
+                if IFACE_PLAYER in self._objects.get(path, {})
+            ]
+        if not players:
+            return "", "", "unknown"
+
+        player = next(
+            (p for p in players if str(p.get("Status", "")).lower() == "playing"),
+            players[0]
+        )
+        track = player.get("Track") or {}
+        status = str(player.get("Status", "")).lower()
+        if status not in ("playing", "paused", "stopped"):
+            status = "unknown"
+        return track.get("Artist", ""), track.get("Title", ""), status
+
+    def get_objects(self):
+        """返回缓存对象的浅拷贝（调试用）"""
+        with self._lock:
+            return {path: dict(ifaces) for path, ifaces in self._objects.items()}
+
+    # -------------------------------
+    # 后台线程
+    # -------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._session()
+            except Exception as e:
+                logger.warning(f"BlueZ D-Bus 连接异常: {e}")
+            self._set_ready(False)
+            self._stop.wait(self.retry_interval)
+
+    def _session(self):
+        conn = open_dbus_connection(bus=self.bus)
+        try:
+            owner_rule = MatchRule(type="signal", sender="org.freedesktop.DBus",
+                                   interface="org.freedesktop.DBus", member="NameOwnerChanged")
+            owner_rule.add_arg_condition(0, self.service)
+            rules = [
+                MatchRule(type="signal", sender=self.service, interface=IFACE_PROPERTIES,
+                          member="PropertiesChanged", path_namespace=BLUEZ_ROOT),
+                MatchRule(type="signal", sender=self.service, interface=IFACE_OBJECT_MANAGER),
+                owner_rule,
+            ]
+            for rule in rules:
+                conn.send_and_get_reply(message_bus.AddMatch(rule), timeout=CALL_TIMEOUT)
+
+            signals = deque(maxlen=4096)
+            with conn.filter(MatchRule(type="signal"), queue=signals):
+                self._load_objects(conn)
+                while not self._stop.is_set():
+                    try:
+                        msg = conn.recv_until_filtered(signals, timeout=1.0)
+                    except TimeoutError:
+                        continue
+                    self._dispatch(conn, msg)
+        finally:
+            conn.close()
+
+    @metrics.timed("bluez.call")
+    def _call(self, conn, path, interface, member, signature=None, body=()):
+        addr = DBusAddress(path, bus_name=self.service, interface=interface)
+        reply = conn.send_and_get_reply(
+            new_method_call(addr, member, signature, body), timeout=CALL_TIMEOUT
+        )
+        if reply.header.message_type == MessageType.error:
+            raise RuntimeError(f"{member} {path}: {reply.body}")
+        return reply.body
+
+    def _load_objects(self, conn):
+        try:
+            (managed,) = self._call(conn, "/", IFACE_OBJECT_MANAGER, "GetManagedObjects")
+        except RuntimeError as e:
+            # BlueZ 未运行：等待 NameOwnerChanged
+            logger.info(f"BlueZ 暂不可用: {e}")
+            with self._lock:
+                self._objects = {}
+                self.index.clear()
+            self._set_ready(True)
+            return
+
+        objects = {
+            path: {iface: unwrap_props(props) for iface, props in ifaces.items()}
+            for path, ifaces in managed.items()
+        }
+        with self._lock:
+            self._objects = objects
+            self.index.replace(objects)
+        self._set_ready(True)
+        logger.info(f"BlueZ 对象已加载: {len(objects)} 个")
+        self._notify()
+
+    def _dispatch(self, conn, msg):
+        fields = msg.header.fields
+        member = fields.get(HeaderFields.member)
+        path = fields.get(HeaderFields.path)
+
+        if member == "PropertiesChanged":
+            iface, changed, invalidated = msg.body
+            changed = unwrap_props(changed)
+            if invalidated:
+                try:
+                    (props,) = self._call(conn, path, IFACE_PROPERTIES, "GetAll", "s", (iface,))
+                    changed.update(unwrap_props(props))
+                except Exception as e:
+                    logger.debug(f"GetAll 失败: {path} {iface}: {e}")
+            with self._lock:
+                obj = self._objects.setdefault(path, {})
+                props = obj.setdefault(iface, {})
+                self.index.add(path, (iface,))
+                for name in invalidated:
+                    props.pop(name, None)
+                props.update(changed)
+            if iface == IFACE_TRANSPORT and "Volume" in changed and self.on_volume:
+                try:
+                    self.on_volume(volume_to_percent(changed["Volume"]))
+                except Exception as e:
+                    logger.warning(f"BlueZ 音量回调失败: {e}")
+            if iface in (IFACE_PLAYER, IFACE_TRANSPORT):
+                self._notify()
+
+        elif member == "InterfacesAdded":
+            obj_path, ifaces = msg.body
+            with self._lock:
+                obj = self._objects.setdefault(obj_path, {})
+                for iface, props in ifaces.items():
+                    obj[iface] = unwrap_props(props)
+                self.index.add(obj_path, ifaces)
+            self._notify()
+
+        elif member == "InterfacesRemoved":
+            obj_path, ifaces = msg.body
+            with self._lock:
+                obj = self._objects.get(obj_path, {})
+                for iface in ifaces:
+                    obj.pop(iface, None)
+                self.index.remove(obj_path, ifaces)
+                if not obj:
+                    self._objects.pop(obj_path, None)
+            self._notify()
+
+        elif member == "NameOwnerChanged":
+            name, _old, new = msg.body
+            if name != self.service:
+                return
+            if new:
+                logger.info("BlueZ 服务已(重新)启动，重新加载对象")
+                self._load_objects(conn)
+            else:
+                logger.info("BlueZ 服务已退出，清空缓存")
+                with self._lock:
+                    self._objects = {}
+                    self.index.clear()
+                self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"BlueZ 变化回调失败: {e}")
+
+    def _set_ready(self, value):
+        if value != self._ready:
+            self._ready = value
+            logger.info(f"BlueZ D-Bus 缓存{'就绪' if value else '不可用，回退到 dbus-send'}")
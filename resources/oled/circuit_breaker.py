@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# resources/oled/circuit_breaker.py
+#
+# 后端熔断器
+#
+# 连续失败达到阈值后熔断器打开：调用方直接得到"不可达"，不再在超时和重试上耗费时间；
+# 后台线程以指数退避 + 随机抖动探测后端，第一次探测成功即关闭熔断器并通知调用方。
+# 状态变化写入日志，并通过 metrics 仪表 <name>.breaker.open 和相关计数器暴露。
+
+import logging
+import random
+import threading
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """closed（正常）/ open（熔断，后台探测中）两态熔断器"""
+
+    def __init__(self, name, probe, failure_threshold=3,
+                 backoff_min=1.0, backoff_max=60.0, on_close=None):
+        """
+        Args:
+            name: 指标和日志中使用的后端名称
+            probe: 探测函数，成功时正常返回，失败时抛出异常
+            failure_threshold: 连续失败多少次后打开
+            on_close: 熔断器关闭（后端恢复）时的回调
+        """
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.on_close = on_close
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open = False
+        self._stop = threading.Event()
+        self._thread = None
+        metrics.set_gauge(f"{name}.breaker.open", 0)
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def allow(self):
+        """是否允许发起真实请求（熔断时返回 False，并计入 rejected）"""
+        if self._open:
+            metrics.inc(f"{self.name}.breaker.rejected")
+            return False
+        return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._open or self._failures < self.failure_threshold:
+                return
+            self._open = True
+            failures = self._failures
+        logger.warning(f"{self.name} 熔断器打开：连续 {failures} 次失败，后台探测恢复")
+        metrics.inc(f"{self.name}.breaker.opened")
+        metrics.set_gauge(f"{self.name}.breaker.open", 1)
+        self._thread = threading.Thread(
+            target=self._probe_loop, name=f"{self.name}-breaker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _probe_loop(self):
+        attempt = 0
+        while not self._stop.is_set():
+            delay = min(self.backoff_max, self.backoff_min * (2 ** attempt))
+            # 抖动：在 [delay/2, delay] 内随机，避免多台设备同时重连
+            if self._stop.wait(delay * random.uniform(0.5, 1.0)):
+                return
+            attempt += 1
+            try:
+                self.probe()
+            except Exception as e:
+                metrics.inc(f"{self.name}.breaker.probe_failures")
+                logger.debug(f"{self.name} 探测失败 (第 {attempt} 次): {e}")
+                continue
+            self._close(attempt)
+            return
+
+    def _close(self, attempts):
+        with self._lock:
+            self._open = False
+            self._failures = 0
+        logger.info(f"{self.name} 已恢复，熔断器关闭 (探测 {attempts} 次)")
+        metrics.set_gauge(f"{self.name}.breaker.open", 0)
+        if self.on_close:
+            try:
+                self.on_close()
+            except Exception as e:
+                logger.warning(f"{self.name} 熔断器关闭回调失败: {e}")
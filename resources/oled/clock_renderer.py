@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# resources/oled/clock_renderer.py
+#
+# 时钟数字精灵渲染器
+#
+# 每种字体（文件 + 字号）只把数字和分隔符光栅化一次，时间串按固定宽度的格子排版：
+# 所有数字格宽度相同，秒数跳动时版面不会左右抖动。每次更新只清除并重绘
+# 字符发生变化的格子，配合脏页帧缓冲，大多数秒只需发送一两个字符的列。
+
+from text_cache import render_text
+
+# 预渲染的字符集
+CLOCK_CHARS = "0123456789:-/. "
+
+
+class ClockRenderer:
+    """把 HH:MM:SS 之类的时间串按格子绘制到目标帧的一条横带上"""
+
+    def __init__(self, font, width, y):
+        self.font = font
+        self.width = width
+        self.y = y
+
+        self._sprites = {}
+        self._advance = {}
+        for ch in CLOCK_CHARS:
+            self._add_sprite(ch)
+        self.digit_width = max(self._advance[d] for d in "0123456789")
+        self.height = max(s.bbox[3] for s in self._sprites.values())
+
+        self._layout = None     # [(x, cell_width), ...]
+        self._pattern = None    # 每格的类型（数字格或具体分隔符）
+        self._cells = None      # 当前已绘制的字符
+
+        # 统计
+        self.cells_drawn = 0
+        self.full_redraws = 0
+
+    def reset(self):
+        """目标帧被重建时调用，下一次 draw 重绘所有格子"""
+        self._cells = None
+
+    def draw(self, frame, text):
+        """
+        把 text 绘制到 frame 上，只重绘变化的格子
+
+        Returns:
+            int: 本次重绘的格子数
+        """
+        pattern = tuple("0" if ch.isdigit() else ch for ch in text)
+        if pattern != self._pattern:
+            self._pattern = pattern
+            self._layout = self._build_layout(pattern)
+            self._cells = None
+
+        if self._cells is None:
+            # 版面变化或首次绘制：清空整条横带
+            frame.paste(0, (0, self.y, self.width, self.y + self.height))
+            self._cells = [None] * len(text)
+            self.full_redraws += 1
+
+        drawn = 0
+        for i, ch in enumerate(text):
+            if self._cells[i] == ch:
+                continue
+            x, cell_w = self._layout[i]
+            frame.paste(0, (max(0, x), self.y, min(self.width, x + cell_w), self.y + self.height))
+            sprite = self._sprite(ch)
+            sprite.paste_into(frame, (x + (cell_w - self._advance[ch]) // 2, self.y))
+            self._cells[i] = ch
+            drawn += 1
+
+        self.cells_drawn += drawn
+        return drawn
+
+    def _add_sprite(self, ch):
+        self._sprites[ch] = render_text(ch, self.font)
+        self._advance[ch] = int(round(self.font.getlength(ch)))
+
+    def _sprite(self, ch):
+        # 不在预渲染字符集中的字符（极少出现）按需补充
+        if ch not in self._sprites:
+            self._add_sprite(ch)
+        return self._sprites[ch]
+
+    def _cell_width(self, kind):
+        if kind == "0":
+            return self.digit_width
+        self._sprite(kind)
+        return self._advance[kind]
+
+    def _build_layout(self, pattern):
+        widths = [self._cell_width(kind) for kind in pattern]
+        x = (self.width - sum(widths)) // 2
+        layout = []
+        for w in widths:
+            layout.append((x, w))
+            x += w
+        return layout
@@ -8,6 +8,28 @@ import logging
 # 动态获取当前脚本所在的绝对路径
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(BASE_DIR, "oled.ini")
+# 旧版滚动循环每帧整屏发送的耗时（128x64 @ 400kHz I2C，约 25ms），换算旧速度配置时计入
+LEGACY_FRAME_COST = 0.025
+
+def _get_scroll_pps(config, key, legacy_key, scroll_step, fallback):
+    """
+    读取滚动速度 (像素/秒)
+
+    旧版配置的 scroll_speed_* 为每帧发送后的等待秒数（每帧移动 scroll_step 像素），
+    未配置新键时换算为 scroll_step / (等待 + 整屏发送耗时)，并提示改用新键。
+    """
+    if not config.has_option("DISPLAY", legacy_key):
+        return config.getfloat("DISPLAY", key, fallback=fallback)
+    if config.has_option("DISPLAY", key):
+        logging.warning(f"[DISPLAY] {legacy_key} 已废弃，已被 {key} 取代并忽略")
+        return config.getfloat("DISPLAY", key)
+    interval = config.getfloat("DISPLAY", legacy_key)
+    if interval <= 0:
+        logging.warning(f"[DISPLAY] {legacy_key} = {interval} 无效，使用默认 {key} = {fallback}")
+        return fallback
+    pps = round(scroll_step / (interval + LEGACY_FRAME_COST), 1)
+    logging.warning(f"[DISPLAY] {legacy_key} 已废弃：{interval}s/帧 按步进 {scroll_step} 换算为 {key} = {pps}，请改用 {key}")
+    return pps
 
 def load_config():
     """
@@ -21,7 +43,8 @@ def load_config():
             "display": {...},
             "screensaver": {...},
             "volume": {...},
-            "airplay": {...}
+            "airplay": {...},
+            "bluetooth": {...}
         }
     """
     
@@ -46,6 +69,8 @@ def load_config():
         host_ip = config.get("SERVER", "HOST_IP")
         host_port = config.get("SERVER", "HOST_Port")
         player_id = config.get("SERVER", "PLAYER_ID")
+        cli_port = config.getint("SERVER", "CLI_PORT", fallback=9090)
+        lms_events = config.getboolean("SERVER", "LMS_EVENTS", fallback=True)
             
         # ============================================
         # 2. OLED 硬件配置
@@ -78,9 +103,19 @@ def load_config():
         font_large_size = config.getint("DISPLAY", "font_large_size", fallback=22)
         default_brightness = config.getint("DISPLAY", "default_brightness", fallback=255)
         dim_brightness = config.getint("DISPLAY", "dim_brightness", fallback=8)
+        # 滚动速度单位为 像素/秒；scroll_step 为最小步进，实际步进由帧调度器按总线吞吐自动调整
         scroll_step = config.getint("DISPLAY", "scroll_step", fallback=2)
-        scroll_speed_playing = config.getfloat("DISPLAY", "scroll_speed_playing", fallback=0.004)
-        scroll_speed_static = config.getfloat("DISPLAY", "scroll_speed_static", fallback=0.02)
+        scroll_pps_playing = _get_scroll_pps(config, "scroll_pps_playing", "scroll_speed_playing", scroll_step, 60.0)
+        scroll_pps_static = _get_scroll_pps(config, "scroll_pps_static", "scroll_speed_static", scroll_step, 40.0)
+        scroll_max_fps = config.getfloat("DISPLAY", "scroll_max_fps", fallback=60.0)
+        text_cache_kb = config.getint("DISPLAY", "text_cache_kb", fallback=256)
+        # 每帧画面导出到共享内存文件，供 test/preview_frame.py 等读取 (留空关闭)
+        frame_export_path = config.get("DISPLAY", "frame_export_path", fallback="/dev/shm/oled-frame")
+        # 字形图集：按字号预光栅化的字形保存在 glyph_atlas_dir，启动时内存映射
+        glyph_atlas = config.getboolean("DISPLAY", "glyph_atlas", fallback=True)
+        glyph_atlas_dir = os.path.expanduser(
+            config.get("DISPLAY", "glyph_atlas_dir", fallback="~/.cache/oled/glyphs")
+        )
         
         # ============================================
         # 4. 屏保配置
@@ -98,6 +133,48 @@ def load_config():
         # ============================================
         metadata_pipe = config.get("AIRPLAY", "metadata_pipe", fallback="/tmp/shairport-sync-metadata")
         
+        # ============================================
+        # 7. 蓝牙配置
+        # ============================================
+        # dbus_bus: system (BlueZ) 或 session (测试用假服务)
+        bt_dbus_bus = config.get("BLUETOOTH", "dbus_bus", fallback="system").upper()
+        if bt_dbus_bus not in ("SYSTEM", "SESSION"):
+            logging.warning(f"无效的 dbus_bus: {bt_dbus_bus}，使用默认值 system")
+            bt_dbus_bus = "SYSTEM"
+        
+        # ============================================
+        # 8. 指标配置
+        # ============================================
+        # port: 回环地址上的 HTTP 端口 (0 关闭)；socket: 同样端点的 Unix socket 路径 (空关闭)
+        # summary_interval: 摘要日志间隔秒数 (0 关闭)
+        metrics_port = config.getint("METRICS", "port", fallback=9099)
+        metrics_socket = os.path.expanduser(config.get("METRICS", "socket", fallback="").strip())
+        metrics_summary_interval = config.getint("METRICS", "summary_interval", fallback=300)
+        
+        # ============================================
+        # 9. 音源探测配置
+        # ============================================
+        # 各音源并发探测，单个 tick 最多等待 tick_budget_ms，超时的结果留到下一个 tick 使用
+        probe_workers = config.getint("PROBE", "workers", fallback=4)
+        probe_tick_budget_ms = config.getint("PROBE", "tick_budget_ms", fallback=250)
+        
+        # ============================================
+        # 10. 专辑封面配置
+        # ============================================
+        # 封面在后台解码为 size x size 的 1-bit 缩略图，缓存在 cache_dir，总大小上限 cache_kb
+        artwork_enabled = config.getboolean("ARTWORK", "enabled", fallback=True)
+        artwork_size = config.getint("ARTWORK", "size", fallback=16)
+        artwork_cache_dir = os.path.expanduser(
+            config.get("ARTWORK", "cache_dir", fallback="~/.cache/oled/artwork")
+        )
+        artwork_cache_kb = config.getint("ARTWORK", "cache_kb", fallback=2048)
+        
+        # ============================================
+        # 11. 后端输入录制（供 test/replay.py 回放，默认关闭）
+        # ============================================
+        capture_path = os.path.expanduser(config.get("CAPTURE", "path", fallback="").strip())
+        capture_max_mb = config.getint("CAPTURE", "max_mb", fallback=64)
+        
         # ============================================
         # 日志输出
         # ============================================
@@ -106,14 +183,22 @@ def load_config():
         logging.info("=" * 50)
         logging.info(f"LMS 服务器: {host_ip}:{host_port}")
         logging.info(f"播放器 ID: {player_id}")
+        logging.info(f"LMS 事件: {'CLI ' + str(cli_port) if lms_events else '关闭 (轮询)'}")
         logging.info(f"OLED: bus={oled_bus}, addr=0x{oled_address:X}, size={oled_width}x{oled_height}")
         logging.info(f"日志级别: {log_level_str}")
         logging.info(f"字体: {font_path} (小={font_small_size}, 大={font_large_size})")
+        logging.info(f"字形图集: {glyph_atlas_dir if glyph_atlas else '关闭'}")
         logging.info(f"亮度: 默认={default_brightness}, 暗={dim_brightness}")
-        logging.info(f"滚动: 步进={scroll_step}, 播放={scroll_speed_playing}s, 静态={scroll_speed_static}s")
+        logging.info(f"滚动: 最小步进={scroll_step}, 播放={scroll_pps_playing}px/s, 静态={scroll_pps_static}px/s, 最高帧率={scroll_max_fps}")
         logging.info(f"屏保: 暗={dim_timeout}s, 关={off_timeout}s")
         logging.info(f"音量弹窗: {popup_duration}s")
         logging.info(f"AirPlay 管道: {metadata_pipe}")
+        logging.info(f"蓝牙 D-Bus: {bt_dbus_bus.lower()} bus")
+        logging.info(f"音源探测: 线程={probe_workers}, 每 tick 预算={probe_tick_budget_ms}ms")
+        if capture_path:
+            logging.info(f"录制: {capture_path} (上限 {capture_max_mb}MB)")
+        logging.info(f"封面: {f'{artwork_size}px, 缓存 {artwork_cache_dir} ({artwork_cache_kb}KB)' if artwork_enabled else '关闭'}")
+        logging.info(f"指标: 端口={metrics_port or '关闭'}, socket={metrics_socket or '关闭'}, 摘要间隔={metrics_summary_interval or '关闭'}")
         logging.info("=" * 50)
         
         # ============================================
@@ -124,6 +209,8 @@ def load_config():
                 "host_ip": host_ip,
                 "host_port": host_port,
                 "player_id": player_id,
+                "cli_port": cli_port,
+                "lms_events": lms_events,
             },
             "oled": {
                 "bus": oled_bus,
@@ -139,8 +226,13 @@ def load_config():
                 "default_brightness": default_brightness,
                 "dim_brightness": dim_brightness,
                 "scroll_step": scroll_step,
-                "scroll_speed_playing": scroll_speed_playing,
-                "scroll_speed_static": scroll_speed_static,
+                "scroll_pps_playing": scroll_pps_playing,
+                "scroll_pps_static": scroll_pps_static,
+                "scroll_max_fps": scroll_max_fps,
+                "text_cache_kb": text_cache_kb,
+                "glyph_atlas": glyph_atlas,
+                "glyph_atlas_dir": glyph_atlas_dir,
+                "frame_export_path": frame_export_path,
             },
             "screensaver": {
                 "dim_timeout": dim_timeout,
@@ -151,6 +243,28 @@ def load_config():
             },
             "airplay": {
                 "metadata_pipe": metadata_pipe,
+            },
+            "bluetooth": {
+                "dbus_bus": bt_dbus_bus,
+            },
+            "metrics": {
+                "port": metrics_port,
+                "socket": metrics_socket,
+                "summary_interval": metrics_summary_interval,
+            },
+            "probe": {
+                "workers": probe_workers,
+                "tick_budget_ms": probe_tick_budget_ms,
+            },
+            "artwork": {
+                "enabled": artwork_enabled,
+                "size": artwork_size,
+                "cache_dir": artwork_cache_dir,
+                "cache_kb": artwork_cache_kb,
+            },
+            "capture": {
+                "path": capture_path,
+                "max_mb": capture_max_mb,
             }
         }
         
@@ -175,3 +289,4 @@ if __name__ == "__main__":
     print(f"屏保配置: {cfg['screensaver']}")
     print(f"音量配置: {cfg['volume']}")
     print(f"AirPlay 配置: {cfg['airplay']}")
+    print(f"蓝牙配置: {cfg['bluetooth']}")
@@ -5,10 +5,20 @@ import time
 import threading
 import logging
 import os
+import functools
+from collections import deque
 from luma.core.interface.serial import i2c
 from luma.oled.device import ssd1306
-from luma.core.render import canvas
-from PIL import ImageFont, ImageDraw
+from PIL import Image, ImageFont, ImageDraw
+
+import metrics
+import screen_state
+from frame_pacer import FramePacer
+from screen_state import ScreenState
+from text_cache import TextCache, font_key
+from clock_renderer import ClockRenderer
+from glyph_atlas import GlyphAtlas
+from frame_export import FrameExport
 
 # ============================================
 # 日志配置 (统一格式)
@@ -26,11 +36,12 @@ STATUS_FONT = ImageFont.load_default()
 # 全局变量（由配置初始化）
 # -------------------------------
 _display_config = None
-current_scroll_thread = None
-scroll_stop_event = threading.Event()
-scroll_cache = {}
-_latest_volume = None
-_current_scroll_signature = None
+_text_cache = TextCache()
+_scroll_pacer = None
+_first_frame_time = None
+_clock_renderers = {}
+_clock_frame = None
+_clock_top = None
 
 # -------------------------------
 # 配置初始化函数
@@ -44,6 +55,7 @@ def init_display_config(display_config):
     """
     global _display_config
     _display_config = display_config
+    _text_cache.budget_bytes = display_config.get("text_cache_kb", 256) * 1024
     logger.info("Display 配置已加载:")
     for key, value in display_config.items():
         logger.info(f"  {key} = {value}")
@@ -58,13 +70,27 @@ def _get_config(key, default=None):
 # -------------------------------
 # 辅助函数
 # -------------------------------
+@functools.lru_cache(maxsize=None)
 def _load_font(path, size):
+    """按 (路径, 字号) 缓存字体对象，同一字号只解析一次字体文件"""
     if os.path.isfile(path):
         return ImageFont.truetype(path, size)
     else:
         logger.warning(f"字体文件 {path} 不存在，使用默认字体")
         return ImageFont.load_default()
 
+def _load_text_font(display_config, path, size):
+    """
+    正文字体：启用字形图集时返回 GlyphAtlas（完整字体只在缺字形时打开），否则直接加载字体
+    """
+    atlas_dir = display_config.get("glyph_atlas_dir")
+    if display_config.get("glyph_atlas", True) and atlas_dir and os.path.isfile(path):
+        try:
+            return GlyphAtlas(path, size, atlas_dir, loader=_load_font)
+        except Exception as e:
+            logger.warning(f"字形图集初始化失败，直接使用字体: {e}")
+    return _load_font(path, size)
+
 def _draw_speaker_icon(draw, x, y, is_muted=False):
     draw.rectangle((x, y + 2, x + 2, y + 5), fill=255)
     draw.polygon([(x + 2, y + 2), (x + 6, y - 1), (x + 6, y + 8), (x + 2, y + 5)], fill=255)
@@ -101,6 +127,219 @@ def _draw_volume_bar(draw, width, height, volume):
         if not is_muted:
             draw.rectangle((bar_start_x, bar_top, bar_start_x + fill_width, bar_bottom), fill=255)
 
+VOLUME_BAR_HEIGHT = 12
+# 底部标题区域的起始行（顶部状态行 + 封面占用 0-17 行）
+BOTTOM_Y = 18
+# 封面与顶部文字之间的留白（像素）
+ARTWORK_MARGIN = 2
+_volume_overlay_cache = {}
+
+def _get_volume_overlay(width, volume):
+    """音量条图层（按音量值缓存，只渲染一次）"""
+    key = (width, volume)
+    overlay = _volume_overlay_cache.get(key)
+    if overlay is None:
+        overlay = Image.new("1", (width, VOLUME_BAR_HEIGHT))
+        _draw_volume_bar(ImageDraw.Draw(overlay), width, VOLUME_BAR_HEIGHT, volume)
+        _volume_overlay_cache[key] = overlay
+    return overlay
+
+def _paste_top_text(frame, width, top_text, top_font, top_align):
+    """顶部状态行（居中或左对齐），测量和光栅化结果来自文本缓存"""
+    top = _text_cache.get(top_text, top_font)
+    if top_align == "left": top_x = 0
+    else: top_x = (width - top.width) // 2
+    top_y = (14 - top.height) // 2 - 2
+    top.paste_into(frame, (top_x, top_y))
+
+def _paste_artwork(frame, width, artwork):
+    """封面缩略图放在顶部状态行右侧（先清出区域，过长的顶部文字在此被截断）"""
+    if artwork is None:
+        return
+    art_w, art_h = artwork.size
+    x = width - art_w
+    frame.paste(0, (x - ARTWORK_MARGIN, 0, width, art_h))
+    frame.paste(artwork, (x, 0))
+
+def _render_clock(display_ctx, top_text, time_text, font, top_align):
+    """
+    时钟模式：保留上一帧，日期行变化时才重绘顶部，时间只重绘变化的数字格
+
+    Returns:
+        Image: 时钟画面（不含音量条，下次调用时原地更新）
+    """
+    global _clock_frame, _clock_top
+    device = display_ctx["device"]
+    width = display_ctx["width"]
+    height = display_ctx["height"]
+
+    key = (font_key(font), width)
+    clock = _clock_renderers.get(key)
+    if clock is None:
+        clock = ClockRenderer(font, width, 18)
+        _clock_renderers[key] = clock
+
+    if _clock_frame is None:
+        _clock_frame = Image.new(device.mode, (width, height))
+        _clock_top = None
+        for renderer in _clock_renderers.values():
+            renderer.reset()
+
+    if (top_text, top_align) != _clock_top:
+        _clock_frame.paste(0, (0, 0, width, 18))
+        _paste_top_text(_clock_frame, width, top_text, display_ctx["font_small"], top_align)
+        _clock_top = (top_text, top_align)
+
+    clock.draw(_clock_frame, time_text)
+    return _clock_frame
+
+def get_text_cache_stats():
+    return _text_cache.get_stats()
+
+def _present(display_ctx, image):
+    """将帧交给脏页帧缓冲，只发送有变化的部分"""
+    global _first_frame_time
+    metrics.inc("display.frames")
+    framebuffer = display_ctx.get("framebuffer")
+    with metrics.timed("display.present"):
+        if framebuffer is None:
+            display_ctx["device"].display(image)
+        else:
+            framebuffer.display(image)
+    frame_export = display_ctx.get("frame_export")
+    if frame_export is not None:
+        frame_export.publish(image)
+    if _first_frame_time is None:
+        _first_frame_time = time.perf_counter()
+
+def get_first_frame_time():
+    """第一帧发送完成的时间 (time.perf_counter)，尚未发送时返回 None"""
+    return _first_frame_time
+
+# -------------------------------
+# 脏页差分帧缓冲
+# -------------------------------
+# SSD1306 命令
+_CMD_COLUMNADDR = 0x21
+_CMD_PAGEADDR = 0x22
+# I2C 传输开销：每次事务 1 字节地址 + 1 字节控制字节；非托管 SMBus 每块最多 32 字节
+_I2C_TXN_OVERHEAD = 2
+_I2C_BLOCK = 32
+_ROTATE_270 = getattr(Image, "Transpose", Image).ROTATE_270
+
+def _pack_pages(image, pages):
+    """
+    将 1-bit 图像打包为 SSD1306 页格式
+
+    旋转 270° 后每一行对应原图的一列，tobytes() 的每个字节正好是一页中的
+    一列（低位在上），因此无需逐像素循环。
+
+    Returns:
+        list: 每页一个 bytes（长度为宽度）
+    """
+    data = image.transpose(_ROTATE_270).tobytes()
+    return [data[pages - 1 - p::pages] for p in range(pages)]
+
+def _diff_columns(old, new):
+    """返回两页之间第一个和最后一个不同的列，完全相同返回 None"""
+    if old == new:
+        return None
+    n = len(new)
+    first = next(i for i in range(n) if old[i] != new[i])
+    last = next(i for i in range(n - 1, first - 1, -1) if old[i] != new[i])
+    return first, last
+
+class FrameBuffer:
+    """
+    记住上一次发送到 SSD1306 的帧，只把变化的 page（8 行）中变化的列范围
+    通过 COLUMNADDR / PAGEADDR 窗口发送，减少 I2C 总线流量。
+    """
+
+    def __init__(self, device, report_every=500):
+        self.device = device
+        self.width = device.width
+        self.height = device.height
+        self.pages = self.height // 8
+        self._colstart = getattr(device, "_colstart", 0)
+        self._pages_sent = None
+        self.report_every = report_every
+
+        self.frames = 0
+        self.frames_unchanged = 0
+        self.bus_bytes = 0
+        self.last_bus_bytes = 0
+        self.frame_time_total = 0.0
+        self.last_frame_time = 0.0
+
+    def invalidate(self):
+        """下一帧强制全屏发送（屏幕内容可能已被外部修改时调用）"""
+        self._pages_sent = None
+
+    def display(self, image):
+        start = time.perf_counter()
+        device = self.device
+        image = device.preprocess(image)
+        pages = _pack_pages(image, self.pages)
+
+        bus = 0
+        if self._pages_sent is None:
+            bus += self._send_window(0, self.width - 1, 0, self.pages - 1, b"".join(pages))
+        else:
+            for p in range(self.pages):
+                window = _diff_columns(self._pages_sent[p], pages[p])
+                if window is not None:
+                    x0, x1 = window
+                    bus += self._send_window(x0, x1, p, p, pages[p][x0:x1 + 1])
+        self._pages_sent = pages
+
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        if bus == 0:
+            self.frames_unchanged += 1
+            metrics.inc("display.frames_unchanged")
+        self.bus_bytes += bus
+        self.last_bus_bytes = bus
+        self.frame_time_total += elapsed
+        self.last_frame_time = elapsed
+
+        if self.report_every and self.frames % self.report_every == 0:
+            stats = self.get_stats()
+            logger.debug(
+                f"帧缓冲: frames={stats['frames']} unchanged={stats['frames_unchanged']} "
+                f"avg_bus={stats['avg_bus_bytes']:.0f}B (full={stats['full_frame_bus_bytes']}B) "
+                f"avg_time={stats['avg_frame_ms']:.2f}ms"
+            )
+
+    def _send_window(self, x0, x1, p0, p1, payload):
+        cmd = (_CMD_COLUMNADDR, self._colstart + x0, self._colstart + x1,
+               _CMD_PAGEADDR, p0, p1)
+        self.device.command(*cmd)
+        self.device.data(payload)
+        return self._bus_cost(len(cmd), len(payload))
+
+    @staticmethod
+    def _bus_cost(cmd_len, data_len):
+        blocks = -(-data_len // _I2C_BLOCK)
+        return (_I2C_TXN_OVERHEAD + cmd_len) + data_len + blocks * _I2C_TXN_OVERHEAD
+
+    def get_stats(self):
+        frames = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "frames_unchanged": self.frames_unchanged,
+            "bus_bytes": self.bus_bytes,
+            "last_bus_bytes": self.last_bus_bytes,
+            "avg_bus_bytes": self.bus_bytes / frames,
+            "full_frame_bus_bytes": self._bus_cost(6, self.width * self.pages),
+            "last_frame_ms": self.last_frame_time * 1000,
+            "avg_frame_ms": self.frame_time_total / frames * 1000,
+        }
+
+def get_frame_stats(display_ctx):
+    """返回帧缓冲统计（总线字节数、帧耗时），未启用帧缓冲时返回 None"""
+    framebuffer = display_ctx.get("framebuffer")
+    return framebuffer.get_stats() if framebuffer else None
+
 # -------------------------------
 # OLED 初始化
 # -------------------------------
@@ -127,16 +366,31 @@ def init_display(port: int, address: int, w: int, h: int, display_config: dict):
         default_brightness = display_config.get("default_brightness", 255)
         dim_brightness = display_config.get("dim_brightness", 8)
         
-        font_small = _load_font(font_path, font_small_size)
-        font_large = _load_font(font_path, font_large_size)
+        font_small = _load_text_font(display_config, font_path, font_small_size)
+        font_large = _load_text_font(display_config, font_path, font_large_size)
         
         device.contrast(default_brightness)
         
         # 初始化全局配置
         init_display_config(display_config)
         
-        return {
+        # 支持窗口寻址的 SSD1306 才启用脏页差分
+        framebuffer = FrameBuffer(device) if hasattr(device, "_colstart") else None
+        
+        # 共享内存帧导出（预览 / 测试读取当前画面）
+        frame_export = None
+        export_path = display_config.get("frame_export_path")
+        if export_path:
+            try:
+                frame_export = FrameExport(export_path, device.width, device.height)
+                logger.info(f"帧导出: {export_path}")
+            except OSError as e:
+                logger.warning(f"帧导出不可用 ({export_path}): {e}")
+        
+        display_ctx = {
             "device": device, 
+            "framebuffer": framebuffer,
+            "frame_export": frame_export,
             "width": device.width, 
             "height": device.height,
             "font_small": font_small, 
@@ -144,107 +398,310 @@ def init_display(port: int, address: int, w: int, h: int, display_config: dict):
             "default_brightness": default_brightness, 
             "dim_brightness": dim_brightness
         }
+        # 合成线程：此后只有它访问设备
+        _get_compositor(display_ctx)
+        return display_ctx
     except Exception as e:
         logger.error(f"OLED 初始化失败: {e}")
         raise
 
 def set_brightness(display_ctx: dict, level: int):
-    display_ctx["device"].contrast(max(0, min(255, level)))
+    _get_compositor(display_ctx).control(display_ctx["device"].contrast, max(0, min(255, level)))
 
 def restore_brightness(display_ctx: dict):
     set_brightness(display_ctx, display_ctx["default_brightness"])
 
 def turn_off_display(display_ctx: dict):
-    display_ctx["device"].hide()
+    _get_compositor(display_ctx).control(display_ctx["device"].hide)
 
 def turn_on_display(display_ctx: dict):
-    display_ctx["device"].show()
+    _get_compositor(display_ctx).control(display_ctx["device"].show)
     restore_brightness(display_ctx)
 
 # -------------------------------
-# 滚动文本函数
+# 合成线程
 # -------------------------------
-def scroll_text(display_ctx: dict, top_text, bottom_text, large_font, scroll_speed, stop_event, top_align):
-    device = display_ctx["device"]
-    width = display_ctx["width"]
-    height = display_ctx["height"]
-    font_small = display_ctx["font_small"]
-    font_large = display_ctx["font_large"]
-    top_font = font_small
-    bottom_font = font_large if large_font else font_small
-    
-    # 从配置读取滚动步进
-    scroll_step = _get_config("scroll_step", 2)
-
-    with canvas(device) as draw:
-        top_bbox = draw.textbbox((0, 0), top_text, font=top_font)
-        if top_align == "left": top_x = 0
-        else: top_x = (width - (top_bbox[2] - top_bbox[0])) // 2
-        top_y = (14 - (top_bbox[3] - top_bbox[1])) // 2 - 2
-
-    cache_key = (bottom_text, large_font)
-    if cache_key not in scroll_cache:
-        with canvas(device) as draw:
-            bbox = draw.textbbox((0, 0), bottom_text, font=bottom_font)
-            scroll_cache[cache_key] = bbox[2] - bbox[0]
-    bottom_text_width = scroll_cache[cache_key]
-
-    while not (stop_event and stop_event.is_set()):
-        for offset in range(0, bottom_text_width + width, scroll_step):
-            if stop_event and stop_event.is_set(): break
-            
-            with canvas(device) as draw:
-                draw.text((top_x, top_y), top_text, font=top_font, fill=255)
-                draw.text((width - offset, 18), bottom_text, font=bottom_font, fill=255)
-                _draw_volume_bar(draw, width, height, _latest_volume)
-                
-            time.sleep(scroll_speed)
+class Compositor:
+    """
+    常驻合成线程，独占显示设备
 
-# -------------------------------
-# 显示文本主函数
-# -------------------------------
-def display_text(display_ctx, top_text, bottom_text, large_font=False, scroll_speed=0.02, is_time_update=False, volume=None, top_align="center"):
-    global current_scroll_thread, scroll_stop_event
-    global _latest_volume, _current_scroll_signature
+    主循环通过 submit() 把期望画面放进单槽邮箱（新请求直接覆盖未处理的旧请求），
+    亮度/开关屏等设备命令通过 control() 排队，二者都不阻塞调用方。
+    线程按图层渲染：顶部文字 + 封面组成静态层，标题为滚动条带，音量条为叠加层。
+    新请求与当前画面按区域差分（见 screen_state）：只有标题变化才重建条带并从头滚动；
+    顶部状态行 / 封面变化只重建静态层，速度变化只调整帧调度，滚动位置保持不变。
 
-    _latest_volume = volume
-    device = display_ctx["device"]
-    width = display_ctx["width"]
-    height = display_ctx["height"]
-    font_small = display_ctx["font_small"]
-    font_large = display_ctx["font_large"]
+    音量弹窗（show_volume()）有自己的单槽和到期时间：后端音量事件可以在任意线程直接投递，
+    连续事件只保留最新一个，合成线程只重绘底部音量条，到期后自行撤下。
+    滚动帧和弹窗到期都按截止时间调度，被新请求提前唤醒不会打乱滚动节奏。
+    """
 
-    new_signature = (top_text, bottom_text, large_font, top_align)
-    if (current_scroll_thread and current_scroll_thread.is_alive() 
-        and new_signature == _current_scroll_signature):
-        return
+    def __init__(self, display_ctx):
+        self.ctx = display_ctx
+        self._cond = threading.Condition()
+        self._mailbox = None          # 单槽邮箱：最新的 ScreenState
+        self._popup_mailbox = None    # 单槽邮箱：最新的音量弹窗 (volume, duration, 事件时间)
+        self._controls = deque()      # 设备命令 (fn, args)
+        self._thread = None
 
-    if current_scroll_thread and current_scroll_thread.is_alive():
-        scroll_stop_event.set()
-        current_scroll_thread.join()
-    scroll_stop_event.clear()
-    
-    _current_scroll_signature = new_signature
-    top_font = font_small
-    bottom_font = font_large if large_font else font_small
-    
-    with canvas(device) as draw:
-        top_bbox = draw.textbbox((0, 0), top_text, font=top_font)
-        if top_align == "left": top_x = 0
-        else: top_x = (width - (top_bbox[2] - top_bbox[0])) // 2
-        top_y = (14 - (top_bbox[3] - top_bbox[1])) // 2 - 2
-        draw.text((top_x, top_y), top_text, font=top_font, fill=255)
-
-        bottom_bbox = draw.textbbox((0, 0), bottom_text, font=bottom_font)
-        bottom_w = bottom_bbox[2] - bottom_bbox[0]
-        bottom_x = (width - bottom_w) // 2
-        bottom_y = 18
-        draw.text((bottom_x, bottom_y), bottom_text, font=bottom_font, fill=255)
-        _draw_volume_bar(draw, width, height, _latest_volume)
-
-    if bottom_w > width and not is_time_update:
-        current_scroll_thread = threading.Thread(
-            target=scroll_text,
-            args=(display_ctx, top_text, bottom_text, large_font, scroll_speed, scroll_stop_event, top_align)
+        # 以下状态只在合成线程中访问
+        self._state = None            # 当前画面的 ScreenState
+        self._request_volume = None   # 画面请求中的音量（常驻音量条）
+        self._popup_volume = None
+        self._popup_until = None      # 弹窗到期时间 (time.monotonic)
+        self._volume = None           # 实际叠加的音量：请求中的音量优先，其次是弹窗
+        self._frame = None            # 最近发送的画面（不含音量条）
+        self._base = None             # 静态层：顶部状态行 + 封面
+        self._bottom = None           # 标题的光栅化结果（不滚动时居中放在静态层上）
+        self._strip = None            # 滚动条带（不滚动时为 None）
+        self._offset = 0
+        self._pacer = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="compositor", daemon=True)
+        self._thread.start()
+
+    def submit(self, request):
+        """投递期望画面（覆盖尚未处理的上一份）"""
+        with self._cond:
+            if self._mailbox is not None:
+                metrics.inc("display.mailbox_overwrites")
+            self._mailbox = request
+            self._cond.notify()
+
+    def show_volume(self, volume, duration):
+        """弹出音量条 duration 秒（线程安全，覆盖尚未处理的上一次弹窗）"""
+        with self._cond:
+            if self._popup_mailbox is not None:
+                metrics.inc("volume.coalesced")
+            self._popup_mailbox = (volume, duration, time.perf_counter())
+            self._cond.notify()
+
+    def control(self, fn, *args):
+        """排队执行设备命令（在合成线程中与帧发送串行，不会与帧数据交错）"""
+        with self._cond:
+            self._controls.append((fn, args))
+            self._cond.notify()
+
+    @property
+    def scrolling(self):
+        return self._strip is not None
+
+    # -------------------------------
+    # 线程主体
+    # -------------------------------
+    def _has_work(self):
+        return self._mailbox is not None or self._popup_mailbox is not None or bool(self._controls)
+
+    def _next_timeout(self):
+        """距离下一个定时任务（滚动帧 / 弹窗到期）的秒数，没有定时任务时返回 None"""
+        timeouts = []
+        if self.scrolling:
+            timeouts.append(self._pacer.remaining())
+        if self._popup_until is not None:
+            timeouts.append(max(0.0, self._popup_until - time.monotonic()))
+        return min(timeouts) if timeouts else None
+
+    def _wait(self, timeout):
+        """等待新请求或设备命令，最多 timeout 秒"""
+        with self._cond:
+            if not self._has_work():
+                self._cond.wait(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_work():
+                    timeout = self._next_timeout()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                request, self._mailbox = self._mailbox, None
+                popup, self._popup_mailbox = self._popup_mailbox, None
+                controls = list(self._controls)
+                self._controls.clear()
+
+            try:
+                for fn, args in controls:
+                    fn(*args)
+                self._update_popup(popup)
+                if request is not None:
+                    self._request_volume = request.volume
+                volume_changed = self._refresh_volume()
+
+                presented = self._apply(request) if request is not None else False
+                if volume_changed and not presented and self._frame is not None:
+                    # 只有音量条变化：复用上一帧，脏页差分只发送底部音量条所在的页
+                    self._present_frame(self._frame)
+                if popup is not None:
+                    metrics.observe("volume.popup_latency", time.perf_counter() - popup[2])
+
+                if self.scrolling and self._pacer.remaining() <= 0:
+                    self._scroll_frame()
+            except Exception as e:
+                logger.error(f"合成线程错误: {e}")
+                self._strip = None
+                self._state = None
+                self._wait(1.0)
+
+    def _update_popup(self, popup):
+        """接收新的弹窗，或撤下已到期的弹窗"""
+        if popup is not None:
+            volume, duration, _ = popup
+            self._popup_volume = volume
+            self._popup_until = time.monotonic() + duration
+        elif self._popup_until is not None and time.monotonic() >= self._popup_until:
+            self._popup_volume = None
+            self._popup_until = None
+
+    def _refresh_volume(self):
+        """重新计算实际叠加的音量，返回是否变化"""
+        volume = self._request_volume if self._request_volume is not None else self._popup_volume
+        changed = volume != self._volume
+        self._volume = volume
+        return changed
+
+    def _apply(self, state):
+        """按区域差分处理画面请求，返回是否已发送新帧"""
+        global _clock_frame
+
+        regions = screen_state.diff(self._state, state)
+        self._state = state
+        for name in screen_state.region_names(regions):
+            metrics.inc(f"display.region.{name}")
+
+        if state.is_clock:
+            if not regions & (screen_state.TOP | screen_state.CLOCK):
+                metrics.inc("display.dedupe_skips")
+                return False
+            self._strip = None
+            bottom_font = self.ctx["font_large"] if state.large_font else self.ctx["font_small"]
+            self._present_frame(_render_clock(
+                self.ctx, state.top_text, state.bottom_text, bottom_font, state.top_align
+            ))
+            return True
+        # 离开时钟模式，下次进入时整帧重建
+        _clock_frame = None
+
+        if regions & screen_state.BOTTOM:
+            # 标题变化：重建全部图层，从头滚动
+            if self.scrolling:
+                metrics.inc("display.scroll_restarts")
+            self._build_base(state)
+            self._build_bottom(state)
+            self._present_frame(self._compose(centered=True))
+            return True
+
+        if regions & screen_state.SPEED and self.scrolling:
+            self._pacer.set_speed(state.scroll_speed)
+
+        if regions & screen_state.TOP:
+            # 只重建静态层，标题条带和滚动位置保持不变
+            self._build_base(state)
+            self._present_frame(self._compose())
+            return True
+
+        # 内容未变：音量变化由调用方只重绘音量条
+        metrics.inc("display.dedupe_skips")
+        return False
+
+    def _build_base(self, state):
+        """静态层：顶部文字和封面只渲染一次"""
+        width = self.ctx["width"]
+        base = Image.new(self.ctx["device"].mode, (width, self.ctx["height"]))
+        _paste_top_text(base, width, state.top_text, self.ctx["font_small"], state.top_align)
+        _paste_artwork(base, width, state.artwork)
+        self._base = base
+
+    def _build_bottom(self, state):
+        """标题：放得下时居中显示，过长时生成滚动条带和帧调度器"""
+        global _scroll_pacer
+
+        width = self.ctx["width"]
+        bottom_font = self.ctx["font_large"] if state.large_font else self.ctx["font_small"]
+        bottom = _text_cache.get(state.bottom_text, bottom_font)
+        self._bottom = bottom
+        self._strip = None
+        if bottom.width <= width:
+            return
+
+        # 滚动条带：标题整行渲染到一张宽图中（前后各留一屏空白），每帧只裁剪
+        strip = Image.new(self.ctx["device"].mode, (bottom.width + 2 * width, self.ctx["height"] - BOTTOM_Y))
+        bottom.paste_into(strip, (width, 0))
+        self._strip = strip
+        self._offset = 0
+        # 帧调度器：scroll_speed 为 像素/秒，scroll_step 为最小步进
+        self._pacer = FramePacer(
+            state.scroll_speed,
+            min_step=_get_config("scroll_step", 2),
+            max_fps=_get_config("scroll_max_fps", 60.0)
         )
-        current_scroll_thread.start()
+        _scroll_pacer = self._pacer
+
+    def _compose(self, centered=False):
+        """
+        静态层 + 标题（不含音量条）
+
+        Args:
+            centered: 标题居中（新标题的首帧，过长时两端被裁掉）；否则按滚动位置裁剪条带
+        """
+        width = self.ctx["width"]
+        frame = self._base.copy()
+        strip = self._strip
+        if strip is not None and not centered:
+            band_height = strip.height
+            frame.paste(strip.crop((self._offset, 0, self._offset + width, band_height)),
+                        (0, self.ctx["height"] - band_height))
+        else:
+            self._bottom.paste_into(frame, ((width - self._bottom.width) // 2, BOTTOM_Y))
+        return frame
+
+    def _present_frame(self, frame):
+        """叠加音量条后发送；frame 为不含音量条的完整画面，保留下来供只重绘音量条时复用"""
+        self._frame = frame
+        if self._volume is not None:
+            frame = frame.copy()
+            frame.paste(_get_volume_overlay(self.ctx["width"], self._volume),
+                        (0, self.ctx["height"] - VOLUME_BAR_HEIGHT))
+        _present(self.ctx, frame)
+
+    def _scroll_frame(self):
+        pacer = self._pacer
+        pacer.begin_frame()
+        self._present_frame(self._compose())
+
+        # 不在这里等待：下一帧的截止时间由 _run 与新请求、弹窗到期一起调度
+        self._offset += pacer.end_frame(wait=None)
+        if self._offset >= self._strip.width - self.ctx["width"]:
+            self._offset = 0
+
+def _get_compositor(display_ctx):
+    compositor = display_ctx.get("compositor")
+    if compositor is None:
+        compositor = display_ctx["compositor"] = Compositor(display_ctx)
+        compositor.start()
+    return compositor
+
+def show_volume_popup(display_ctx, volume, duration):
+    """弹出音量条 duration 秒（任意线程调用，立即返回；到期由合成线程撤下）"""
+    _get_compositor(display_ctx).show_volume(volume, duration)
+
+def get_scroll_stats():
+    """返回当前滚动帧调度统计（FPS、丢帧数、步进），未滚动时返回 None"""
+    pacer = _scroll_pacer
+    return pacer.get_stats() if pacer else None
+
+# -------------------------------
+# 显示文本主函数
+# -------------------------------
+def show_screen(display_ctx, state):
+    """投递期望画面 (ScreenState) 给合成线程（立即返回），合成线程只更新变化的区域"""
+    _get_compositor(display_ctx).submit(state)
+
+def display_text(display_ctx, top_text, bottom_text, large_font=False, scroll_speed=40.0, is_time_update=False, volume=None, top_align="center", artwork=None):
+    """投递期望画面给合成线程（立即返回）"""
+    show_screen(display_ctx, ScreenState(
+        top_text, bottom_text, large_font, scroll_speed, is_time_update, volume, top_align, artwork
+    ))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# resources/oled/event_loop.py
+#
+# 基于 selectors 的主循环运行时：
+#   - fd 读事件（AirPlay 管道、wakeup self-pipe）
+#   - 命名定时器（时钟秒、音量弹窗到期、屏保、兜底轮询）
+# run_once() 阻塞到任一 fd 可读或最近的定时器到期，调用方随后重新评估状态。
+
+import logging
+import selectors
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoop:
+    """单线程 fd + 定时器多路复用"""
+
+    def __init__(self):
+        self._sel = selectors.DefaultSelector()
+        self._timers = {}  # name -> monotonic deadline
+
+    # -------------------------------
+    # fd
+    # -------------------------------
+    def add_reader(self, fd, callback):
+        """注册 fd 可读回调，callback() 返回 False 表示本次事件无需重新评估状态"""
+        try:
+            self._sel.modify(fd, selectors.EVENT_READ, callback)
+        except KeyError:
+            self._sel.register(fd, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fd):
+        try:
+            self._sel.unregister(fd)
+        except (KeyError, ValueError):
+            pass
+
+    def has_reader(self, fd):
+        try:
+            self._sel.get_key(fd)
+            return True
+        except (KeyError, ValueError):
+            return False
+
+    # -------------------------------
+    # 定时器
+    # -------------------------------
+    def set_timer(self, name, delay):
+        """设置（或替换）命名定时器，delay 秒后到期；delay 为 None 时取消"""
+        if delay is None:
+            self._timers.pop(name, None)
+        else:
+            self._timers[name] = time.monotonic() + max(0.0, delay)
+
+    def cancel_timer(self, name):
+        self._timers.pop(name, None)
+
+    def next_timeout(self):
+        if not self._timers:
+            return None
+        return max(0.0, min(self._timers.values()) - time.monotonic())
+
+    # -------------------------------
+    # 运行
+    # -------------------------------
+    def run_once(self, max_wait=None):
+        """
+        等待一次事件
+
+        Returns:
+            tuple: (changed, fired)
+                   changed: 是否有 fd 回调要求重新评估
+                   fired: 本次到期的定时器名称集合
+        """
+        timeout = self.next_timeout()
+        if max_wait is not None:
+            timeout = max_wait if timeout is None else min(timeout, max_wait)
+
+        changed = False
+        for key, _ in self._sel.select(timeout):
+            try:
+                if key.data() is not False:
+                    changed = True
+            except Exception as e:
+                logger.warning(f"fd 回调失败 (fd={key.fd}): {e}")
+                changed = True
+
+        now = time.monotonic()
+        fired = {name for name, deadline in self._timers.items() if deadline <= now}
+        for name in fired:
+            del self._timers[name]
+        return changed, fired
+
+    def close(self):
+        self._sel.close()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# resources/oled/frame_export.py
+#
+# 共享内存帧导出（/dev/shm 下的内存映射文件）
+#
+# 合成线程每提交一帧，就把 1-bit 画面按行打包写入映射文件，并更新序号；
+# 预览工具、基准测试、截图测试只需 mmap 同一个文件即可读取当前画面，
+# 不经过 I2C 总线，也不影响渲染路径（每帧只是一次 1KB 的内存拷贝）。
+#
+# 文件布局（小端）:
+#   0   magic   8s  b"OLEDFB01"
+#   8   width   H
+#   10  height  H
+#   12  stride  H   每行字节数 ((width + 7) // 8)
+#   14  保留    H
+#   16  seq     Q   序号锁：写入期间为奇数，写完为偶数
+#   24  time    d   提交时间 (time.time())
+#   32  data        stride * height 字节，与 Image.tobytes()（mode "1"）相同
+#
+# 读者先读 seq（奇数则重试），复制数据后再读一次 seq，两次相同才是完整的一帧。
+
+import mmap
+import os
+import struct
+import time
+
+from PIL import Image
+
+MAGIC = b"OLEDFB01"
+_HEADER = struct.Struct("<8sHHHHQd")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 16
+_TIME = struct.Struct("<d")
+_TIME_OFFSET = 24
+DATA_OFFSET = _HEADER.size
+
+DEFAULT_PATH = "/dev/shm/oled-frame"
+
+
+class FrameExport:
+    """写端（只在合成线程中调用 publish）"""
+
+    def __init__(self, path, width, height):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.stride = (width + 7) // 8
+        self.seq = 0
+
+        size = DATA_OFFSET + self.stride * height
+        # 先写到临时文件再改名，读者不会看到长度不完整的文件
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(self._map, 0, MAGIC, width, height, self.stride, 0, 0, 0.0)
+        os.replace(tmp, path)
+
+    def publish(self, image):
+        """写入一帧（image: mode "1"，尺寸与设备相同）"""
+        data = image.tobytes()
+        m = self._map
+        self.seq += 1
+        _SEQ.pack_into(m, _SEQ_OFFSET, self.seq)
+        m[DATA_OFFSET:DATA_OFFSET + len(data)] = data
+        _TIME.pack_into(m, _TIME_OFFSET, time.time())
+        self.seq += 1
+        _SEQ.pack_into(m, _SEQ_OFFSET, self.seq)
+
+    def close(self):
+        self._map.close()
+
+
+class FrameReader:
+    """读端：mmap 导出文件，读取一致的最新帧"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+        magic, self.width, self.height, self.stride, _, _, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是 OLED 帧导出文件: {path}")
+        self._size = self.stride * self.height
+
+    @property
+    def seq(self):
+        """当前序号（偶数为已提交的帧数 * 2）"""
+        return _SEQ.unpack_from(self._map, _SEQ_OFFSET)[0]
+
+    def read(self, retries=100):
+        """
+        Returns:
+            tuple: (seq, timestamp, Image)；写端持续写入导致多次重试失败时抛出 RuntimeError
+        """
+        m = self._map
+        for _ in range(retries):
+            seq1 = _SEQ.unpack_from(m, _SEQ_OFFSET)[0]
+            if seq1 & 1:
+                time.sleep(0)
+                continue
+            data = m[DATA_OFFSET:DATA_OFFSET + self._size]
+            ts = _TIME.unpack_from(m, _TIME_OFFSET)[0]
+            if _SEQ.unpack_from(m, _SEQ_OFFSET)[0] == seq1:
+                image = Image.frombytes("1", (self.width, self.height), data)
+                return seq1, ts, image
+        raise RuntimeError("读取帧失败：写端持续写入")
+
+    def wait_next(self, last_seq, timeout=None, poll=0.01):
+        """
+        等待序号超过 last_seq 的新帧
+
+        Returns:
+            tuple: 同 read()；超时返回 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.seq <= last_seq:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+        return self.read()
+
+    def close(self):
+        self._map.close()
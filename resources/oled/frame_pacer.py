@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# resources/oled/frame_pacer.py
+#
+# 基于 time.monotonic 截止时间的帧调度器
+#
+# 滚动速度以 像素/秒 表示。每帧结束时测量实际帧耗时（渲染 + I2C），
+# 据此选择下一帧的滚动步进：帧越慢，每帧移动的像素越多、帧率越低，
+# 使实际滚动速度与总线负载无关地接近目标值。
+
+import math
+import time
+
+# 帧耗时的指数平滑系数
+COST_SMOOTHING = 0.2
+
+
+class FramePacer:
+    """按像素/秒调度滚动帧，统计实际 FPS 与丢帧数"""
+
+    def __init__(self, speed_pps, min_step=1, max_step=16, max_fps=60.0):
+        self.speed = max(1.0, float(speed_pps))
+        self.min_step = max(1, int(min_step))
+        self.max_step = max(self.min_step, int(max_step))
+        self.max_fps = max_fps
+
+        self.step = self.min_step
+        self.frames = 0
+        self.dropped_frames = 0
+        self.fps = 0.0
+        self.frame_cost = None   # 平滑后的帧耗时（秒）
+
+        self._deadline = None
+        self._frame_start = None
+        self._fps_window_start = None
+        self._fps_window_frames = 0
+
+    def begin_frame(self):
+        now = time.monotonic()
+        self._frame_start = now
+        if self._deadline is None:
+            self._deadline = now
+            self._fps_window_start = now
+
+    def end_frame(self, wait=time.sleep):
+        """
+        结束一帧：更新帧耗时，等待到下一帧的截止时间
+
+        Args:
+            wait: 等待函数，接收秒数（可传入 stop_event.wait 以便中途退出）；
+                  None 表示不等待，由调用方按 remaining() 安排下一帧
+
+        Returns:
+            int: 下一帧应前进的像素数
+        """
+        now = time.monotonic()
+        cost = now - self._frame_start
+        if self.frame_cost is None:
+            self.frame_cost = cost
+        else:
+            self.frame_cost += (cost - self.frame_cost) * COST_SMOOTHING
+
+        # 步进：一帧耗时内以目标速度应移动的像素数，并受最大帧率限制
+        min_interval = 1.0 / self.max_fps if self.max_fps else 0.0
+        wanted = self.speed * max(self.frame_cost, min_interval)
+        self.step = min(self.max_step, max(self.min_step, math.ceil(wanted)))
+        interval = self.step / self.speed
+
+        self.frames += 1
+        self._fps_window_frames += 1
+        if now - self._fps_window_start >= 1.0:
+            self.fps = self._fps_window_frames / (now - self._fps_window_start)
+            self._fps_window_start = now
+            self._fps_window_frames = 0
+
+        self._deadline += interval
+        if now >= self._deadline:
+            # 已错过截止时间：记录丢帧并以当前时间重新对齐，避免追赶抖动
+            self.dropped_frames += int((now - self._deadline) // interval) + 1
+            self._deadline = now
+        elif wait is not None:
+            wait(self._deadline - now)
+        return self.step
+
+    def set_speed(self, speed_pps):
+        """调整目标速度（下一帧起生效，截止时间和统计保持连续）"""
+        self.speed = max(1.0, float(speed_pps))
+
+    def remaining(self):
+        """距离下一帧截止时间的秒数（尚未开始或已到期时为 0）"""
+        if self._deadline is None:
+            return 0.0
+        return max(0.0, self._deadline - time.monotonic())
+
+    def get_stats(self):
+        return {
+            "speed_pps": self.speed,
+            "step": self.step,
+            "fps": round(self.fps, 1),
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "frame_cost_ms": round((self.frame_cost or 0.0) * 1000, 2),
+        }
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# resources/oled/glyph_atlas.py
+#
+# 预光栅化字形图集（内存映射文件）
+#
+# msyh.ttf 这类 CJK 字体有数 MB，每个字号打开一次 FreeType face 都要占用常驻内存，
+# 每次光栅化也要走 FreeType。图集把每个字形在该字号下的 1-bit 位图和度量
+# 追加写入磁盘文件，启动时 mmap 整个文件：已有字形直接从映射页面中取位图拼接文字
+# （页面由内核按需载入、可回收），只有遇到图集中没有的字形时才打开完整字体。
+#
+# 文件按 (字体指纹, 字号) 命名，字体文件更换后自动使用新的图集。
+# 拼接按字形前进宽度排版，不应用字偶距（kerning）；CJK 文本与 draw.text 的结果一致，
+# 西文个别字对（如 "AV"）可能相差 1 像素。
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from PIL import Image, ImageFont
+
+from text_cache import RenderedText, render_text
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OLEDGLY1"
+# 文件头: magic, 字号
+_HEADER = struct.Struct("<8sI")
+# 字形记录: 码位, bbox(l, t, r, b), 原点(ox, oy), 首字偏移, 位图宽高, 前进宽度 (26.6 定点)
+_RECORD = struct.Struct("<I4h2hh2Hi")
+# 光栅化时放在字形前面的无墨迹字符，取得字形在行中（非行首）的位置
+_CONTEXT_PREFIX = " "
+# 字体指纹读取的头尾字节数
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def font_fingerprint(path):
+    """
+    字体文件指纹：文件大小 + 头尾各 64KB 的 SHA-1
+
+    不读取整个字体文件（CJK 字体可能十几 MB），足以区分不同的字体和版本。
+    """
+    h = hashlib.sha1()
+    size = os.path.getsize(path)
+    h.update(str(size).encode())
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, size - FINGERPRINT_BYTES))
+            h.update(f.read(FINGERPRINT_BYTES))
+    return h.hexdigest()[:16]
+
+
+def _bitmap_bytes(w, h):
+    return ((w + 7) // 8) * h
+
+
+def _first_ink_column(image):
+    bbox = image.getbbox()
+    return bbox[0] if bbox else None
+
+
+class _Glyph:
+    __slots__ = ("image", "bbox", "origin", "first_dx", "advance")
+
+    def __init__(self, image, bbox, origin, first_dx, advance):
+        self.image = image
+        self.bbox = bbox           # 单独测量时的包围盒（相对笔位置）
+        self.origin = origin       # 笔位置在 image 中的坐标
+        self.first_dx = first_dx   # 位于行首时 PIL 对整行墨迹的水平偏移
+        self.advance = advance     # 26.6 定点
+
+
+class GlyphAtlas:
+    """
+    单个 (字体文件, 字号) 的字形图集，可代替 FreeTypeFont 传给 TextCache / ClockRenderer
+
+    提供 path / size 属性（供 font_key 使用）、getlength() 和 render_text()。
+    """
+
+    def __init__(self, font_path, size, atlas_dir, loader=ImageFont.truetype):
+        self.path = font_path
+        self.size = size
+        self.loader = loader
+        self.atlas_path = os.path.join(
+            atlas_dir, f"{font_fingerprint(font_path)}-{size}.atlas"
+        )
+
+        self._lock = threading.Lock()
+        self._glyphs = {}          # 码位 -> _Glyph
+        self._face = None
+        self._map = None
+
+        # 统计
+        self.mapped_glyphs = 0
+        self.added_glyphs = 0
+
+        os.makedirs(atlas_dir, exist_ok=True)
+        self._open()
+
+    # -------------------------------
+    # 字体接口
+    # -------------------------------
+    def getlength(self, text):
+        with self._lock:
+            return sum(self._glyph(ch).advance for ch in text) / 64.0
+
+    def render_text(self, text):
+        """
+        用图集中的字形拼出文字，返回与 text_cache.render_text() 相同格式的 RenderedText
+        """
+        with self._lock:
+            glyphs = [self._glyph(ch) for ch in text]
+
+        # 排版：与 PIL 基本布局相同，左边界不超过原点，右边界不小于总前进宽度
+        placed = []
+        pen = 0
+        x0, x1 = 0, 0
+        y0 = y1 = None
+        # 行首字形的偏移作用于整行墨迹，不影响包围盒
+        shift = glyphs[0].first_dx if glyphs else 0
+        for g in glyphs:
+            px = (pen + 32) >> 6
+            gl, gt, gr, gb = g.bbox
+            x0 = min(x0, px + gl)
+            x1 = max(x1, px + gr)
+            y0 = gt if y0 is None else min(y0, gt)
+            y1 = gb if y1 is None else max(y1, gb)
+            placed.append((px + shift, g))
+            pen += g.advance
+        x1 = max(x1, (pen + 63) >> 6)
+        if y0 is None:
+            y0 = y1 = 0
+        bbox = (x0, y0, x1, y1)
+
+        ox = max(0, -x0)
+        oy = max(0, -y0)
+        image = Image.new("1", (max(1, x1 + ox), max(1, y1 + oy)))
+        for px, g in placed:
+            gox, goy = g.origin
+            image.paste(255, (ox + px - gox, oy - goy), g.image)
+        return RenderedText(image, bbox, (ox, oy))
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "atlas": self.atlas_path,
+                "glyphs": len(self._glyphs),
+                "mapped_glyphs": self.mapped_glyphs,
+                "added_glyphs": self.added_glyphs,
+                "face_loaded": self._face is not None,
+            }
+
+    # -------------------------------
+    # 图集文件
+    # -------------------------------
+    def _open(self):
+        """映射已有的图集文件并建立码位索引；文件尾部不完整的记录被截掉"""
+        try:
+            fd = os.open(self.atlas_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.warning(f"字形图集不可用 ({self.atlas_path}): {e}")
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            size = os.fstat(fd).st_size
+            if size < _HEADER.size:
+                os.ftruncate(fd, 0)
+                os.write(fd, _HEADER.pack(MAGIC, self.size))
+                return
+            self._map = mmap.mmap(fd, size, prot=mmap.PROT_READ)
+            magic, atlas_size = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or atlas_size != self.size:
+                logger.warning(f"字形图集格式不匹配，重建: {self.atlas_path}")
+                self._map.close()
+                self._map = None
+                os.ftruncate(fd, 0)
+                os.write(fd, _HEADER.pack(MAGIC, self.size))
+                return
+            good = self._index(size)
+            if good < size:
+                logger.warning(f"字形图集尾部不完整，截断 {size - good} 字节")
+                os.ftruncate(fd, good)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        logger.info(f"字形图集: {self.atlas_path} ({self.mapped_glyphs} 个字形)")
+
+    def _index(self, size):
+        """扫描映射中的记录，位图直接引用映射内存（不复制）；返回有效数据的结尾偏移"""
+        view = memoryview(self._map)
+        offset = _HEADER.size
+        while offset + _RECORD.size <= size:
+            cp, l, t, r, b, ox, oy, first_dx, w, h, advance = _RECORD.unpack_from(self._map, offset)
+            start = offset + _RECORD.size
+            end = start + _bitmap_bytes(w, h)
+            if end > size:
+                break
+            image = Image.frombuffer("1", (w, h), view[start:end], "raw", "1", 0, 1)
+            self._glyphs[chr(cp)] = _Glyph(image, (l, t, r, b), (ox, oy), first_dx, advance)
+            offset = end
+        self.mapped_glyphs = len(self._glyphs)
+        return offset
+
+    def _glyph(self, ch):
+        """取字形（调用方持有锁）；图集中没有时打开完整字体光栅化并追加到文件"""
+        glyph = self._glyphs.get(ch)
+        if glyph is not None:
+            return glyph
+
+        if self._face is None:
+            logger.debug(f"字形图集缺少字形，加载字体: {self.path} ({self.size})")
+            self._face = self.loader(self.path, self.size)
+        glyph = self._rasterize(ch)
+        self._glyphs[ch] = glyph
+        self.added_glyphs += 1
+        self._append(ch, glyph)
+        return glyph
+
+    def _rasterize(self, ch):
+        """
+        用完整字体光栅化单个字形
+
+        PIL 按行首字形的包围盒平移整行，行中字形按位图偏移放置，两者可能相差 1 像素；
+        位图取行中的结果（前面放一个空格再裁掉），行首时的差异记录在 first_dx。
+        """
+        face = self._face
+        alone = render_text(ch, face)
+        prefix_px = int(round(face.getlength(_CONTEXT_PREFIX)))
+        ctx = render_text(_CONTEXT_PREFIX + ch, face)
+
+        left = min(0, alone.bbox[0])
+        x = ctx.origin[0] + prefix_px + left
+        image = ctx.image.crop((x, 0, max(x + 1, ctx.image.width), ctx.image.height))
+        origin = (-left, ctx.origin[1])
+
+        first_dx = 0
+        alone_ink = _first_ink_column(alone.image)
+        ctx_ink = _first_ink_column(image)
+        if alone_ink is not None and ctx_ink is not None:
+            first_dx = (alone_ink - alone.origin[0]) - (ctx_ink - origin[0])
+
+        advance = int(round(face.getlength(ch) * 64))
+        return _Glyph(image, alone.bbox, origin, first_dx, advance)
+
+    def _append(self, ch, glyph):
+        image = glyph.image
+        w, h = image.size
+        record = _RECORD.pack(ord(ch), *glyph.bbox, *glyph.origin, glyph.first_dx,
+                              w, h, glyph.advance)
+        try:
+            with open(self.atlas_path, "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.write(record + image.tobytes())
+        except OSError as e:
+            logger.debug(f"字形图集写入失败: {e}")
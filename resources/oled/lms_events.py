@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# resources/oled/lms_events.py
+#
+# LMS CLI 事件监听（端口 9090, subscribe）
+# 保持一条长连接，收到本播放器的 play/pause/newsong/mixer 等通知时
+# 标记状态为脏并唤醒主循环；连接断开时由调用方回退到轮询。
+# 空闲 HEARTBEAT_INTERVAL 秒后发送 "version ?" 心跳，再过一个间隔仍无任何数据
+# 视为连接已断开（半开连接：Wi-Fi 掉线、LMS 主机断电），以便及时回退到轮询。
+# mixer volume 通知另外立即回调 on_volume（不等主循环重新查询 status）。
+
+import logging
+import socket
+import threading
+from urllib.parse import quote, unquote
+
+import metrics
+import recorder
+
+logger = logging.getLogger(__name__)
+
+# 订阅的 CLI 通知类型
+SUBSCRIBE_COMMANDS = ("play", "pause", "stop", "playlist", "mixer", "power", "client")
+# 空闲多久发送一次心跳；心跳后同样时间内没有任何数据即判定断线（秒）
+HEARTBEAT_INTERVAL = 30.0
+
+
+def parse_notification(line):
+    """
+    解析一行 CLI 通知（空格分隔，每个字段 URL 编码）
+
+    Returns:
+        list: 解码后的字段列表，例如 ["00:04:20:aa:bb:cc", "playlist", "newsong", "Title", "3"]
+    """
+    return [unquote(part) for part in line.strip().split(" ") if part]
+
+
+class LMSEventListener:
+    """LMS CLI subscribe 长连接监听线程"""
+
+    def __init__(self, host_ip, cli_port, player_id, on_event=None, on_volume=None,
+                 reconnect_min=1.0, reconnect_max=60.0):
+        self.host_ip = host_ip
+        self.cli_port = int(cli_port)
+        self.player_id = player_id.lower()
+        self.on_event = on_event
+        self.on_volume = on_volume      # on_volume(value, relative)：relative 为 True 时 value 是增量
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+
+        self._connected = False
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._sock = None
+        self._thread = None
+
+    @property
+    def connected(self):
+        return self._connected
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lms-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def consume_dirty(self):
+        """若自上次调用以来收到过事件则返回 True 并清除标记"""
+        if self._dirty.is_set():
+            self._dirty.clear()
+            return True
+        return False
+
+    # -------------------------------
+    # 内部实现
+    # -------------------------------
+    def _run(self):
+        delay = self.reconnect_min
+        while not self._stop.is_set():
+            try:
+                self._session()
+                delay = self.reconnect_min
+            except OSError as e:
+                logger.debug(f"LMS CLI 连接失败: {self.host_ip}:{self.cli_port}, error={e}")
+            finally:
+                self._set_connected(False)
+
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+
+    def _session(self):
+        sock = socket.create_connection((self.host_ip, self.cli_port), timeout=5)
+        self._sock = sock
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.settimeout(HEARTBEAT_INTERVAL)
+            sock.sendall(("subscribe " + ",".join(SUBSCRIBE_COMMANDS) + "\n").encode())
+
+            self._set_connected(True)
+            # 连接建立期间可能错过事件，强制刷新一次
+            self._mark_dirty("connect")
+
+            buffer = b""
+            heartbeat_pending = False
+            while not self._stop.is_set():
+                try:
+                    chunk = sock.recv(4096)
+                except socket.timeout:
+                    if heartbeat_pending:
+                        logger.warning(f"LMS CLI 心跳超时，连接已断开: {self.host_ip}:{self.cli_port}")
+                        metrics.inc("lms.heartbeat_timeouts")
+                        return
+                    sock.sendall(b"version ?\n")
+                    heartbeat_pending = True
+                    continue
+                if not chunk:
+                    return
+                # 任何数据（通知或心跳回复）都说明连接仍然存活
+                heartbeat_pending = False
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for raw in lines:
+                    self._handle_line(raw.decode("utf-8", errors="ignore") + "\n")
+        finally:
+            self._sock = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _handle_line(self, line):
+        recorder.record("lms-cli", None, line)
+        parts = parse_notification(line)
+        if len(parts) < 2:
+            return
+        if parts[0] == "subscribe":
+            logger.info(f"LMS CLI 已订阅: {self.host_ip}:{self.cli_port}")
+            return
+        if parts[0] == "version":
+            # 心跳回复
+            return
+        if parts[0].lower() != self.player_id:
+            return
+        logger.debug(f"LMS 事件: {' '.join(parts[1:])}")
+        metrics.inc("lms.events")
+        if parts[1] == "mixer" and len(parts) > 3 and parts[2] == "volume":
+            self._report_volume(parts[3])
+        self._mark_dirty(parts[1])
+
+    def _report_volume(self, value):
+        """mixer volume 的值可能是绝对值（45），也可能是原样转发的相对调整（+5 / -5）"""
+        if not self.on_volume:
+            return
+        try:
+            volume = int(float(value))
+        except ValueError:
+            return
+        try:
+            self.on_volume(volume, value[:1] in "+-")
+        except Exception as e:
+            logger.warning(f"LMS 音量回调失败: {e}")
+
+    def _mark_dirty(self, kind):
+        self._dirty.set()
+        if self.on_event:
+            try:
+                self.on_event(kind)
+            except Exception as e:
+                logger.warning(f"LMS 事件回调失败: {e}")
+
+    def _set_connected(self, value):
+        if value != self._connected:
+            self._connected = value
+            if value:
+                logger.info("LMS 事件连接已建立，停止轮询")
+            else:
+                logger.warning("LMS 事件连接断开，回退到轮询")
+
+
+def format_notification(player_id, *fields):
+    """生成一行 CLI 通知（供测试用的假服务器使用）"""
+    return " ".join(quote(str(f), safe="") for f in (player_id,) + fields) + "\n"
@@ -1,21 +1,26 @@
 #!/usr/bin/env python
 # resources/oled/main.py (修复版 - 支持配置化日志级别)
+#
+# 启动顺序以尽快出现第一帧为目标：配置 -> OLED + 启动画面 -> 其余后端。
+# 音源查询 (requests 等) 相关模块在启动画面之后才导入。
 
 import time
+_BOOT_START = time.perf_counter()   # 启动计时起点（其他导入之前）
+
 import sys 
 import logging
+import functools
 
 from config import load_config
-from display import init_display, display_text
-from query import setup_pactl_env, get_high_priority_source, init_airplay_pipe
-from screensaver import ScreenSaver
-
-# 引入新的状态处理器
-from state_handlers import (
-    handle_airplay_state, 
-    handle_bluetooth_state, 
-    handle_lms_or_idle_state
-)
+from display import init_display, display_text, show_screen, get_first_frame_time, show_volume_popup
+from event_loop import EventLoop
+import metrics
+import recorder
+import screen_state
+from screen_state import ScreenState
+import status
+import volume_popup
+import wakeup
 
 # ============================================
 # 初始化日志配置（临时使用 INFO 级别）
@@ -27,7 +32,161 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Main")
 
+# 仍有后端处于轮询回退时的刷新间隔（秒）
+POLL_INTERVAL = 1.0
+# 所有后端都由事件驱动时的兜底刷新间隔（秒）
+IDLE_POLL_INTERVAL = 10.0
+
+class StartupTimer:
+    """启动阶段计时：mark() 记录上一阶段的耗时，summary() 输出一行分解"""
+
+    def __init__(self, start):
+        self.start = start
+        self._last = start
+        self.stages = []    # [(name, seconds), ...]
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.stages.append((name, now - self._last))
+        self._last = now
+
+    def elapsed(self, t=None):
+        return (time.perf_counter() if t is None else t) - self.start
+
+    def summary(self):
+        return " | ".join(f"{name} {sec * 1000:.0f}ms" for name, sec in self.stages)
+
+startup = StartupTimer(_BOOT_START)
+
+class StateTicker:
+    """
+    一次状态评估：音源仲裁 -> 状态处理器 -> 音量弹窗 -> 屏保 -> 刷新屏幕 -> 发布状态
+
+    主循环每个 tick 调用一次 tick()；回放驱动 (test/replay.py) 用同一个对象重放录制的后端输入。
+    """
+
+    def __init__(self, cfg, display_ctx, pactl_env, screen_saver):
+        # 与音源查询相关的模块较慢，只在启动画面之后导入
+        import state_handlers
+        from query import get_backend_health
+
+        self.cfg = cfg
+        self.display_ctx = display_ctx
+        self.pactl_env = pactl_env
+        self.screen_saver = screen_saver
+        # 将 LMS 参数打包成字典，方便传给状态处理器
+        self.lms_params = {
+            "host_ip": cfg["lms"]["host_ip"],
+            "host_port": cfg["lms"]["host_port"],
+            "player_id": cfg["lms"]["player_id"]
+        }
+        self._handlers = state_handlers
+        self._get_backend_health = get_backend_health
+
+        self.last_state_key = None
+        self.last_screen = None         # 上一次投递的 ScreenState
+        self.last_known_volume = -1
+        self.active_player_type = None  # 记录当前是谁在占用 (airplay/bluetooth/squeezelite)
+        self.is_media_active = False
+
+    def tick(self):
+        """
+        Returns:
+            PlayerState: 本次评估得到的状态
+        """
+        handlers = self._handlers
+        cfg_display = self.cfg["display"]
+        screen_saver = self.screen_saver
+        handlers.begin_probe_tick()
+
+        # 4.1 获取高优先级音源 (AirPlay / Bluetooth)
+        hi_priority_source, source_status = handlers.get_active_source(self.pactl_env)
+
+        # 4.2 根据源类型分发处理 (策略模式)
+        if hi_priority_source == "airplay":
+            current_state = handlers.handle_airplay_state(
+                self.pactl_env, source_status, self.last_known_volume, cfg_display
+            )
+
+        elif hi_priority_source == "bluetooth":
+            current_state = handlers.handle_bluetooth_state(
+                self.pactl_env, source_status, self.last_known_volume, cfg_display
+            )
+
+        else:
+            # Squeezelite 或 空闲
+            current_state = handlers.handle_lms_or_idle_state(
+                self.pactl_env, self.lms_params, self.active_player_type,
+                self.last_known_volume, cfg_display
+            )
+
+        # 更新全局状态记录
+        self.active_player_type = current_state.active_player_type
+
+        # 4.3 音量弹窗
+        # 后端的音量事件已直接弹出（见 volume_popup），这里只告知当前画面的音量通道，
+        # 并把本次查询到的音量交给弹窗（没有事件源、只能轮询时的回退）
+        real_current_volume = current_state.volume
+        channel = current_state.volume_channel
+
+        # 暂停时不弹出音量；只把确实来自该通道的本次查询结果交给弹窗
+        # （音量 < 0 表示本 tick 没取到：保留通道以便事件继续弹出，但不用借来的旧值比较）
+        if current_state.is_paused or channel is None:
+            volume_popup.track(None)
+        elif real_current_volume >= 0:
+            volume_popup.track(channel, real_current_volume)
+            self.last_known_volume = real_current_volume
+        else:
+            volume_popup.track(channel)
+        show_volume = volume_popup.consume_activity()
+
+        # 期望画面（音量条由合成线程按弹窗叠加，不随画面请求传递）与上一次的区域差分
+        screen = ScreenState.from_player(current_state)
+        regions = screen_state.diff(self.last_screen, screen)
+
+        # 4.4 屏保管理
+        # 如果有新的弹窗、状态改变、或者顶部 / 标题内容改变（时钟走字除外），则唤醒屏幕
+        if show_volume or \
+           current_state.key != self.last_state_key or \
+           regions & (screen_state.TOP | screen_state.BOTTOM) and not current_state.is_clock:
+            screen_saver.wake()
+
+        # 🆕 确定媒体是否活跃 (播放、暂停状态)
+        # 只要有播放器占用 (active_player_type 不是 None)，即视为活跃状态，阻止息屏。
+        self.is_media_active = self.active_player_type is not None
+
+        # 传递媒体状态给 tick，仅在媒体非活跃状态 (停止/空闲) 下才允许息屏
+        screen_saver.tick(self.is_media_active)
+
+        # 4.5 刷新屏幕
+        # 仅当有区域变化时投递（时钟走字属于 CLOCK 区域），合成线程只更新变化的区域
+        if regions:
+            show_screen(self.display_ctx, screen)
+            self.last_screen = screen
+        else:
+            metrics.inc("main.refresh_skipped")
+        self.last_state_key = current_state.key
+
+        # 4.6 发布状态快照（供 /status 端点读取）
+        status.publish({
+            "source": self.active_player_type or "idle",
+            "player": {
+                "top_text": current_state.top_text,
+                "bottom_text": current_state.bottom_text,
+                "is_paused": current_state.is_paused,
+                "is_clock": current_state.is_clock,
+                "has_artwork": current_state.artwork is not None,
+            },
+            "volume": real_current_volume,
+            "volume_popup": volume_popup.is_visible(),
+            "screensaver": screen_saver.get_state(),
+            "backends": self._get_backend_health(),
+            "updated": time.time(),
+        })
+        return current_state
+
 def main():
+    startup.mark("imports")
     try:
         # ============================================
         # 1. 加载配置
@@ -40,15 +199,10 @@ def main():
         
         logger.info(f"日志级别已设置为: {logging.getLevelName(log_level)}")
         
-        # 将 LMS 参数打包成字典，方便后续传递
-        lms_params = {
-            "host_ip": cfg["lms"]["host_ip"],
-            "host_port": cfg["lms"]["host_port"],
-            "player_id": cfg["lms"]["player_id"]
-        }
+        startup.mark("config")
         
         # ============================================
-        # 2. 初始化环境
+        # 2. OLED + 启动画面（其余初始化期间屏幕已有内容）
         # ============================================
         display_ctx = init_display(
             port=cfg["oled"]["bus"],
@@ -57,15 +211,55 @@ def main():
             h=cfg["oled"]["height"],
             display_config=cfg["display"]
         )
+        startup.mark("display")
+        display_text(display_ctx, "System", "Ready", large_font=True)
+        # 音量事件直接交给合成线程弹出，不经过主循环
+        volume_popup.configure(
+            functools.partial(show_volume_popup, display_ctx),
+            cfg["volume"]["popup_duration"]
+        )
+        
+        # ============================================
+        # 3. 初始化后端
+        # ============================================
+        from query import (
+            setup_pactl_env, init_airplay_pipe,
+            start_lms_listener, start_bluez_client, start_pulse_monitor, start_artwork,
+            open_airplay_pipe, pump_airplay_pipe, is_airplay_pipe_selectable, is_event_driven
+        )
+        from screensaver import ScreenSaver
+        from state_handlers import configure_probes
+        startup.mark("backend_imports")
         
+        # 录制在后端启动之前开始，不漏掉初始查询
+        recorder.start(cfg["capture"]["path"], cfg["capture"]["max_mb"] * 1024 * 1024)
         pactl_env = setup_pactl_env()
+        start_pulse_monitor(pactl_env)
         init_airplay_pipe(cfg["airplay"]["metadata_pipe"])
         
+        if cfg["lms"]["lms_events"]:
+            start_lms_listener(
+                cfg["lms"]["host_ip"], cfg["lms"]["cli_port"], cfg["lms"]["player_id"]
+            )
+        start_bluez_client(cfg["bluetooth"]["dbus_bus"])
+        if cfg["artwork"]["enabled"]:
+            start_artwork(
+                cfg["artwork"]["cache_dir"],
+                cfg["artwork"]["cache_kb"] * 1024,
+                cfg["artwork"]["size"]
+            )
+        metrics.start_server(cfg["metrics"]["port"])
+        metrics.start_unix_server(cfg["metrics"]["socket"])
+        metrics.start_summary_log(cfg["metrics"]["summary_interval"])
+        configure_probes(cfg["probe"]["workers"], cfg["probe"]["tick_budget_ms"] / 1000.0)
+        
         screen_saver = ScreenSaver(
             display_ctx,
             dim_timeout=cfg["screensaver"]["dim_timeout"],
             off_timeout=cfg["screensaver"]["off_timeout"]
         )
+        ticker = StateTicker(cfg, display_ctx, pactl_env, screen_saver)
+        startup.mark("backends")
         
         logger.info("System Ready")
         
@@ -74,101 +268,47 @@ def main():
         sys.exit(1)
 
     # ============================================
-    # 3. 主循环变量
+    # 4. 主循环
     # ============================================
-    last_state_key = None
-    last_content_signature = None 
-    last_display_args = None      
-    
-    last_known_volume = -1
-    volume_popup_start = 0
-    active_player_type = None # 记录当前是谁在占用 (airplay/bluetooth/squeezelite)
-
-    # 显示启动画面
-    display_text(display_ctx, "System", "Ready", large_font=True)
-    time.sleep(1)
+    first_tick = True
+
+    # 事件循环：wakeup self-pipe + AirPlay 管道 + 定时器
+    loop = EventLoop()
+    loop.add_reader(wakeup.fileno(), wakeup.drain)
+
+    def on_airplay_pipe():
+        updated = pump_airplay_pipe()
+        if not is_airplay_pipe_selectable():
+            # 读取出错，管道已关闭
+            loop.remove_reader(pipe_fd)
+        return updated
 
     while True:
         try:
-            # 3.1 获取高优先级音源 (AirPlay / Bluetooth)
-            hi_priority_source, source_status = get_high_priority_source(pactl_env)
-            
-            current_state = None
-
-            # 3.2 根据源类型分发处理 (策略模式)
-            if hi_priority_source == "airplay":
-                current_state = handle_airplay_state(
-                    pactl_env, source_status, last_known_volume, cfg["display"]
-                )
-            
-            elif hi_priority_source == "bluetooth":
-                current_state = handle_bluetooth_state(
-                    pactl_env, source_status, last_known_volume, cfg["display"]
-                )
-            
-            else:
-                # Squeezelite 或 空闲
-                current_state = handle_lms_or_idle_state(
-                    pactl_env, lms_params, active_player_type, last_known_volume, cfg["display"]
-                )
-
-            # 更新全局状态记录
-            active_player_type = current_state.active_player_type
-
-            # 3.3 音量弹窗逻辑
-            real_current_volume = current_state.volume
-            show_volume = False
-            
-            # 如果不在暂停状态且有有效音量，则进行音量变化检测
-            if not current_state.is_paused and real_current_volume >= 0:
-                if real_current_volume != last_known_volume:
-                    if last_known_volume != -1: # 忽略首次启动的跳变
-                        volume_popup_start = time.time()
-                    last_known_volume = real_current_volume
-                
-                # 检查弹窗是否超时
-                if time.time() - volume_popup_start < cfg["volume"]["popup_duration"]:
-                    show_volume = True
-            
-            # 决定最终传递给 display 的音量参数
-            final_volume = real_current_volume if show_volume else None
-            
-            # 组装显示参数
-            display_args = (
-                current_state.top_text,
-                current_state.bottom_text,
-                current_state.large_font,
-                current_state.scroll_speed,
-                current_state.is_clock,
-                final_volume,
-                current_state.align_mode
-            )
+            tick_start = time.perf_counter()
+
+            # 管道由 shairport-sync 创建，可能晚于本服务出现
+            pipe_fd = open_airplay_pipe()
+            if pipe_fd is not None and not loop.has_reader(pipe_fd) and is_airplay_pipe_selectable():
+                loop.add_reader(pipe_fd, on_airplay_pipe)
+
+            current_state = ticker.tick()
+            metrics.observe("main.tick", time.perf_counter() - tick_start)
+
+            if first_tick:
+                first_tick = False
+                _log_startup()
 
-            # 3.4 屏保管理
-            # 如果有弹窗、或者内容/状态发生改变，则唤醒屏幕
-            if show_volume or \
-               current_state.key != last_state_key or \
-               current_state.signature != last_content_signature:
-                screen_saver.wake()
-            
-            # 🆕 确定媒体是否活跃 (播放、暂停状态)
-            # 只要有播放器占用 (active_player_type 不是 None)，即视为活跃状态，阻止息屏。
-            is_media_active = active_player_type is not None
-
-            # 传递媒体状态给 tick，仅在媒体非活跃状态 (停止/空闲) 下才允许息屏
-            screen_saver.tick(is_media_active)
-
-            # 3.5 刷新屏幕
-            # 仅当参数变化或处于时钟模式（每秒刷新）时调用 display_text
-            should_refresh = (display_args != last_display_args) or (current_state.is_clock)
-            
-            if should_refresh:
-                display_text(display_ctx, *display_args)
-                last_display_args = display_args
-                last_state_key = current_state.key
-                last_content_signature = current_state.signature
-
-            time.sleep(1)
+            # 设置定时器并等待下一个事件
+            # 只有 fd 事件或定时器到期时才重新评估状态
+            now = time.time()
+            loop.set_timer("poll", IDLE_POLL_INTERVAL if is_event_driven() else POLL_INTERVAL)
+            loop.set_timer("clock", (1.0 - now % 1.0) if current_state.is_clock else None)
+            loop.set_timer("screensaver", screen_saver.next_deadline(ticker.is_media_active))
+
+            changed, fired = False, set()
+            while not (changed or fired):
+                changed, fired = loop.run_once()
 
         except KeyboardInterrupt:
             break
@@ -176,5 +316,19 @@ def main():
             logger.error(f"Main Loop Error: {e}")
             time.sleep(5)
 
+    recorder.stop()
+
+def _log_startup():
+    """第一个状态画面提交后输出启动耗时分解"""
+    startup.mark("first_tick")
+    first_frame = get_first_frame_time()
+    first_frame_ms = startup.elapsed(first_frame) * 1000 if first_frame else -1
+    first_state_ms = startup.elapsed() * 1000
+    metrics.set_gauge("startup.first_frame_ms", round(first_frame_ms, 1))
+    metrics.set_gauge("startup.first_state_ms", round(first_state_ms, 1))
+    logger.info(
+        f"启动耗时: 首帧 {first_frame_ms:.0f}ms, 首个状态 {first_state_ms:.0f}ms ({startup.summary()})"
+    )
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# resources/oled/metrics.py
+#
+# 热路径指标：计数器 + 仪表 + 延迟直方图
+#
+#   metrics.inc("display.frames")
+#   metrics.set_gauge("lms.breaker.open", 1)
+#   with metrics.timed("lms.http"): ...        # 也可作为装饰器
+#
+# timed() 记录耗时，异常时额外累加 <name>.timeouts（各类 Timeout 异常）或 <name>.errors。
+# 指标通过本地回环 HTTP 端点（GET /metrics，JSON，也可选 Unix socket）查看，并周期性输出一行摘要日志，
+# 无需打开 DEBUG 日志即可在设备上发现性能回退。
+
+import bisect
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 直方图桶上界（毫秒），最后一个桶为 +inf
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_start_time = time.monotonic()
+_endpoints = {}
+_server = None
+_unix_server = None
+_summary_thread = None
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets", "window_max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.window_max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        if ms > self.window_max:
+            self.window_max = ms
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+
+def _percentile(buckets, count, p):
+    """按桶估计分位数（返回所在桶的上界，毫秒）"""
+    if count == 0:
+        return 0.0
+    target = p / 100.0 * count
+    cumulative = 0
+    for i, n in enumerate(buckets):
+        cumulative += n
+        if cumulative >= target:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else float("inf")
+    return float("inf")
+
+
+# ============================================
+# 记录
+# ============================================
+def inc(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, seconds):
+    ms = seconds * 1000.0
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = _Histogram()
+        hist.add(ms)
+
+
+class timed(contextlib.ContextDecorator):
+    """计时上下文管理器 / 装饰器"""
+
+    def __init__(self, name):
+        self.name = name
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self._local.start)
+        if exc_type is not None:
+            if "Timeout" in exc_type.__name__:
+                inc(self.name + ".timeouts")
+            else:
+                inc(self.name + ".errors")
+        return False
+
+
+# ============================================
+# 读取
+# ============================================
+def snapshot():
+    """所有指标的当前值（可 JSON 序列化）"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {}
+        for name, hist in _histograms.items():
+            histograms[name] = {
+                "count": hist.count,
+                "avg_ms": round(hist.total / hist.count, 3) if hist.count else 0.0,
+                "max_ms": round(hist.max, 3),
+                "p50_ms": _percentile(hist.buckets, hist.count, 50),
+                "p90_ms": _percentile(hist.buckets, hist.count, 90),
+                "p99_ms": _percentile(hist.buckets, hist.count, 99),
+                "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["inf"], hist.buckets)),
+            }
+    return {
+        "uptime_s": round(time.monotonic() - _start_time, 1),
+        "counters": counters,
+        "gauges": gauges,
+        "histograms": histograms,
+    }
+
+
+_last_summary = None
+
+
+def summary_line():
+    """
+    自上次调用以来的增量摘要（一行）
+
+    直方图输出 n/avg/p99/max，计数器输出增量，仪表输出当前值；没有变化的指标省略。
+    """
+    global _last_summary
+    now = time.monotonic()
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        hists = {}
+        for name, h in _histograms.items():
+            hists[name] = (h.count, h.total, list(h.buckets), h.window_max)
+            h.window_max = 0.0
+
+    prev_time, prev_counters, prev_gauges, prev_hists = _last_summary or (_start_time, {}, {}, {})
+    _last_summary = (now, counters, gauges, hists)
+
+    parts = []
+    for name in sorted(hists):
+        count, total, buckets, window_max = hists[name]
+        p_count, p_total, p_buckets, _ = prev_hists.get(name, (0, 0.0, [0] * len(buckets), 0.0))
+        n = count - p_count
+        if n <= 0:
+            continue
+        delta = [a - b for a, b in zip(buckets, p_buckets)]
+        p99 = _percentile(delta, n, 99)
+        parts.append(
+            f"{name} n={n} avg={(total - p_total) / n:.2f}ms p99<={p99:g}ms max={window_max:.1f}ms"
+        )
+    for name in sorted(counters):
+        delta = counters[name] - prev_counters.get(name, 0)
+        if delta:
+            parts.append(f"{name}=+{delta}")
+    for name in sorted(gauges):
+        if gauges[name] != prev_gauges.get(name):
+            parts.append(f"{name}={gauges[name]}")
+
+    window = now - prev_time
+    return f"指标 ({window:.0f}s): " + (" | ".join(parts) if parts else "无变化")
+
+
+# ============================================
+# 输出：回环 HTTP 端点 + 周期摘要日志
+# ============================================
+def register_endpoint(path, handler):
+    """注册额外的 GET 端点，handler() 返回可 JSON 序列化的对象"""
+    _endpoints[path] = handler
+
+
+register_endpoint("/metrics", snapshot)
+
+
+def _make_handler():
+    # http.server 导入较慢，只在启动服务时导入（不拖慢启动首帧）
+    import http.server
+    import socketserver
+
+    class _Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            handler = _endpoints.get(self.path.split("?", 1)[0].rstrip("/") or "/metrics")
+            if handler is None:
+                self.send_error(404)
+                return
+            try:
+                body = json.dumps(handler(), ensure_ascii=False, indent=1).encode()
+                self.send_response(200)
+            except Exception as e:
+                body = json.dumps({"error": str(e)}).encode()
+                self.send_response(500)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        def get_request(self):
+            # Unix socket 的客户端地址为空字符串，BaseHTTPRequestHandler 需要 (host, port)
+            request, _ = super().get_request()
+            return request, ("local", 0)
+
+    return http.server.ThreadingHTTPServer, _UnixServer, _Handler
+
+
+def start_server(port, host="127.0.0.1"):
+    """在回环地址上启动指标 HTTP 服务（port=0 时不启动）"""
+    global _server
+    if _server is not None or not port:
+        return _server
+    server_class, _, handler_class = _make_handler()
+    try:
+        _server = server_class((host, port), handler_class)
+    except OSError as e:
+        logger.warning(f"指标服务启动失败 ({host}:{port}): {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"指标服务已启动: http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def start_unix_server(path):
+    """
+    在 Unix socket 上提供同样的端点（path 为空时不启动）
+
+    只有能访问该路径的本机用户可以读取，不占用端口:
+        curl --unix-socket <path> http://localhost/status
+    """
+    global _unix_server
+    if _unix_server is not None or not path:
+        return _unix_server
+    _, server_class, handler_class = _make_handler()
+    try:
+        if os.path.exists(path):
+            os.remove(path)    # 上次运行残留的 socket 文件
+        _unix_server = server_class(path, handler_class)
+    except OSError as e:
+        logger.warning(f"指标 Unix socket 启动失败 ({path}): {e}")
+        return None
+    _unix_server.daemon_threads = True
+    threading.Thread(target=_unix_server.serve_forever, name="metrics-unix", daemon=True).start()
+    logger.info(f"指标 Unix socket 已启动: {path}")
+    return _unix_server
+
+
+def start_summary_log(interval):
+    """每 interval 秒输出一行指标摘要（interval<=0 时不启动）"""
+    global _summary_thread
+    if _summary_thread is not None or interval <= 0:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                logger.info(summary_line())
+            except Exception as e:
+                logger.warning(f"指标摘要失败: {e}")
+
+    _summary_thread = threading.Thread(target=run, name="metrics-summary", daemon=True)
+    _summary_thread.start()
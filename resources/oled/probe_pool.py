@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# resources/oled/probe_pool.py
+#
+# 并发音源探测 + 每个 tick 的时间预算
+#
+# 状态处理器在 tick 开始时一次性提交本次需要的所有探测（蓝牙元数据、LMS 状态、
+# 蓝牙连接等），它们在小线程池中并发执行；取结果时最多等到本 tick 的截止时间。
+# 超时未返回的探测继续在后台运行，本 tick 使用上一次的结果；结果到达后唤醒主循环，
+# 下一个 tick 直接取用。每个名称同时只有一个探测在执行，慢后端不会堆积线程。
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import metrics
+import wakeup
+
+logger = logging.getLogger(__name__)
+
+
+class ProbePool:
+    """按名称去重的探测线程池"""
+
+    def __init__(self, workers=4, budget=0.25, on_late_result=wakeup.notify):
+        self.budget = budget
+        self.on_late_result = on_late_result
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+        self._lock = threading.Lock()
+        self._inflight = {}   # name -> future
+        self._last = {}       # name -> 最近一次成功的结果
+        self._deadline = time.monotonic() + budget
+
+    def begin_tick(self):
+        """开始一个新 tick：本 tick 内所有 result() 共享同一个截止时间"""
+        self._deadline = time.monotonic() + self.budget
+
+    def submit(self, name, fn, *args):
+        """
+        提交探测（同名探测仍在执行时不重复提交）
+
+        上一个 tick 超时、之后才完成的结果在这里被收下，作为本 tick 的回退值。
+        """
+        with self._lock:
+            future = self._inflight.get(name)
+            if future is not None:
+                if not future.done():
+                    return
+                self._harvest(name, future)
+            deadline = self._deadline
+            future = self._executor.submit(self._run, name, fn, args)
+            self._inflight[name] = future
+        future.add_done_callback(lambda f, d=deadline: self._on_done(d))
+
+    def result(self, name, default=None):
+        """
+        取探测结果，最多等到本 tick 截止时间
+
+        Returns:
+            本次结果；超时或失败时返回上一次的结果（没有则返回 default）
+        """
+        with self._lock:
+            future = self._inflight.get(name)
+        if future is not None:
+            timeout = max(0.0, self._deadline - time.monotonic())
+            try:
+                value = future.result(timeout=timeout)
+            except FutureTimeout:
+                metrics.inc("probe.late")
+                logger.debug(f"探测 {name} 超出本 tick 预算，使用上一次结果")
+            except Exception as e:
+                logger.debug(f"探测 {name} 失败: {e}")
+                with self._lock:
+                    if self._inflight.get(name) is future:
+                        del self._inflight[name]
+            else:
+                with self._lock:
+                    self._last[name] = value
+                    if self._inflight.get(name) is future:
+                        del self._inflight[name]
+                return value
+        with self._lock:
+            return self._last.get(name, default)
+
+    def probe(self, name, fn, *args, default=None):
+        """提交并等待单个探测"""
+        self.submit(name, fn, *args)
+        return self.result(name, default)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -------------------------------
+    # 内部
+    # -------------------------------
+    @staticmethod
+    def _run(name, fn, args):
+        with metrics.timed(f"probe.{name}"):
+            return fn(*args)
+
+    def _harvest(self, name, future):
+        """收下已完成的迟到结果（调用方持有锁）"""
+        try:
+            self._last[name] = future.result(timeout=0)
+        except Exception:
+            pass
+
+    def _on_done(self, deadline):
+        # 超过提交时的截止时间才完成：本 tick 已用旧值，唤醒主循环以便尽快使用新结果
+        if time.monotonic() > deadline and self.on_late_result:
+            try:
+                self.on_late_result()
+            except Exception as e:
+                logger.warning(f"探测结果回调失败: {e}")
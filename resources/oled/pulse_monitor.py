@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# resources/oled/pulse_monitor.py
+#
+# PipeWire/Pulse 事件订阅（pactl subscribe 长进程）
+# 在内存中维护 sink-input / sink / 默认 sink 音量索引：
+#   - sink-input 新增/变化: 重新列出 sink-inputs（同一批事件合并为一次）
+#   - sink-input 删除: 直接从索引中移除，无需 fork
+#   - sink 新增/删除: 重新检查蓝牙 sink
+#   - sink/server 变化: 重新读取默认 sink 音量（变化时立即回调 on_volume）
+# 音源仲裁、蓝牙连接检查、音量读取因此变为 O(1) 的内存查询。
+
+import logging
+import os
+import re
+import selectors
+import subprocess
+import threading
+import time
+
+import metrics
+import recorder
+
+logger = logging.getLogger(__name__)
+
+_EVENT_RE = re.compile(r"Event '(\w+)' on ([\w-]+) #(\d+)")
+
+# 一批事件的合并窗口（秒）：窗口内的连续事件只触发一次刷新
+COALESCE_WINDOW = 0.02
+# 持续有事件时最长延迟刷新时间（秒）
+COALESCE_MAX = 0.1
+
+
+# ============================================
+# pactl 输出解析
+# ============================================
+def parse_sink_inputs(output):
+    """
+    解析 `pactl list sink-inputs` 输出
+
+    Returns:
+        dict: {index: (kind, corked)}，kind 为 "airplay" / "bluetooth" / None，
+              corked 为 True / False（无 Corked 字段时为 None）
+    """
+    inputs = {}
+    for block in output.split("Sink Input #")[1:]:
+        head, _, _ = block.partition("\n")
+        try:
+            index = int(head.strip())
+        except ValueError:
+            continue
+        text = block.lower()
+        if "shairport" in text:
+            kind = "airplay"
+        elif "bluez" in text:
+            kind = "bluetooth"
+        else:
+            kind = None
+        if "corked: no" in text:
+            corked = False
+        elif "corked: yes" in text:
+            corked = True
+        else:
+            corked = None
+        inputs[index] = (kind, corked)
+    return inputs
+
+
+def pick_high_priority_source(sink_inputs):
+    """
+    按原有优先级从 sink-input 索引中选出高优先级音源
+
+    Returns: (source_type, status)
+    """
+    ordered = [sink_inputs[i] for i in sorted(sink_inputs)]
+    for kind, corked in ordered:
+        if kind and corked is False:
+            return kind, "playing"
+    for kind, corked in ordered:
+        if kind and corked is True:
+            return kind, "paused"
+    return None, "stopped"
+
+
+def parse_volume(output):
+    m = re.search(r"(\d+)%", output)
+    if m:
+        return max(0, min(100, int(m.group(1))))
+    return 0
+
+
+# ============================================
+# 订阅线程
+# ============================================
+class PulseMonitor:
+    """pactl subscribe 监听线程 + 内存索引"""
+
+    def __init__(self, pactl_env, on_change=None, on_volume=None, retry_interval=5.0):
+        self.env = pactl_env
+        self.on_change = on_change
+        self.on_volume = on_volume      # on_volume(percent)：默认 sink 音量变化时立即调用
+        self.retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._sink_inputs = {}
+        self._bt_connected = False
+        self._volume = 0
+        self._high_priority = (None, "stopped")
+        self._last_snapshot = None
+
+        self._ready = False
+        self._stop = threading.Event()
+        self._proc = None
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pactl-subscribe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        proc = self._proc
+        if proc is not None:
+            proc.terminate()
+        if self._thread:
+            self._thread.join(timeout=3)
+
+    # -------------------------------
+    # O(1) 查询
+    # -------------------------------
+    def get_high_priority_source(self):
+        return self._high_priority
+
+    def is_bluetooth_connected(self):
+        return self._bt_connected
+
+    def get_volume(self):
+        return self._volume
+
+    # -------------------------------
+    # 后台线程
+    # -------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._session()
+            except Exception as e:
+                logger.warning(f"pactl subscribe 异常: {e}")
+            self._set_ready(False)
+            self._stop.wait(self.retry_interval)
+
+    def _session(self):
+        proc = subprocess.Popen(
+            ["pactl", "subscribe"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=self.env,
+        )
+        self._proc = proc
+        fd = proc.stdout.fileno()
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        try:
+            # 先订阅再全量读取，避免漏掉两者之间的事件
+            self._refresh({"sink-input", "sink", "volume"})
+            self._set_ready(True)
+
+            pending = b""
+            dirty = set()
+            dirty_since = 0.0
+            while not self._stop.is_set():
+                # 有未处理事件时只等待合并窗口，否则最多等 1 秒检查 stop 标记
+                timeout = COALESCE_WINDOW if dirty else 1.0
+                ready = sel.select(timeout)
+                if dirty and (not ready or time.monotonic() - dirty_since >= COALESCE_MAX):
+                    self._refresh(dirty)
+                    dirty = set()
+                if not ready:
+                    continue
+
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    raise RuntimeError(f"pactl subscribe 已退出 (code={proc.poll()})")
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    if not dirty:
+                        dirty_since = time.monotonic()
+                    self._handle_event(line.decode("utf-8", errors="ignore"), dirty)
+        finally:
+            sel.close()
+            self._proc = None
+            if proc.poll() is None:
+                proc.terminate()
+            try:
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def _handle_event(self, line, dirty):
+        recorder.record("pactl-event", None, line)
+        m = _EVENT_RE.search(line)
+        if not m:
+            return
+        event, facility, index = m.group(1), m.group(2), int(m.group(3))
+        if facility == "sink-input":
+            if event == "remove":
+                with self._lock:
+                    removed = self._sink_inputs.pop(index, None) is not None
+                if removed:
+                    self._update_derived()
+            else:
+                dirty.add("sink-input")
+        elif facility == "sink":
+            dirty.add("volume")
+            if event in ("new", "remove"):
+                dirty.add("sink")
+        elif facility == "server":
+            # 默认 sink 切换
+            dirty.add("volume")
+            dirty.add("sink")
+
+    @metrics.timed("pactl.fork")
+    def _pactl(self, *args):
+        output = subprocess.run(
+            ["pactl", *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=self.env,
+            timeout=1,
+        ).stdout
+        recorder.record("pactl", " ".join(args), output)
+        return output
+
+    def _refresh(self, what):
+        volume_changed = False
+        try:
+            if "sink-input" in what:
+                inputs = parse_sink_inputs(self._pactl("list", "sink-inputs"))
+                with self._lock:
+                    self._sink_inputs = inputs
+            if "sink" in what:
+                self._bt_connected = "bluez_sink" in self._pactl("list", "sinks").lower()
+            if "volume" in what:
+                volume = parse_volume(self._pactl("get-sink-volume", "@DEFAULT_SINK@"))
+                volume_changed = volume != self._volume
+                self._volume = volume
+        except Exception as e:
+            logger.warning(f"pactl 刷新失败: {e}")
+        if volume_changed and self.on_volume:
+            try:
+                self.on_volume(self._volume)
+            except Exception as e:
+                logger.warning(f"pactl 音量回调失败: {e}")
+        self._update_derived()
+
+    def _update_derived(self):
+        with self._lock:
+            high = pick_high_priority_source(self._sink_inputs)
+        snapshot = (high, self._bt_connected, self._volume)
+        changed = snapshot != self._last_snapshot
+        self._high_priority = high
+        self._last_snapshot = snapshot
+        if changed and self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"pactl 变化回调失败: {e}")
+
+    def _set_ready(self, value):
+        if value != self._ready:
+            self._ready = value
+            logger.info(f"pactl 事件订阅{'已就绪' if value else '不可用，回退到轮询'}")
@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 # resources/oled/query.py (重构版 - 修复审核建议 #6)
-import base64
 import getpass
 import json
 import logging
@@ -8,10 +7,24 @@ import os
 import re
 import socket
 import subprocess
+import threading
 import time
 
 import requests
 
+import metrics
+import recorder
+import volume_popup
+import wakeup
+from circuit_breaker import CircuitBreaker
+from airplay_parser import (
+    AirplayMetadataParser, CODE_PICTURE, decode_text, prgr_to_seconds, pvol_to_percent
+)
+from artwork import ArtworkStore, content_key
+from bluez_client import HAS_JEEPNEY, BluezClient, BluezIndex, parse_managed_objects_text
+from lms_events import LMSEventListener
+from pulse_monitor import PulseMonitor, parse_sink_inputs, pick_high_priority_source, parse_volume
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,10 +34,34 @@ BT_VOLUME_MAX = 127  # Bluetooth A2DP volume range: 0-127
 # 全局状态
 # ============================================
 _AIRPLAY_PIPE = None
-_airplay_state = {"artist": "", "title": "", "volume": -1, "buffer": ""}
+_airplay_state = {"artist": "", "title": "", "volume": -1, "progress": None, "artwork": None}
+_airplay_parser = AirplayMetadataParser()
 _pipe_fd = None
-_bt_player_path = None
-_last_bt_volume = -1
+_pipe_hold_fd = None  # 自己持有的写端：无写者时读端不会持续返回 EOF，可放入 selector
+_bt_index = BluezIndex()   # dbus-send 回退路径的对象索引
+_bt_index_time = None
+_bt_index_lock = threading.Lock()
+_lms_session = None
+_lms_breaker = None
+_lms_breaker_url = None
+_lms_listener = None
+_lms_status_cache = None   # 最近一次成功的 status
+_lms_status_time = 0.0     # 上述 status 的获取时刻 (time.monotonic)
+_bluez_client = None
+_pulse_monitor = None
+_artwork_store = None
+
+# LMS status 查询标签: a=artist, d=duration, c=coverid
+LMS_STATUS_TAGS = "tags:adc"
+# LMS 熔断：连续失败的调用次数阈值（一次调用内的重试只算一次失败）、后台探测退避范围（秒）
+LMS_BREAKER_THRESHOLD = 3
+LMS_BREAKER_BACKOFF = (1.0, 60.0)
+# LMS 不可达时沿用上一次 status 的最长时间（秒），超过后按停止处理
+LMS_STALE_LIMIT = 300.0
+# dbus-send 回退路径重新加载 BlueZ 对象索引的间隔（秒）
+BT_INDEX_REFRESH = 10.0
+# AirPlay PICT 封面的单个 item 上限（字节，base64 编码后）
+AIRPLAY_PICTURE_MAX_BYTES = 1024 * 1024
 
 
 # ============================================
@@ -49,6 +86,37 @@ def init_airplay_pipe(pipe_path):
     logger.info(f"AirPlay 管道路径已设置: {_AIRPLAY_PIPE}")
 
 
+# ============================================
+# 后端状态
+# ============================================
+def is_event_driven():
+    """
+    所有后端是否都由事件驱动（LMS CLI、BlueZ D-Bus、pactl subscribe 均就绪）
+
+    为 True 时主循环无需每秒轮询。
+    """
+    return (_lms_listener is not None and _lms_listener.connected
+            and _bluez_client is not None and _bluez_client.ready
+            and _pulse_monitor is not None and _pulse_monitor.ready)
+
+
+def get_backend_health():
+    """
+    各后端的连接状态（只读取已有的标志，不发起任何请求）
+
+    值为 None 表示该后端未启用，False 表示已启用但当前回退到轮询 / 不可用。
+    """
+    return {
+        "event_driven": is_event_driven(),
+        "lms_events": _lms_listener.connected if _lms_listener is not None else None,
+        "lms_breaker_open": _lms_breaker.is_open if _lms_breaker is not None else None,
+        "bluez_dbus": _bluez_client.ready if _bluez_client is not None else None,
+        "pactl_subscribe": _pulse_monitor.ready if _pulse_monitor is not None else None,
+        "airplay_pipe": _pipe_fd is not None,
+        "artwork": _artwork_store.get_stats() if _artwork_store is not None else None,
+    }
+
+
 # ============================================
 # 基础网络/LMS
 # ============================================
@@ -61,30 +129,193 @@ def check_network(host, port):
         return False
 
 
+def _get_lms_session():
+    """返回复用连接池的 requests.Session（keep-alive，避免每次请求重新握手）"""
+    global _lms_session
+    if _lms_session is None:
+        _lms_session = requests.Session()
+        _lms_session.headers.update({'Content-Type': 'application/json'})
+    return _lms_session
+
+
+def _get_lms_breaker(url):
+    """
+    LMS 熔断器（按服务器地址创建）
+
+    熔断期间 get_player_status() 立即返回错误，后台用 serverstatus 探测恢复。
+    """
+    global _lms_breaker, _lms_breaker_url
+    if _lms_breaker is None or _lms_breaker_url != url:
+        if _lms_breaker is not None:
+            _lms_breaker.stop()
+
+        def probe():
+            # 与正常请求共用连接池（keep-alive / 代理设置一致）
+            response = _get_lms_session().post(
+                url,
+                json={"id": 1, "method": "slim.request", "params": ["", ["serverstatus", 0, 0]]},
+                timeout=1,
+            )
+            response.raise_for_status()
+
+        backoff_min, backoff_max = LMS_BREAKER_BACKOFF
+        _lms_breaker = CircuitBreaker(
+            "lms", probe,
+            failure_threshold=LMS_BREAKER_THRESHOLD,
+            backoff_min=backoff_min,
+            backoff_max=backoff_max,
+            on_close=wakeup.notify,
+        )
+        _lms_breaker_url = url
+    return _lms_breaker
+
+
 def get_player_status(cmd, host_ip, host_port, player_id, retries=3, delay=2):
+    """
+    LMS JSON-RPC 请求（带熔断和重试）
+
+    Returns:
+        tuple: (error, result)
+    """
+    error, result = _request_player_status(cmd, host_ip, host_port, player_id, retries)
+    recorder.record("lms", json.dumps(cmd), result, error)
+    return error, result
+
+
+def _request_player_status(cmd, host_ip, host_port, player_id, retries):
     url = f'http://{host_ip}:{host_port}/jsonrpc.js'
-    headers = {'Content-Type': 'application/json'}
     data = {"id": 1, "method": "slim.request", "params": [player_id, cmd]}
+    session = _get_lms_session()
+    breaker = _get_lms_breaker(url)
+
+    if not breaker.allow():
+        return "Error: LMS 不可达 (熔断中)", None
 
     for attempt in range(retries):
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=1)
-            response.raise_for_status()
-            return None, response.json()
+            with metrics.timed("lms.http"):
+                response = session.post(url, json=data, timeout=1)
+                response.raise_for_status()
+                result = response.json()
+            breaker.record_success()
+            return None, result
         except Exception as e:
             if attempt < retries - 1:
+                metrics.inc("lms.http.retries")
                 time.sleep(0.2)
             else:
+                # 重试全部失败才计一次失败
+                breaker.record_failure()
                 return f"Error: {e}", None
 
 
-def extract_result_field(result, field, default="N/A"):
+def parse_lms_status(result):
+    """
+    解析 LMS status 响应
+
+    Returns:
+        dict: {"mode", "title", "artist", "volume", "duration", "time", "coverid"}
+              缺失的字段为 None
+    """
+    status = {
+        "mode": None, "title": None, "artist": None,
+        "volume": None, "duration": None, "time": None, "coverid": None,
+    }
     if not isinstance(result, dict):
-        return default
-    result_dict = result.get('result', {})
-    if not isinstance(result_dict, dict):
-        return default
-    return result_dict.get(field, default)
+        return status
+    res = result.get('result')
+    if not isinstance(res, dict):
+        return status
+
+    status["mode"] = res.get("mode")
+    status["volume"] = res.get("mixer volume")
+    status["time"] = res.get("time")
+    status["duration"] = res.get("duration")
+
+    loop = res.get("playlist_loop")
+    track = loop[0] if isinstance(loop, list) and loop and isinstance(loop[0], dict) else {}
+    # 网络电台的标题在 current_title 中，本地曲目在 playlist_loop 中
+    status["title"] = track.get("title") or res.get("current_title")
+    status["artist"] = track.get("artist") or res.get("artist")
+    if status["duration"] is None:
+        status["duration"] = track.get("duration")
+    status["coverid"] = track.get("coverid")
+    return status
+
+
+def get_lms_status(host_ip, host_port, player_id, retries=3):
+    """
+    单次 JSON-RPC status 请求获取 mode/title/artist/volume/duration/time
+    （代替分别查询 mode、current_title、artist、mixer volume 的四次请求）
+
+    Returns:
+        tuple: (error, status_dict)
+    """
+    error, result = get_player_status(
+        ["status", "-", 1, LMS_STATUS_TAGS],
+        host_ip, host_port, player_id, retries=retries
+    )
+    if error:
+        return error, None
+    return None, parse_lms_status(result)
+
+
+def start_lms_listener(host_ip, cli_port, player_id):
+    """
+    启动 LMS CLI 事件监听（subscribe 长连接）
+
+    连接正常时 get_lms_status_cached() 只在收到事件后才发起 HTTP 请求，
+    连接断开时自动回退到每次轮询。
+    """
+    global _lms_listener
+    if _lms_listener is not None:
+        return _lms_listener
+    _lms_listener = LMSEventListener(
+        host_ip, cli_port, player_id,
+        on_event=lambda kind: wakeup.notify(),
+        on_volume=_on_lms_volume
+    )
+    _lms_listener.start()
+    logger.info(f"LMS 事件监听已启动: {host_ip}:{cli_port}")
+    return _lms_listener
+
+
+def _on_lms_volume(value, relative):
+    """LMS CLI mixer volume 通知：直接交给音量弹窗"""
+    if relative:
+        volume_popup.report_delta("lms", value)
+    else:
+        volume_popup.report("lms", value)
+
+
+def get_lms_status_cached(host_ip, host_port, player_id):
+    """
+    事件驱动的 LMS 状态查询
+
+    - 事件连接正常且无新事件：直接返回缓存（无网络请求）
+    - 收到事件 / 无缓存 / 连接断开：发起一次 status 请求
+    - 请求失败（含熔断中立即返回）：LMS_STALE_LIMIT 秒内沿用上一次 status，
+      并标记 unreachable=True，正在播放的曲目不会因为短暂不可达切到时钟
+
+    Returns:
+        tuple: (error, status_dict)
+    """
+    global _lms_status_cache, _lms_status_time
+    listener = _lms_listener
+    if (listener is not None and listener.connected
+            and _lms_status_cache is not None and not listener.consume_dirty()):
+        return None, _lms_status_cache
+
+    error, status = get_lms_status(host_ip, host_port, player_id)
+    if error is None:
+        _lms_status_cache = status
+        _lms_status_time = time.monotonic()
+        return None, status
+
+    if _lms_status_cache is not None and time.monotonic() - _lms_status_time < LMS_STALE_LIMIT:
+        return None, dict(_lms_status_cache, unreachable=True)
+    _lms_status_cache = None
+    return error, None
 
 
 # ============================================
@@ -100,46 +331,59 @@ def setup_pactl_env():
     return env
 
 
+def start_pulse_monitor(pactl_env):
+    """
+    启动 pactl subscribe 事件监听
+
+    就绪后音源仲裁、蓝牙连接检查和音量读取直接查内存索引，
+    订阅进程不可用时回退到每次 fork pactl。
+    """
+    global _pulse_monitor
+    if _pulse_monitor is not None:
+        return _pulse_monitor
+    _pulse_monitor = PulseMonitor(
+        pactl_env, on_change=wakeup.notify,
+        on_volume=lambda volume: volume_popup.report("system", volume)
+    )
+    _pulse_monitor.start()
+    logger.info("pactl 事件监听已启动")
+    return _pulse_monitor
+
+
+def _run_pactl(pactl_env, *args):
+    """fork 一次 pactl（回退路径），返回 stdout，计入 pactl.fork 指标"""
+    key = " ".join(args)
+    try:
+        with metrics.timed("pactl.fork"):
+            output = subprocess.run(
+                ["pactl", *args],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=pactl_env,
+                timeout=1,
+            ).stdout
+    except Exception as e:
+        recorder.record("pactl", key, None, e)
+        raise
+    recorder.record("pactl", key, output)
+    return output
+
+
 def get_high_priority_source(pactl_env):
     """
     检查 PipeWire 活跃源
     Returns: (source_type, status)
              status: "playing" | "paused"
     """
+    monitor = _pulse_monitor
+    if monitor is not None and monitor.ready:
+        return monitor.get_high_priority_source()
+
     try:
         env = pactl_env.copy()
         env["LC_ALL"] = "C"
-
-        result = subprocess.run(
-            ['pactl', 'list', 'sink-inputs'],
-            capture_output=True,
-            text=True,
-            check=True,
-            env=env,
-            timeout=1
-        )
-        output = result.stdout.lower()
-        sink_inputs = output.split('sink input #')
-
-        # 第一轮：查找正在播放的
-        for block in sink_inputs:
-            if not block.strip():
-                continue
-            if "corked: no" in block:
-                if "shairport" in block:
-                    return "airplay", "playing"
-                if "bluez" in block:
-                    return "bluetooth", "playing"
-
-        # 第二轮：查找已暂停的
-        for block in sink_inputs:
-            if not block.strip():
-                continue
-            if "corked: yes" in block:
-                if "shairport" in block:
-                    return "airplay", "paused"
-                if "bluez" in block:
-                    return "bluetooth", "paused"
+        return pick_high_priority_source(parse_sink_inputs(_run_pactl(env, "list", "sink-inputs")))
 
     except Exception as e:
         logger.warning(f"Pactl check failed: {e}")
@@ -148,52 +392,41 @@ def get_high_priority_source(pactl_env):
 
 
 def check_bluetooth_connected(pactl_env):
+    monitor = _pulse_monitor
+    if monitor is not None and monitor.ready:
+        return monitor.is_bluetooth_connected()
     try:
-        result = subprocess.run(
-            ["pactl", "list", "sinks"],
-            capture_output=True,
-            text=True,
-            check=True,
-            env=pactl_env,
-            timeout=1,
-        )
-        return "bluez_sink" in result.stdout.lower()
+        return "bluez_sink" in _run_pactl(pactl_env, "list", "sinks").lower()
     except Exception:
         return False
 
 
 def get_system_volume(pactl_env):
+    monitor = _pulse_monitor
+    if monitor is not None and monitor.ready:
+        return monitor.get_volume()
     try:
-        result = subprocess.run(
-            ['pactl', 'get-sink-volume', '@DEFAULT_SINK@'],
-            capture_output=True,
-            text=True,
-            check=True,
-            env=pactl_env,
-            timeout=1
-        )
-        m = re.search(r'(\d+)%', result.stdout)
-        if m:
-            return max(0, min(100, int(m.group(1))))
+        return parse_volume(_run_pactl(pactl_env, "get-sink-volume", "@DEFAULT_SINK@"))
     except Exception:
         pass
-    return 0
+    # 查询失败：-1 表示本次没有音量（不弹出），不能用 0 冒充真实音量
+    return -1
 
 
 # ============================================
 # AirPlay 元数据（修复审核建议 #6 - 强制检查）
 # ============================================
-def update_airplay_metadata():
+def open_airplay_pipe():
     """
-    读取 AirPlay metadata 管道
+    打开 AirPlay metadata 管道（若已存在）
 
     Returns:
-        tuple: (artist, title, volume)
-        
+        int: 读端 fd；管道尚不存在或打开失败时返回 None
+
     Raises:
         RuntimeError: 如果管道路径未初始化
     """
-    global _pipe_fd, _airplay_state, _AIRPLAY_PIPE
+    global _pipe_fd, _pipe_hold_fd
 
     # 修复审核建议 #6：强制中断而非仅记录错误
     if _AIRPLAY_PIPE is None:
@@ -202,128 +435,251 @@ def update_airplay_metadata():
             "请检查 main.py 是否正确调用了初始化函数。"
         )
 
-    if _pipe_fd is None:
-        if os.path.exists(_AIRPLAY_PIPE):
+    if _pipe_fd is None and os.path.exists(_AIRPLAY_PIPE):
+        try:
+            _pipe_fd = os.open(_AIRPLAY_PIPE, os.O_RDONLY | os.O_NONBLOCK)
+            logger.info(f"Pipe opened: {_AIRPLAY_PIPE}")
+        except Exception as e:
+            logger.error(f"Failed to open pipe: {e}")
+            return None
+        try:
+            _pipe_hold_fd = os.open(_AIRPLAY_PIPE, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            _pipe_hold_fd = None
+    return _pipe_fd
+
+
+def is_airplay_pipe_selectable():
+    """管道读端是否可以放入 selector（需要持有写端，否则无写者时会持续可读）"""
+    return _pipe_fd is not None and _pipe_hold_fd is not None
+
+
+def _close_airplay_pipe():
+    global _pipe_fd, _pipe_hold_fd
+    for fd in (_pipe_fd, _pipe_hold_fd):
+        if fd is not None:
             try:
-                _pipe_fd = os.open(_AIRPLAY_PIPE, os.O_RDONLY | os.O_NONBLOCK)
-                logger.info(f"Pipe opened: {_AIRPLAY_PIPE}")
-            except Exception as e:
-                logger.error(f"Failed to open pipe: {e}")
-        return _airplay_state["artist"], _airplay_state["title"], _airplay_state["volume"]
+                os.close(fd)
+            except Exception:
+                pass
+    _pipe_fd = None
+    _pipe_hold_fd = None
+    _airplay_parser.reset()
+
 
+def pump_airplay_pipe():
+    """
+    读取管道中当前可用的全部数据并解析
+
+    Returns:
+        bool: 是否解析出新的元数据 item
+    """
+    if _pipe_fd is None:
+        return False
+
+    updated = False
     try:
         while True:
             chunk = os.read(_pipe_fd, 8192)
             if not chunk:
                 break
-            _airplay_state["buffer"] += chunk.decode('utf-8', errors='ignore')
+            updated = feed_airplay_bytes(chunk) or updated
     except BlockingIOError:
         pass
     except Exception:
-        try:
-            os.close(_pipe_fd)
-        except Exception:
-            pass
-        _pipe_fd = None
-        return _airplay_state["artist"], _airplay_state["title"], _airplay_state["volume"]
+        _close_airplay_pipe()
+    return updated
 
-    while '<item>' in _airplay_state["buffer"] and '</item>' in _airplay_state["buffer"]:
-        start = _airplay_state["buffer"].find('<item>')
-        end = _airplay_state["buffer"].find('</item>') + 7
-        item_block = _airplay_state["buffer"][start:end]
-        _airplay_state["buffer"] = _airplay_state["buffer"][end:]
 
-        try:
-            code_match = re.search(r'<code>([0-9a-f]+)</code>', item_block)
-            if not code_match:
-                continue
-            code = code_match.group(1)
-            data_match = re.search(
-                r'<data encoding="base64">\s*([A-Za-z0-9+/=\s]+)\s*</data>',
-                item_block,
-                re.DOTALL
-            )
-            if not data_match:
-                continue
-            base64_str = re.sub(r'\s+', '', data_match.group(1))
-
-            if code == '6d696e6d':  # minm (Title)
-                _airplay_state["title"] = base64.b64decode(base64_str).decode('utf-8', errors='ignore')
-            elif code == '61736172':  # asar (Artist)
-                _airplay_state["artist"] = base64.b64decode(base64_str).decode('utf-8', errors='ignore')
-            elif code == '70766f6c':  # pvol (Volume)
-                try:
-                    vol_str = base64.b64decode(base64_str).decode('utf-8', errors='ignore')
-                    parts = vol_str.split(',')
-                    if len(parts) >= 1:
-                        curr_db = float(parts[0])
-                        min_db = -30.0
-                        max_db = 0.0
-                        if len(parts) >= 4:
-                            max_db = float(parts[3])
-                        
-                        new_vol = 0
-                        if curr_db < -100:
-                            new_vol = 0
-                        elif curr_db >= max_db:
-                            new_vol = 100
-                        elif curr_db <= min_db:
-                            new_vol = 0
-                        else:
-                            pct = (curr_db - min_db) / (max_db - min_db) * 100
-                            new_vol = int(max(0, min(100, pct)))
-                        _airplay_state["volume"] = new_vol
-                except Exception:
-                    pass
-        except Exception:
-            pass
+def feed_airplay_bytes(chunk):
+    """
+    解析一段管道数据（回放时直接调用）
+
+    Returns:
+        bool: 是否解析出新的元数据 item
+    """
+    recorder.record("airplay", None, chunk)
+    updated = False
+    for name, payload in _airplay_parser.feed(chunk):
+        _apply_airplay_item(name, payload)
+        updated = True
+    return updated
+
+
+def update_airplay_metadata():
+    """
+    读取 AirPlay metadata 管道
 
+    Returns:
+        tuple: (artist, title, volume)
+        
+    Raises:
+        RuntimeError: 如果管道路径未初始化
+    """
+    if open_airplay_pipe() is not None:
+        pump_airplay_pipe()
     return _airplay_state["artist"], _airplay_state["title"], _airplay_state["volume"]
 
 
+def _apply_airplay_item(name, payload):
+    """将解析出的 AirPlay 元数据 item 写入状态"""
+    if name == "minm":  # Title
+        title = decode_text(payload)
+        if title != _airplay_state["title"]:
+            # 新曲目：封面（如果有）紧随元数据之后以 PICT 发送
+            _airplay_state["artwork"] = None
+        _airplay_state["title"] = title
+    elif name == "asar":  # Artist
+        _airplay_state["artist"] = decode_text(payload)
+    elif name == "pvol":  # Volume
+        vol = pvol_to_percent(payload)
+        if vol is not None:
+            _airplay_state["volume"] = vol
+            volume_popup.report("airplay", vol)
+    elif name == "prgr":  # Progress
+        progress = prgr_to_seconds(payload)
+        if progress is not None:
+            _airplay_state["progress"] = progress
+    elif name == "PICT":  # 封面：交给后台线程解码，这里只记录 key
+        if _artwork_store is not None and payload:
+            key = content_key(payload)
+            _artwork_store.get(key, payload)
+            _airplay_state["artwork"] = key
+
+
+# ============================================
+# 专辑封面
+# ============================================
+def start_artwork(cache_dir, max_bytes, size):
+    """
+    启动封面后台线程，并让 AirPlay 解析器开始接收 PICT
+
+    未调用时不解析也不显示封面。
+    """
+    global _artwork_store
+    if _artwork_store is not None:
+        return _artwork_store
+    _artwork_store = ArtworkStore(cache_dir, max_bytes=max_bytes, size=size)
+    _artwork_store.start()
+    _airplay_parser.codes[CODE_PICTURE] = "PICT"
+    _airplay_parser.item_limits["PICT"] = AIRPLAY_PICTURE_MAX_BYTES
+    logger.info(f"封面缓存已启动: {cache_dir} (上限 {max_bytes // 1024}KB, {size}px)")
+    return _artwork_store
+
+
+def get_airplay_artwork():
+    """当前 AirPlay 曲目的封面缩略图，未就绪或没有封面时返回 None"""
+    if _artwork_store is None:
+        return None
+    return _artwork_store.get(_airplay_state["artwork"])
+
+
+def get_lms_artwork(host_ip, host_port, coverid):
+    """LMS 曲目的封面缩略图（按 coverid 缓存），未就绪或没有封面时返回 None"""
+    if _artwork_store is None or not coverid:
+        return None
+    size = _artwork_store.size
+    # 让服务器先缩放到较小尺寸，减少下载和解码量
+    url = f"http://{host_ip}:{host_port}/music/{coverid}/cover_{size * 4}x{size * 4}"
+    return _artwork_store.get(f"lms:{coverid}", url)
+
+
 # ============================================
 # Bluetooth
 # ============================================
-def get_bluetooth_volume_dbus():
-    global _last_bt_volume
+def start_bluez_client(bus="SYSTEM"):
+    """
+    启动进程内 BlueZ D-Bus 客户端（需要 jeepney）
+
+    缓存就绪后 get_bluetooth_volume_dbus() / get_bluetooth_metadata() 直接读缓存，
+    jeepney 未安装或连接不可用时回退到 dbus-send。
+    """
+    global _bluez_client
+    if _bluez_client is not None:
+        return _bluez_client
+    if not HAS_JEEPNEY:
+        logger.warning("jeepney 未安装，蓝牙查询使用 dbus-send")
+        return None
+    _bluez_client = BluezClient(
+        bus=bus, on_change=wakeup.notify,
+        on_volume=lambda volume: volume_popup.report("bluetooth", volume)
+    )
+    _bluez_client.start()
+    logger.info(f"BlueZ D-Bus 客户端已启动 (bus={bus})")
+    return _bluez_client
+
+
+def _dbus_send(cmd, timeout=1, stderr=None):
+    """fork 一次 dbus-send（回退路径），计入 dbus_send.fork 指标"""
+    key = " ".join(cmd)
     try:
-        cmd = [
-            "dbus-send",
-            "--system",
-            "--dest=org.bluez",
-            "--print-reply",
-            "/",
-            "org.freedesktop.DBus.ObjectManager.GetManagedObjects"
-        ]
-        output = subprocess.check_output(cmd, timeout=1).decode()
-        paths = re.findall(r'object path "(/org/bluez/hci[0-9]*/dev_[^"]+)"', output)
-        
-        for path in paths:
-            if "/fd" not in path:
-                continue
+        with metrics.timed("dbus_send.fork"):
+            output = subprocess.check_output(cmd, stderr=stderr, timeout=timeout).decode()
+    except Exception as e:
+        recorder.record("dbus-send", key, None, e)
+        raise
+    recorder.record("dbus-send", key, output)
+    return output
+
+
+def _get_bt_fallback_index():
+    """
+    dbus-send 回退路径使用的 BlueZ 对象索引
+
+    最多每 BT_INDEX_REFRESH 秒执行一次 GetManagedObjects；查询已知路径失败时立即作废。
+    """
+    global _bt_index_time
+    with _bt_index_lock:
+        now = time.monotonic()
+        if _bt_index_time is None or now - _bt_index_time >= BT_INDEX_REFRESH:
             try:
-                cmd_vol = [
+                output = _dbus_send([
                     "dbus-send",
                     "--system",
-                    "--print-reply",
                     "--dest=org.bluez",
-                    path,
-                    "org.freedesktop.DBus.Properties.Get",
-                    "string:org.bluez.MediaTransport1",
-                    "string:Volume",
-                ]
-                res = subprocess.check_output(
-                    cmd_vol,
-                    stderr=subprocess.DEVNULL,
-                    timeout=0.5
-                ).decode()
-                m = re.search(r'uint16\s+(\d+)', res)
-                if m:
-                    return int((int(m.group(1)) / BT_VOLUME_MAX) * 100)
+                    "--print-reply",
+                    "/",
+                    "org.freedesktop.DBus.ObjectManager.GetManagedObjects"
+                ])
+                _bt_index.replace(parse_managed_objects_text(output))
             except Exception:
-                continue
-    except Exception:
-        pass
+                _bt_index.clear()
+            _bt_index_time = now
+    return _bt_index
+
+
+def _invalidate_bt_index():
+    global _bt_index_time
+    with _bt_index_lock:
+        _bt_index_time = None
+
+
+def get_bluetooth_volume_dbus():
+    client = _bluez_client
+    if client is not None and client.ready:
+        volume = client.get_volume()
+        recorder.record("bluez", "volume", volume)
+        return volume
+    for path in _get_bt_fallback_index().transports:
+        try:
+            cmd_vol = [
+                "dbus-send",
+                "--system",
+                "--print-reply",
+                "--dest=org.bluez",
+                path,
+                "org.freedesktop.DBus.Properties.Get",
+                "string:org.bluez.MediaTransport1",
+                "string:Volume",
+            ]
+            res = _dbus_send(cmd_vol, timeout=0.5, stderr=subprocess.DEVNULL)
+        except Exception:
+            # transport 已消失：下次重新加载索引
+            _invalidate_bt_index()
+            continue
+        m = re.search(r'uint16\s+(\d+)', res)
+        if m:
+            return int((int(m.group(1)) / BT_VOLUME_MAX) * 100)
     return -1
 
 
@@ -339,30 +695,16 @@ def _extract_variant_string(lines, start_index):
 
 def get_bluetooth_metadata():
     """获取蓝牙信息，返回: (Artist, Title, Status)"""
-    global _bt_player_path
-
-    if not _bt_player_path:
-        try:
-            cmd = [
-                "dbus-send",
-                "--system",
-                "--dest=org.bluez",
-                "--print-reply",
-                "/",
-                "org.freedesktop.DBus.ObjectManager.GetManagedObjects"
-            ]
-            output = subprocess.check_output(cmd, timeout=1).decode()
-            m = re.search(
-                r'object path "(/org/bluez/hci[0-9]*/dev_[^"]+/player\d+)"',
-                output,
-                re.IGNORECASE
-            )
-            if m:
-                _bt_player_path = m.group(1)
-            else:
-                return "", "", "unknown"
-        except Exception:
-            return "", "", "unknown"
+    client = _bluez_client
+    if client is not None and client.ready:
+        metadata = client.get_metadata()
+        recorder.record("bluez", "metadata", metadata)
+        return metadata
+
+    players = _get_bt_fallback_index().players
+    if not players:
+        return "", "", "unknown"
+    player_path = players[0]
 
     try:
         # 获取 Track
@@ -371,13 +713,13 @@ def get_bluetooth_metadata():
             "--system",
             "--print-reply",
             "--dest=org.bluez",
-            _bt_player_path,
+            player_path,
             "org.freedesktop.DBus.Properties.Get",
             "string:org.bluez.MediaPlayer1",
             "string:Track",
         ]
 
-        output = subprocess.check_output(cmd, timeout=1).decode()
+        output = _dbus_send(cmd)
         artist = ""
         title = ""
         lines = output.split('\n')
@@ -394,15 +736,12 @@ def get_bluetooth_metadata():
             "--system",
             "--print-reply",
             "--dest=org.bluez",
-            _bt_player_path,
+            player_path,
             "org.freedesktop.DBus.Properties.Get",
             "string:org.bluez.MediaPlayer1",
             "string:Status",
         ]
-        res_status = subprocess.check_output(
-            cmd_status,
-            stderr=subprocess.DEVNULL
-        ).decode()
+        res_status = _dbus_send(cmd_status, stderr=subprocess.DEVNULL)
         
         status = "unknown"
         if 'string "playing"' in res_status.lower():
@@ -415,5 +754,5 @@ def get_bluetooth_metadata():
         return artist, title, status
 
     except Exception:
-        _bt_player_path = None
+        _invalidate_bt_index()
         return "", "", "unknown"
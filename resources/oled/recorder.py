@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# resources/oled/recorder.py
+#
+# 后端原始输入录制（供 test/replay.py 回放）
+#
+# 开启后（[CAPTURE] path），各后端在取得原始输入的位置调用 record()：
+#   pactl        pactl 命令输出（key 为参数）
+#   pactl-event  pactl subscribe 的事件行
+#   dbus-send    dbus-send 回复（key 为命令行）
+#   bluez        进程内 BlueZ 客户端缓存的查询结果（key 为 metadata / volume）
+#   lms          LMS JSON-RPC 的 result（key 为命令）
+#   lms-cli      LMS CLI 通知行
+#   airplay      AirPlay 元数据管道读到的字节
+# 失败的查询同样记录（error 字段），回放时原样抛出。
+#
+# 文件为 gzip 压缩的 JSON 行：第一行是文件头，之后每行 [t, kind, key, value(, error)]，
+# t 为相对录制开始的 time.monotonic() 秒数。record() 只把记录放进队列，
+# 压缩和写入在后台线程中进行；写入线程每秒刷新一次，进程被杀时最多丢失最后一秒。
+
+import base64
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FORMAT = "oled-capture"
+VERSION = 1
+# 写入线程的刷新间隔（秒）
+FLUSH_INTERVAL = 1.0
+
+_queue = None           # 录制中时为 queue.Queue
+_start = 0.0            # 录制开始的 time.monotonic()
+_thread = None
+
+
+def start(path, max_bytes=64 * 1024 * 1024):
+    """开始录制到 path（path 为空时不录制）；未压缩数据超过 max_bytes 后自动停止"""
+    global _queue, _start, _thread
+    if _queue is not None or not path:
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = gzip.open(path, "wt", encoding="utf-8")
+        header = {
+            "format": FORMAT, "version": VERSION,
+            "start_wall": time.time(), "pid": os.getpid(),
+        }
+        f.write(json.dumps(header) + "\n")
+    except OSError as e:
+        logger.warning(f"录制文件不可用 ({path}): {e}")
+        return
+
+    _start = time.monotonic()
+    q = queue.Queue()
+    _thread = threading.Thread(target=_run, args=(f, q, max_bytes), name="recorder", daemon=True)
+    _thread.start()
+    _queue = q
+    logger.info(f"后端输入录制已开始: {path}")
+
+
+def stop():
+    """停止录制并等待剩余记录写完"""
+    global _queue
+    q, _queue = _queue, None
+    if q is not None:
+        q.put(None)
+        _thread.join(timeout=5)
+
+
+def active():
+    return _queue is not None
+
+
+def record(kind, key, value, error=None):
+    """
+    记录一条后端原始输入（未录制时立即返回）
+
+    Args:
+        value: str / bytes / 可 JSON 序列化的对象
+        error: 查询失败时的错误描述（此时 value 通常为 None）
+    """
+    q = _queue
+    if q is None:
+        return
+    q.put((time.monotonic() - _start, kind, key, value, error))
+
+
+def _encode(item):
+    t, kind, key, value, error = item
+    if isinstance(value, (bytes, bytearray)):
+        value = {"b64": base64.b64encode(value).decode("ascii")}
+    fields = [round(t, 6), kind, key, value]
+    if error is not None:
+        fields.append(str(error))
+    return json.dumps(fields, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _run(f, q, max_bytes):
+    global _queue
+    written = 0
+    try:
+        while True:
+            try:
+                item = q.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                f.flush()
+                continue
+            if item is None:
+                break
+            line = _encode(item)
+            f.write(line)
+            written += len(line)
+            if written >= max_bytes:
+                logger.warning(f"录制数据已达上限 ({max_bytes} 字节)，停止录制")
+                _queue = None
+                break
+            if q.empty():
+                f.flush()
+    except Exception as e:
+        logger.warning(f"录制写入失败，停止录制: {e}")
+        _queue = None
+    finally:
+        f.close()
+
+
+# ============================================
+# 读取
+# ============================================
+def read_capture(path):
+    """
+    读取录制文件
+
+    Returns:
+        tuple: (header, records)；records 为 [(t, kind, key, value, error), ...]，
+               bytes 值已还原。文件尾部不完整（进程被杀）时截断到最后一条完整记录。
+    """
+    header = None
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    fields = json.loads(line)
+                except ValueError:
+                    break
+                if header is None:
+                    header = fields
+                    if not isinstance(header, dict) or header.get("format") != FORMAT:
+                        raise ValueError(f"不是录制文件: {path}")
+                    continue
+                t, kind, key, value = fields[:4]
+                error = fields[4] if len(fields) > 4 else None
+                if isinstance(value, dict) and "b64" in value:
+                    value = base64.b64decode(value["b64"])
+                records.append((t, kind, key, value, error))
+        except EOFError:
+            pass
+    if header is None:
+        raise ValueError(f"录制文件为空: {path}")
+    return header, records
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# resources/oled/screen_state.py
+#
+# 期望画面的状态模型与区域差分
+#
+# 每个字段属于屏幕上的一个区域：
+#   TOP     顶部状态行 + 封面     top_text / top_align / artwork
+#   BOTTOM  底部标题（滚动条带）  bottom_text / large_font
+#   SPEED   滚动速度             scroll_speed（只影响帧调度，不需要重绘）
+#   VOLUME  常驻音量条           volume
+#   CLOCK   时钟数字             时钟模式下的 bottom_text
+# diff() 返回两个状态之间变化的区域；模式切换（时钟 <-> 文字）视为全部区域变化。
+# 主循环据此决定是否投递画面、是否唤醒屏保，合成线程据此只重建变化的图层，
+# 例如暂停只改变 TOP 和 SPEED：重绘顶部状态行，标题继续从当前位置滚动。
+
+TOP = 1
+BOTTOM = 2
+SPEED = 4
+VOLUME = 8
+CLOCK = 16
+ALL = TOP | BOTTOM | SPEED | VOLUME | CLOCK
+
+_REGION_NAMES = ((TOP, "top"), (BOTTOM, "bottom"), (SPEED, "speed"), (VOLUME, "volume"), (CLOCK, "clock"))
+
+
+class ScreenState:
+    """一帧期望画面（不可变使用：创建后不再修改字段）"""
+
+    __slots__ = (
+        "top_text", "top_align", "artwork",
+        "bottom_text", "large_font", "scroll_speed",
+        "volume", "is_clock",
+    )
+
+    def __init__(self, top_text, bottom_text, large_font=False, scroll_speed=40.0,
+                 is_clock=False, volume=None, top_align="center", artwork=None):
+        self.top_text = top_text
+        self.top_align = top_align
+        self.artwork = artwork          # 封面缩略图；按对象比较（封面缓存对同一封面返回同一对象）
+        self.bottom_text = bottom_text
+        self.large_font = large_font
+        self.scroll_speed = scroll_speed
+        self.volume = volume            # 常驻音量条，None 表示不显示
+        self.is_clock = is_clock
+
+    @classmethod
+    def from_player(cls, player_state, volume=None):
+        """由状态处理器的 PlayerState 生成（音量条默认由弹窗负责，不随画面传递）"""
+        return cls(
+            player_state.top_text,
+            player_state.bottom_text,
+            large_font=player_state.large_font,
+            scroll_speed=player_state.scroll_speed,
+            is_clock=player_state.is_clock,
+            volume=volume,
+            top_align=player_state.align_mode,
+            artwork=player_state.artwork,
+        )
+
+    def __repr__(self):
+        return f"ScreenState({self.top_text!r}, {self.bottom_text!r}, clock={self.is_clock})"
+
+
+def diff(old, new):
+    """
+    计算从 old 到 new 需要更新的区域
+
+    Returns:
+        int: 区域位掩码（0 表示画面不变；old 为 None 或模式切换时为 ALL）
+    """
+    if old is None or old.is_clock != new.is_clock:
+        return ALL
+
+    regions = 0
+    if (old.top_text != new.top_text or old.top_align != new.top_align
+            or old.artwork is not new.artwork):
+        regions |= TOP
+    if old.bottom_text != new.bottom_text or old.large_font != new.large_font:
+        regions |= CLOCK if new.is_clock else BOTTOM
+    if old.scroll_speed != new.scroll_speed:
+        regions |= SPEED
+    if old.volume != new.volume:
+        regions |= VOLUME
+    return regions
+
+
+def region_names(regions):
+    """位掩码 -> 区域名列表（日志 / 指标用）"""
+    return [name for bit, name in _REGION_NAMES if regions & bit]
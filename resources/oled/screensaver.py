@@ -81,3 +81,27 @@ class ScreenSaver:
                 logging.info("ScreenSaver: Screen OFF")
             except Exception as e:
                 logging.error(f"ScreenSaver error (off): {e}")
+
+    def get_state(self):
+        """当前屏保状态（供状态端点使用）"""
+        return {
+            "dimmed": self.is_dimmed,
+            "off": self.is_off,
+            "idle_s": round(time.time() - self.last_activity, 1),
+        }
+
+    def next_deadline(self, is_media_active=False):
+        """
+        距离下一次屏保状态切换（变暗 / 关闭）的秒数，供事件循环设置定时器
+
+        Returns:
+            float: 秒数；没有待切换的状态时返回 None
+        """
+        if not self.is_dimmed:
+            target = self.last_activity + self.dim_timeout
+        elif not self.is_off and not is_media_active:
+            target = self.last_activity + self.off_timeout
+        else:
+            return None
+        # tick() 使用严格大于判断，多等一点避免提前唤醒
+        return max(0.0, target - time.time()) + 0.01
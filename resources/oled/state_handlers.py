@@ -2,29 +2,55 @@
 # resources/oled/state_handlers.py
 
 import time
+
+import metrics
+from probe_pool import ProbePool
 from query import (
-    update_airplay_metadata, get_system_volume,
+    update_airplay_metadata, get_system_volume, get_high_priority_source,
     get_bluetooth_metadata, get_bluetooth_volume_dbus,
-    get_player_status, extract_result_field, check_bluetooth_connected
+    get_lms_status_cached, check_bluetooth_connected,
+    get_airplay_artwork, get_lms_artwork
 )
 
+# ============================================
+# 并发探测（每个 tick 共享一个时间预算）
+# ============================================
+_probes = ProbePool()
+
+def configure_probes(workers, budget):
+    """按配置重建探测线程池（budget 单位：秒）"""
+    global _probes
+    old = _probes
+    _probes = ProbePool(workers=workers, budget=budget)
+    old.shutdown()
+
+def begin_probe_tick():
+    """主循环每个 tick 开始时调用，重置探测截止时间"""
+    _probes.begin_tick()
+
+def get_active_source(pactl_env):
+    """高优先级音源仲裁（受 tick 预算限制，超时沿用上一次结果）"""
+    return _probes.probe("source", get_high_priority_source, pactl_env, default=(None, "stopped"))
+
 class PlayerState:
     """用于在函数间传递播放器状态的简单容器"""
     def __init__(self):
-        self.key = None            # 状态唯一标识 (用于屏保判断)
-        self.signature = None      # 内容唯一标识 (用于刷新判断)
+        self.key = None            # 状态唯一标识 (用于屏保判断；画面刷新按 screen_state 区域差分)
         self.top_text = ""
         self.bottom_text = ""
         self.volume = -1           # -1 表示不显示音量
+        self.volume_channel = None # 音量来源通道 (见 volume_popup)，决定哪些音量事件会弹出
         self.is_paused = False
         self.active_player_type = None # 用于记录当前占用的播放器类型
         
         # 显示参数默认值
         self.large_font = True
-        self.scroll_speed = 0.0
+        self.scroll_speed = 0.0        # 滚动速度 (像素/秒)
         self.align_mode = "center" # "center" 或 "left"
         self.is_clock = False
+        self.artwork = None        # 封面缩略图 (1-bit Image)，未就绪或没有时为 None
 
+@metrics.timed("state.airplay")
 def handle_airplay_state(pactl_env, source_status, last_known_volume, cfg_display):
     """处理 AirPlay 状态逻辑"""
     state = PlayerState()
@@ -40,32 +66,41 @@ def handle_airplay_state(pactl_env, source_status, last_known_volume, cfg_displa
         state.volume = last_known_volume
         state.top_text = "AP: 已暂停"
         state.bottom_text = title if title else "AirPlay"
-        state.scroll_speed = cfg_display["scroll_speed_static"]
+        state.scroll_speed = cfg_display["scroll_pps_static"]
     else:
         # 优先使用 AirPlay 自身音量，如果没有则回退到系统音量
         if ap_vol >= 0: 
             state.volume = ap_vol
+            state.volume_channel = "airplay"
         else: 
-            state.volume = get_system_volume(pactl_env)
+            # 探测超时 / 失败时为 -1：last_known_volume 可能来自其他通道，不能当作系统音量
+            state.volume = _probes.probe(
+                "system_volume", get_system_volume, pactl_env, default=-1
+            )
+            state.volume_channel = "system"
             
         state.top_text = f"AP: {artist if artist else '未知'}"
         state.bottom_text = title if title else "AirPlay"
-        state.scroll_speed = cfg_display["scroll_speed_playing"]
+        state.scroll_speed = cfg_display["scroll_pps_playing"]
+
+    state.artwork = get_airplay_artwork()
 
-    # 生成内容签名
-    state.signature = f"ap_{artist}_{title}_{source_status}"
     state.align_mode = "left"
     state.large_font = True
     return state
 
+@metrics.timed("state.bluetooth")
 def handle_bluetooth_state(pactl_env, source_status, last_known_volume, cfg_display):
     """处理 Bluetooth 状态逻辑"""
     state = PlayerState()
     state.active_player_type = "bluetooth"
     state.key = "bluetooth"
 
-    # 获取蓝牙元数据
-    artist, title, bt_status_meta = get_bluetooth_metadata()
+    # 蓝牙元数据和音量并发获取（PipeWire 已报告暂停时不需要音量）
+    _probes.submit("bt_metadata", get_bluetooth_metadata)
+    if source_status != "paused":
+        _probes.submit("bt_volume", get_bluetooth_volume_dbus)
+    artist, title, bt_status_meta = _probes.result("bt_metadata", ("", "", "unknown"))
     
     # 综合判定暂停状态 (PipeWire 状态 或 元数据状态)
     is_paused = (source_status == "paused") or (bt_status_meta == "paused")
@@ -78,31 +113,44 @@ def handle_bluetooth_state(pactl_env, source_status, last_known_volume, cfg_disp
         state.volume = last_known_volume
         state.top_text = "BT: 已暂停"
         state.bottom_text = display_title
-        state.scroll_speed = cfg_display["scroll_speed_static"]
+        state.scroll_speed = cfg_display["scroll_pps_static"]
     else:
         # 获取蓝牙音量
-        bt_vol = get_bluetooth_volume_dbus()
+        bt_vol = _probes.result("bt_volume", -1)
         if bt_vol >= 0:
             state.volume = bt_vol
+            state.volume_channel = "bluetooth"
         else:
-            state.volume = get_system_volume(pactl_env)
+            # 探测超时 / 失败时为 -1：last_known_volume 可能来自其他通道，不能当作系统音量
+            state.volume = _probes.probe(
+                "system_volume", get_system_volume, pactl_env, default=-1
+            )
+            state.volume_channel = "system"
             
         state.top_text = f"BT: {display_artist}"
         state.bottom_text = display_title
-        state.scroll_speed = cfg_display["scroll_speed_playing"]
+        state.scroll_speed = cfg_display["scroll_pps_playing"]
 
-    state.signature = f"bt_{artist}_{title}_{is_paused}"
     state.align_mode = "left"
     state.large_font = True
     return state
 
+@metrics.timed("state.lms_or_idle")
 def handle_lms_or_idle_state(pactl_env, lms_config, current_active_type, last_known_volume, cfg_display):
     """处理 LMS (Squeezelite) 或 空闲/时钟 状态逻辑"""
     state = PlayerState()
+
+    # 三个探测并发执行，总耗时受 tick 预算限制
+    _probes.submit("bt_metadata", get_bluetooth_metadata)
+    _probes.submit(
+        "lms_status", get_lms_status_cached,
+        lms_config["host_ip"], lms_config["host_port"], lms_config["player_id"]
+    )
+    _probes.submit("bt_connected", check_bluetooth_connected, pactl_env)
     
     # 1. 特殊处理：蓝牙刚刚暂停时的反馈 (防止状态在蓝牙暂停和LMS之间快速跳变)
     # 如果当前主要类型是蓝牙，且检测到蓝牙暂停，保持蓝牙显示
-    bt_artist, bt_title, bt_status_check = get_bluetooth_metadata()
+    bt_artist, bt_title, bt_status_check = _probes.result("bt_metadata", ("", "", "unknown"))
     if bt_status_check == "paused" and current_active_type == "bluetooth":
         state.active_player_type = "bluetooth"
         state.key = "bluetooth_paused_fb"
@@ -112,18 +160,18 @@ def handle_lms_or_idle_state(pactl_env, lms_config, current_active_type, last_kn
         state.top_text = "BT: 已暂停"
         state.bottom_text = bt_title if bt_title else "Bluetooth"
         state.align_mode = "left"
-        state.scroll_speed = cfg_display["scroll_speed_static"]
-        state.signature = "bt_paused_fb"
+        state.scroll_speed = cfg_display["scroll_pps_static"]
         state.large_font = True
         return state
 
     # 2. 查询 LMS (Squeezelite) 状态
-    # 注意：这里使用 lms_config 字典解包传参
-    error, result = get_player_status(
-        ["mode", "?"], 
-        lms_config["host_ip"], lms_config["host_port"], lms_config["player_id"]
-    )
-    playback_mode = extract_result_field(result, "_mode", default="stop")
+    # 单次 status 请求同时取回 mode/title/artist/volume
+    # LMS 暂时不可达时为上一次的 status（unreachable=True），画面保持原曲目
+    error, lms_status = _probes.result("lms_status", ("LMS 状态未就绪", None))
+    if lms_status is None:
+        lms_status = {}
+    playback_mode = lms_status.get("mode") or "stop"
+    unreachable = lms_status.get("unreachable", False)
 
     # === 场景 C1: LMS 播放中 ===
     if playback_mode == "play":
@@ -131,25 +179,23 @@ def handle_lms_or_idle_state(pactl_env, lms_config, current_active_type, last_kn
         state.key = "squeezelite"
         
         # 获取元数据
-        _, res_t = get_player_status(["current_title", "?"], **lms_config)
-        _, res_a = get_player_status(["artist", "?"], **lms_config)
-        
-        sq_title = extract_result_field(res_t, "_current_title", default="Squeezelite")
-        sq_artist = extract_result_field(res_a, "_artist", default="未知")
+        sq_title = lms_status.get("title") or "Squeezelite"
+        sq_artist = lms_status.get("artist") or "未知"
         
         # 获取 LMS 音量
-        _, vol_res = get_player_status(["mixer", "volume", "?"], **lms_config)
-        lms_vol_raw = extract_result_field(vol_res, "_volume", default=None)
+        state.volume_channel = "lms"
         try: 
-            state.volume = int(float(lms_vol_raw))
+            state.volume = int(float(lms_status.get("volume")))
         except: 
-            state.volume = last_known_volume
+            state.volume = -1
 
-        state.top_text = f"SQ: {sq_artist}"
+        state.artwork = get_lms_artwork(
+            lms_config["host_ip"], lms_config["host_port"], lms_status.get("coverid")
+        )
+        state.top_text = "SQ: 不可达" if unreachable else f"SQ: {sq_artist}"
         state.bottom_text = sq_title
         state.align_mode = "left"
-        state.scroll_speed = cfg_display["scroll_speed_playing"]
-        state.signature = f"sq_{sq_artist}_{sq_title}"
+        state.scroll_speed = cfg_display["scroll_pps_playing"]
         state.large_font = True
         return state
 
@@ -160,27 +206,27 @@ def handle_lms_or_idle_state(pactl_env, lms_config, current_active_type, last_kn
         state.is_paused = True
         state.volume = last_known_volume
         
-        _, res_t = get_player_status(["current_title", "?"], **lms_config)
-        sq_title = extract_result_field(res_t, "_current_title", default="Squeezelite")
+        sq_title = lms_status.get("title") or "Squeezelite"
+        state.artwork = get_lms_artwork(
+            lms_config["host_ip"], lms_config["host_port"], lms_status.get("coverid")
+        )
         
-        state.top_text = "SQ: 已暂停"
+        state.top_text = "SQ: 不可达" if unreachable else "SQ: 已暂停"
         state.bottom_text = sq_title
         state.align_mode = "left"
-        state.scroll_speed = cfg_display["scroll_speed_static"]
-        state.signature = "sq_pause"
+        state.scroll_speed = cfg_display["scroll_pps_static"]
         state.large_font = True
         return state
 
     # === 场景 C3: 纯空闲状态 (Idle) ===
     state.active_player_type = None # 重置，无活跃播放器
     
-    if check_bluetooth_connected(pactl_env):
+    if _probes.result("bt_connected", False):
         # 蓝牙已连接但未播放
         state.key = "bt_connected"
         state.top_text = "Bluetooth"
         state.bottom_text = "已连接"
-        state.scroll_speed = cfg_display["scroll_speed_static"]
-        state.signature = "bt_conn"
+        state.scroll_speed = cfg_display["scroll_pps_static"]
         state.large_font = True
     else:
         # 时钟模式
@@ -189,7 +235,6 @@ def handle_lms_or_idle_state(pactl_env, lms_config, current_active_type, last_kn
         state.top_text = time.strftime("%Y-%m-%d", time.localtime())
         state.bottom_text = time.strftime("%H:%M:%S", time.localtime())
         state.scroll_speed = 0
-        state.signature = "idle"
         state.large_font = True
         
     state.volume = -1 # 不显示音量
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# resources/oled/status.py
+#
+# 本地状态快照（GET /status，JSON）
+#
+# 主循环每个 tick 结束时用 publish() 整体替换一个新的字典（不修改旧字典），
+# HTTP 线程只读取当前引用，不持有主循环或合成线程使用的任何锁，
+# 轮询再频繁也不会拖慢渲染。监控脚本读取这里的内容，
+# 不再需要 fork systemctl / journalctl / pactl 来判断 OLED 服务在做什么。
+#
+# 端点由 metrics 的 HTTP 服务提供（回环 TCP 端口和可选的 Unix socket）。
+
+import time
+
+import metrics
+
+# (快照, 发布时间 time.monotonic())，整体替换，读者一次取到一致的一对
+_current = None
+
+
+def publish(snapshot):
+    """发布新的状态快照（调用后不要再修改 snapshot）"""
+    global _current
+    _current = (snapshot, time.monotonic())
+
+
+def get():
+    """
+    当前快照 + age_s（距离上次发布的秒数）
+
+    事件驱动模式下主循环最长约 10 秒才运行一次，age_s 明显超过这个值说明主循环卡住了。
+    """
+    current = _current
+    if current is None:
+        return {"ready": False}
+    snapshot, published_at = current
+    return dict(snapshot, ready=True, age_s=round(time.monotonic() - published_at, 1))
+
+
+metrics.register_endpoint("/status", get)
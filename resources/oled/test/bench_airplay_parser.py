@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# resources/oled/test/bench_airplay_parser.py
+#
+# AirPlay 元数据管道解析基准测试
+#
+# 录制真实管道数据（在设备上播放几首带封面的歌曲）:
+#   cat /tmp/shairport-sync-metadata > capture.bin
+# 运行:
+#   python3 bench_airplay_parser.py --capture capture.bin
+#   python3 bench_airplay_parser.py --generate capture.bin   # 生成合成数据（含大封面）
+#   python3 bench_airplay_parser.py                          # 使用内存中的合成数据
+#   python3 bench_airplay_parser.py --legacy                 # 同时对比旧的字符串解析实现
+
+import argparse
+import base64
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from airplay_parser import AirplayMetadataParser
+
+CHUNK = 8192  # 与 query.update_airplay_metadata 的单次读取大小一致
+
+
+def encode_item(type_hex, code_hex, payload=b""):
+    head = f"<item><type>{type_hex}</type><code>{code_hex}</code><length>{len(payload)}</length>"
+    if not payload:
+        return (head + "</item>\n").encode()
+    b64 = base64.encodebytes(payload).decode()
+    return (head + f'\n<data encoding="base64">\n{b64}</data></item>\n').encode()
+
+
+def generate_capture(tracks=20, art_bytes=200 * 1024):
+    """生成与 shairport-sync 输出格式相同的合成数据"""
+    core, ssnc = "636f7265", "73736e63"
+    out = bytearray()
+    for n in range(tracks):
+        out += encode_item(ssnc, "6d647374")                        # mdst
+        out += encode_item(core, "6d696e6d", f"第 {n} 首歌 Track title {n}".encode())
+        out += encode_item(core, "61736172", f"Artist {n}".encode())
+        out += encode_item(core, "6173616c", f"Album {n}".encode())  # asal
+        out += encode_item(ssnc, "70766f6c", b"-12.50,-15.00,-30.00,0.00")
+        out += encode_item(ssnc, "50494354", os.urandom(art_bytes))  # PICT
+        for k in range(30):
+            out += encode_item(ssnc, "70726772", f"{k * 44100}/{(k + 5) * 44100}/{300 * 44100}".encode())
+        out += encode_item(ssnc, "6d64656e")                        # mden
+    return bytes(out)
+
+
+def run_new(data):
+    parser = AirplayMetadataParser()
+    items = 0
+    start = time.perf_counter()
+    for i in range(0, len(data), CHUNK):
+        items += len(parser.feed(data[i:i + CHUNK]))
+    elapsed = time.perf_counter() - start
+    return elapsed, items, parser.peak_buffer
+
+
+def run_legacy(data):
+    """旧实现：字符串拼接 + 每个 item 三次正则（只解码 minm/asar/pvol，不含 prgr）"""
+    buffer = ""
+    items = 0
+    peak = 0
+    start = time.perf_counter()
+    for i in range(0, len(data), CHUNK):
+        buffer += data[i:i + CHUNK].decode("utf-8", errors="ignore")
+        peak = max(peak, len(buffer))
+        while "<item>" in buffer and "</item>" in buffer:
+            s = buffer.find("<item>")
+            e = buffer.find("</item>") + 7
+            block = buffer[s:e]
+            buffer = buffer[e:]
+            code = re.search(r"<code>([0-9a-f]+)</code>", block)
+            if not code:
+                continue
+            m = re.search(r'<data encoding="base64">\s*([A-Za-z0-9+/=\s]+)\s*</data>', block, re.DOTALL)
+            if not m:
+                continue
+            re.sub(r"\s+", "", m.group(1))
+            if code.group(1) in ("6d696e6d", "61736172", "70766f6c"):
+                items += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, items, peak
+
+
+def report(name, size, elapsed, items, peak):
+    mbps = size / elapsed / 1e6 if elapsed > 0 else float("inf")
+    print(f"{name:8s} {elapsed * 1000:9.1f} ms  {mbps:8.1f} MB/s  items={items:6d}  peak_buffer={peak / 1024:8.1f} KiB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="AirPlay metadata parser benchmark")
+    ap.add_argument("--capture", help="录制的管道数据文件")
+    ap.add_argument("--generate", metavar="FILE", help="生成合成数据并写入文件后退出")
+    ap.add_argument("--legacy", action="store_true", help="同时运行旧实现作对比")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.generate:
+        with open(args.generate, "wb") as f:
+            f.write(generate_capture())
+        print(f"已写入 {args.generate}")
+        return
+
+    if args.capture:
+        with open(args.capture, "rb") as f:
+            data = f.read()
+        source = args.capture
+    else:
+        data = generate_capture()
+        source = "synthetic"
+
+    print(f"数据: {source}, {len(data) / 1024:.1f} KiB, chunk={CHUNK}")
+    for _ in range(args.repeat):
+        report("new", len(data), *run_new(data))
+        if args.legacy:
+            report("legacy", len(data), *run_legacy(data))
+
+
+if __name__ == "__main__":
+    main()
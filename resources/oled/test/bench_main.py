@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# resources/oled/test/bench_main.py
+#
+# main.py 主循环离线基准测试（不需要 SSD1306 / PipeWire / BlueZ / LMS）
+#
+# 运行真实的 main / state_handlers / display / screensaver 代码，替换外部依赖：
+#   - OLED: luma ssd1306 + noop 串口，帧数和总线字节数取自脏页帧缓冲统计
+#   - pactl / dbus-send: 临时目录中的桩脚本，从场景文件读取输出
+#   - LMS: 本地 FakeLMS (JSON-RPC + CLI)
+#   - AirPlay: 临时 FIFO，写入 shairport-sync 格式的元数据
+#
+# 每个场景在独立子进程中运行，报告:
+#   每次状态评估 (tick) 的延迟分位数、每 tick 的子进程 fork 数和 HTTP 请求数、
+#   帧率和每帧总线字节数。
+#
+# 运行:
+#   python3 bench_main.py                       # 全部场景
+#   python3 bench_main.py --scenario idle --duration 20
+#   python3 bench_main.py --font /usr/share/fonts/xxx.ttf   # 指定 CJK 字体
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+OLED_DIR = os.path.dirname(TEST_DIR)
+sys.path.insert(0, OLED_DIR)
+sys.path.insert(0, TEST_DIR)
+
+REPO_DIR = os.path.dirname(os.path.dirname(OLED_DIR))
+TEMPLATE = os.path.join(REPO_DIR, "templates", "configs", "oled.ini.template")
+PLAYER_ID = "00:11:22:33:44:55"
+
+SINK_INPUT_AIRPLAY = """Sink Input #41
+\tDriver: PipeWire
+\tCorked: no
+\tProperties:
+\t\tapplication.name = "Shairport Sync"
+"""
+
+SINK_INPUT_BT_PAUSED = """Sink Input #57
+\tDriver: PipeWire
+\tCorked: yes
+\tProperties:
+\t\tmedia.name = "bluez_input.AA_BB_CC_DD_EE_FF"
+"""
+
+BT_DEVICE = "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF"
+
+LONG_CJK_TITLE = "夜空中最亮的星 (Live 版) — 逃跑计划 · 世界 2014 巡回演唱会北京站现场录音"
+
+SCENARIOS = {
+    "idle": {
+        "desc": "空闲时钟",
+        "sink_inputs": "",
+    },
+    "lms": {
+        "desc": "LMS 播放 (长标题滚动)",
+        "sink_inputs": "",
+        "lms": {"mode": "play", "title": "A very long song title that has to scroll across the OLED",
+                "artist": "Some Artist"},
+    },
+    "airplay_cjk": {
+        "desc": "AirPlay 播放 (长 CJK 标题)",
+        "sink_inputs": SINK_INPUT_AIRPLAY,
+        "airplay": [("minm", LONG_CJK_TITLE), ("asar", "逃跑计划"), ("pvol", "-12.00,-15.00,-30.00,0.00")],
+    },
+    "bt_paused": {
+        "desc": "蓝牙暂停",
+        "sink_inputs": SINK_INPUT_BT_PAUSED,
+        "bluez_sink": True,
+        "bt": {"title": "Bluetooth Track Title", "artist": "BT Artist", "status": "paused"},
+    },
+}
+
+AIRPLAY_CODES = {"minm": "6d696e6d", "asar": "61736172", "pvol": "70766f6c"}
+
+
+# ============================================
+# 桩脚本
+# ============================================
+PACTL_STUB = """#!/bin/sh
+echo "pactl $*" >> "$BENCH_DIR/calls.log"
+case "$1" in
+  subscribe) exec tail -f "$BENCH_DIR/pactl_events" ;;
+  list)
+    if [ "$2" = sink-inputs ]; then cat "$BENCH_DIR/sink_inputs"; else cat "$BENCH_DIR/sinks"; fi ;;
+  get-sink-volume) echo "Volume: front-left: 30000 /  46% / -20 dB" ;;
+esac
+"""
+
+DBUS_SEND_STUB = """#!/bin/sh
+echo "dbus-send $*" >> "$BENCH_DIR/calls.log"
+case "$*" in
+  *GetManagedObjects*) cat "$BENCH_DIR/bluez_objects" ;;
+  *string:Track*) cat "$BENCH_DIR/bluez_track" ;;
+  *string:Status*) cat "$BENCH_DIR/bluez_status" ;;
+  *string:Volume*) echo '   variant       uint16 64' ;;
+esac
+"""
+
+
+def _write(path, text, mode=0o644):
+    with open(path, "w") as f:
+        f.write(text)
+    os.chmod(path, mode)
+
+
+def prepare_environment(bench_dir, scenario, font_path, lms):
+    """写入桩脚本、场景数据和 oled.ini，返回配置文件路径"""
+    bin_dir = os.path.join(bench_dir, "bin")
+    os.makedirs(bin_dir)
+    _write(os.path.join(bin_dir, "pactl"), PACTL_STUB, 0o755)
+    _write(os.path.join(bin_dir, "dbus-send"), DBUS_SEND_STUB, 0o755)
+
+    _write(os.path.join(bench_dir, "pactl_events"), "")
+    _write(os.path.join(bench_dir, "calls.log"), "")
+    _write(os.path.join(bench_dir, "sink_inputs"), scenario.get("sink_inputs", ""))
+    sinks = "Sink #1\n\tName: alsa_output.platform-soundcard\n"
+    if scenario.get("bluez_sink"):
+        sinks += "Sink #2\n\tName: bluez_sink.AA_BB_CC_DD_EE_FF.a2dp_sink\n"
+    _write(os.path.join(bench_dir, "sinks"), sinks)
+
+    bt = scenario.get("bt")
+    if bt:
+        objects = ""
+        for path, iface in ((BT_DEVICE, "org.bluez.Device1"),
+                            (f"{BT_DEVICE}/player0", "org.bluez.MediaPlayer1"),
+                            (f"{BT_DEVICE}/fd0", "org.bluez.MediaTransport1")):
+            objects += (f'      dict entry(\n         object path "{path}"\n'
+                        f'         array [\n            dict entry(\n'
+                        f'               string "{iface}"\n')
+        _write(os.path.join(bench_dir, "bluez_objects"), objects)
+        _write(os.path.join(bench_dir, "bluez_track"),
+               '   variant       array [\n'
+               '         dict entry(\n'
+               '            string "Title"\n'
+               f'            variant                string "{bt["title"]}"\n'
+               '         )\n'
+               '         dict entry(\n'
+               '            string "Artist"\n'
+               f'            variant                string "{bt["artist"]}"\n'
+               '         )\n'
+               '      ]\n')
+        _write(os.path.join(bench_dir, "bluez_status"), f'   variant       string "{bt["status"]}"\n')
+    else:
+        for name in ("bluez_objects", "bluez_track", "bluez_status"):
+            _write(os.path.join(bench_dir, name), "")
+
+    pipe_path = os.path.join(bench_dir, "shairport-sync-metadata")
+    os.mkfifo(pipe_path)
+
+    with open(TEMPLATE) as f:
+        ini = f.read()
+    replacements = {
+        "{{LMS_SERVER_IP}}": "127.0.0.1",
+        "{{LMS_SERVER_PORT}}": str(lms.http_port),
+        "{{PLAYER_ID}}": PLAYER_ID,
+        "{{OLED_BUS}}": "3",
+        "{{OLED_ADDR}}": "0x3C",
+        "{{OLED_WIDTH}}": "128",
+        "{{OLED_HEIGHT}}": "64",
+        "{{METADATA_PIPE}}": pipe_path,
+    }
+    for key, value in replacements.items():
+        ini = ini.replace(key, value)
+    ini = ini.replace("CLI_PORT = 9090", f"CLI_PORT = {lms.cli_port}")
+    ini = ini.replace("log_level = INFO", "log_level = WARNING")
+    ini = ini.replace("font_path = ./msyh.ttf", f"font_path = {font_path}")
+    ini = ini.replace("port = 9099", "port = 0")
+    # 缓存不写入用户目录；字形图集跨运行保留（与设备上的稳态一致）
+    ini = ini.replace("glyph_atlas_dir = ~/.cache/oled/glyphs",
+                      f"glyph_atlas_dir = {os.path.join(tempfile.gettempdir(), 'oled-bench-glyphs')}")
+    ini = ini.replace("cache_dir = ~/.cache/oled/artwork",
+                      f"cache_dir = {os.path.join(bench_dir, 'artwork')}")
+    ini = ini.replace("frame_export_path = /dev/shm/oled-frame",
+                      f"frame_export_path = {os.path.join(bench_dir, 'frame')}")
+    config_path = os.path.join(bench_dir, "oled.ini")
+    _write(config_path, ini)
+
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    os.environ["BENCH_DIR"] = bench_dir
+    # 让 BlueZ 客户端连接不存在的总线，蓝牙查询走 dbus-send 桩
+    os.environ["DBUS_SYSTEM_BUS_ADDRESS"] = "unix:path=" + os.path.join(bench_dir, "no-system-bus")
+    return config_path, pipe_path
+
+
+def feed_airplay_pipe(pipe_path, items):
+    """后台写入 AirPlay 元数据（open 会阻塞到 main 打开读端为止）"""
+    from bench_airplay_parser import encode_item
+
+    def run():
+        with open(pipe_path, "wb") as f:
+            for name, text in items:
+                f.write(encode_item("636f7265", AIRPLAY_CODES[name], text.encode()))
+            f.flush()
+            # 保持写端打开，避免读端看到 EOF
+            threading.Event().wait()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+# ============================================
+# 计数
+# ============================================
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.forks = 0
+        self.tick_latencies = []
+        self._tick_start = None
+
+    def count_fork(self):
+        with self.lock:
+            self.forks += 1
+
+    def tick_begin(self):
+        self._tick_start = time.perf_counter()
+
+    def tick_end(self):
+        if self._tick_start is not None:
+            self.tick_latencies.append(time.perf_counter() - self._tick_start)
+            self._tick_start = None
+
+
+def install_probes(counters, captured):
+    """包装 subprocess.Popen / EventLoop.run_once / display.init_display 以便计数"""
+    import display
+    import event_loop
+    from luma.core.interface.serial import noop
+
+    real_popen_init = subprocess.Popen.__init__
+
+    def popen_init(self, *args, **kwargs):
+        counters.count_fork()
+        real_popen_init(self, *args, **kwargs)
+
+    subprocess.Popen.__init__ = popen_init
+
+    # 两次 run_once 之间的时间即一次状态评估 + 渲染
+    real_run_once = event_loop.EventLoop.run_once
+
+    def run_once(self, max_wait=None):
+        counters.tick_end()
+        changed, fired = real_run_once(self, max_wait)
+        if changed or fired:
+            counters.tick_begin()
+        return changed, fired
+
+    event_loop.EventLoop.run_once = run_once
+
+    display.i2c = lambda port, address: noop()
+    real_init_display = display.init_display
+
+    def init_display(*args, **kwargs):
+        ctx = real_init_display(*args, **kwargs)
+        captured["display_ctx"] = ctx
+        return ctx
+
+    display.init_display = init_display
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+# ============================================
+# 单个场景（子进程）
+# ============================================
+def run_scenario(name, duration, warmup, font_path):
+    from fake_lms import FakeLMS
+
+    scenario = SCENARIOS[name]
+    lms = FakeLMS(player_id=PLAYER_ID).start()
+    if scenario.get("lms"):
+        lms.update(**scenario["lms"])
+
+    bench_dir = tempfile.mkdtemp(prefix="oled-bench-")
+    try:
+        config_path, pipe_path = prepare_environment(bench_dir, scenario, font_path, lms)
+        if scenario.get("airplay"):
+            feed_airplay_pipe(pipe_path, scenario["airplay"])
+
+        import config
+        config.CONFIG_FILE = config_path
+
+        counters = Counters()
+        captured = {}
+        install_probes(counters, captured)
+
+        import main
+        threading.Thread(target=main.main, name="main", daemon=True).start()
+
+        time.sleep(warmup)
+        framebuffer = captured["display_ctx"]["framebuffer"]
+        with counters.lock:
+            forks0 = counters.forks
+        ticks0 = len(counters.tick_latencies)
+        http0 = lms.http_requests
+        frames0, bus0 = framebuffer.frames, framebuffer.bus_bytes
+
+        time.sleep(duration)
+
+        with counters.lock:
+            forks = counters.forks - forks0
+        latencies = counters.tick_latencies[ticks0:]
+        http = lms.http_requests - http0
+        frames = framebuffer.frames - frames0
+        bus = framebuffer.bus_bytes - bus0
+        ticks = len(latencies)
+
+        return {
+            "scenario": name,
+            "desc": scenario["desc"],
+            "duration_s": duration,
+            "ticks": ticks,
+            "tick_p50_ms": percentile(latencies, 50) * 1000,
+            "tick_p90_ms": percentile(latencies, 90) * 1000,
+            "tick_p99_ms": percentile(latencies, 99) * 1000,
+            "tick_max_ms": max(latencies, default=0.0) * 1000,
+            "forks_per_tick": forks / ticks if ticks else float(forks),
+            "http_per_tick": http / ticks if ticks else float(http),
+            "fps": frames / duration,
+            "bytes_per_frame": bus / frames if frames else 0.0,
+            "bus_bytes_per_s": bus / duration,
+        }
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+
+# ============================================
+# 汇总
+# ============================================
+def print_report(results):
+    header = (f"{'scenario':12s} {'ticks':>5s} {'p50ms':>7s} {'p90ms':>7s} {'p99ms':>7s} {'maxms':>7s} "
+              f"{'fork/t':>6s} {'http/t':>6s} {'fps':>6s} {'B/frame':>8s} {'B/s':>8s}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['scenario']:12s} {r['ticks']:5d} {r['tick_p50_ms']:7.2f} {r['tick_p90_ms']:7.2f} "
+              f"{r['tick_p99_ms']:7.2f} {r['tick_max_ms']:7.2f} {r['forks_per_tick']:6.2f} "
+              f"{r['http_per_tick']:6.2f} {r['fps']:6.1f} {r['bytes_per_frame']:8.1f} "
+              f"{r['bus_bytes_per_s']:8.0f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OLED main loop benchmark")
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                    help="只运行指定场景（可重复）")
+    ap.add_argument("--duration", type=float, default=10.0, help="每个场景的测量时长（秒）")
+    ap.add_argument("--warmup", type=float, default=3.0, help="启动后开始测量前的等待（秒）")
+    ap.add_argument("--font", default=os.path.join(OLED_DIR, "msyh.ttf"), help="字体文件（CJK 场景需要）")
+    ap.add_argument("--json", action="store_true", help="输出 JSON")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+
+    if args.child:
+        result = run_scenario(names[0], args.duration, args.warmup, args.font)
+        print(json.dumps(result), flush=True)
+        # main 线程不会退出，直接结束进程
+        os._exit(0)
+
+    if not os.path.isfile(args.font):
+        print(f"警告: 字体 {args.font} 不存在，将使用默认字体（CJK 无法正常渲染）", file=sys.stderr)
+
+    results = []
+    for name in names:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", "--scenario", name,
+               "--duration", str(args.duration), "--warmup", str(args.warmup), "--font", args.font]
+        proc = subprocess.run(cmd, capture_output=True, text=True,
+                              timeout=args.duration + args.warmup + 60)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"场景 {name} 失败 (code={proc.returncode}):\n{proc.stderr[-2000:]}", file=sys.stderr)
+            continue
+        results.append(json.loads(lines[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
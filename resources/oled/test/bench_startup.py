@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# resources/oled/test/bench_startup.py
+#
+# 启动耗时基准测试（不需要 SSD1306 / PipeWire / BlueZ / LMS）
+#
+# 与 bench_main.py 使用相同的桩环境，每次在新的子进程中冷启动 main.main()，报告:
+#   spawn   子进程创建到第一帧发送完成（含解释器启动、桩环境准备和全部导入）
+#   frame   main.py 开始导入到第一帧（启动画面）发送完成
+#   state   main.py 开始导入到第一个状态画面提交
+# 以及 main.py 记录的各启动阶段耗时（imports / config / display / backend_imports / ...）。
+#
+# 运行:
+#   python3 bench_startup.py                  # 默认 5 次
+#   python3 bench_startup.py --runs 10 --scenario lms
+#   python3 bench_startup.py --font /usr/share/fonts/xxx.ttf
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+OLED_DIR = os.path.dirname(TEST_DIR)
+sys.path.insert(0, OLED_DIR)
+sys.path.insert(0, TEST_DIR)
+
+from bench_main import PLAYER_ID, SCENARIOS, prepare_environment
+
+
+# ============================================
+# 单次冷启动（子进程）
+# ============================================
+def run_once(scenario_name, font_path, timeout=30.0):
+    from fake_lms import FakeLMS
+
+    scenario = SCENARIOS[scenario_name]
+    lms = FakeLMS(player_id=PLAYER_ID).start()
+    if scenario.get("lms"):
+        lms.update(**scenario["lms"])
+
+    bench_dir = tempfile.mkdtemp(prefix="oled-startup-")
+    try:
+        config_path, _ = prepare_environment(bench_dir, scenario, font_path, lms)
+
+        import config
+        config.CONFIG_FILE = config_path
+
+        # display 通过 from ... import i2c 取得串口类，需在导入 main 之前替换
+        from luma.core.interface import serial
+        serial.i2c = lambda port, address: serial.noop()
+
+        import main
+        threading.Thread(target=main.main, name="main", daemon=True).start()
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if any(name == "first_tick" for name, _ in main.startup.stages):
+                break
+            time.sleep(0.005)
+        else:
+            raise RuntimeError("等待第一个状态画面超时")
+
+        import display
+        first_frame = display.get_first_frame_time()
+        now_perf, now_wall = time.perf_counter(), time.time()
+        return {
+            "frame_ms": main.startup.elapsed(first_frame) * 1000,
+            "state_ms": sum(sec for _, sec in main.startup.stages) * 1000,
+            "first_frame_wall": now_wall - (now_perf - first_frame),
+            "stages_ms": {name: sec * 1000 for name, sec in main.startup.stages},
+        }
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+
+# ============================================
+# 汇总
+# ============================================
+def _stats(values):
+    return statistics.median(values), min(values), max(values)
+
+
+def print_report(results):
+    print(f"runs={len(results)}")
+    print(f"{'':10s} {'median':>8s} {'min':>8s} {'max':>8s}")
+    for key, label in (("spawn_ms", "spawn"), ("frame_ms", "frame"), ("state_ms", "state")):
+        med, lo, hi = _stats([r[key] for r in results])
+        print(f"{label:10s} {med:8.1f} {lo:8.1f} {hi:8.1f}")
+    print()
+    print("阶段 (中位数 ms):")
+    for name in results[0]["stages_ms"]:
+        med = statistics.median(r["stages_ms"].get(name, 0.0) for r in results)
+        print(f"  {name:16s} {med:8.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OLED startup benchmark")
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), default="idle")
+    ap.add_argument("--runs", type=int, default=5, help="冷启动次数")
+    ap.add_argument("--font", default=os.path.join(OLED_DIR, "msyh.ttf"), help="字体文件")
+    ap.add_argument("--json", action="store_true", help="输出 JSON")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        result = run_once(args.scenario, args.font)
+        print(json.dumps(result), flush=True)
+        # main 线程不会退出，直接结束进程
+        os._exit(0)
+
+    if not os.path.isfile(args.font):
+        print(f"警告: 字体 {args.font} 不存在，将使用默认字体", file=sys.stderr)
+
+    results = []
+    for i in range(args.runs):
+        cmd = [sys.executable, os.path.abspath(__file__), "--child",
+               "--scenario", args.scenario, "--font", args.font]
+        spawn_wall = time.time()
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"第 {i + 1} 次启动失败 (code={proc.returncode}):\n{proc.stderr[-2000:]}",
+                  file=sys.stderr)
+            continue
+        result = json.loads(lines[-1])
+        result["spawn_ms"] = (result["first_frame_wall"] - spawn_wall) * 1000
+        results.append(result)
+
+    if not results:
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
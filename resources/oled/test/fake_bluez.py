@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# resources/oled/test/fake_bluez.py
+#
+# 会话总线上的假 BlueZ 服务（基于 jeepney），用于离线测试 bluez_client：
+#   - 在 SESSION 总线上注册 org.bluez
+#   - 提供 ObjectManager.GetManagedObjects 与 Properties.Get / GetAll
+#   - 修改属性时发送 PropertiesChanged / InterfacesAdded / InterfacesRemoved
+#
+# 需要会话总线（例如: dbus-run-session -- python3 fake_bluez.py）
+# 独立运行时在标准输入中输入命令:
+#   connect / disconnect / play / pause / title <文字> / artist <文字> / volume <0-127> / quit
+
+import os
+import queue
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jeepney import DBusAddress, HeaderFields, MessageType, new_error, new_method_return, new_signal
+from jeepney.bus_messages import message_bus
+from jeepney.io.blocking import open_dbus_connection
+
+from bluez_client import (
+    BLUEZ_SERVICE, IFACE_OBJECT_MANAGER, IFACE_PLAYER, IFACE_PROPERTIES, IFACE_TRANSPORT
+)
+
+DEVICE_PATH = "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF"
+PLAYER_PATH = DEVICE_PATH + "/player0"
+TRANSPORT_PATH = DEVICE_PATH + "/sep1/fd0"
+
+_SIGNATURES = {"Status": "s", "Volume": "q", "Name": "s", "State": "s", "Connected": "b"}
+
+
+def _wrap(name, value):
+    """普通值 -> jeepney 变体"""
+    if isinstance(value, dict):
+        return ("a{sv}", {k: _wrap(k, v) for k, v in value.items()})
+    return (_SIGNATURES.get(name, "s"), value)
+
+
+def _wrap_props(props):
+    return {k: _wrap(k, v) for k, v in props.items()}
+
+
+class FakeBluez:
+    """假 BlueZ：对象树 + 信号发送"""
+
+    def __init__(self, bus="SESSION"):
+        self.bus = bus
+        self.objects = {
+            "/org/bluez/hci0": {"org.bluez.Adapter1": {"Name": "fake-hci0"}},
+        }
+        self.calls = 0
+        self._ops = queue.Queue()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name="fake-bluez", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(5):
+            raise RuntimeError("fake BlueZ 启动失败")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+
+    # -------------------------------
+    # 场景操作（线程安全，交给服务线程执行）
+    # -------------------------------
+    def connect_device(self, title="Fake Song", artist="Fake Artist", volume=64):
+        self._ops.put(("add", DEVICE_PATH, {"org.bluez.Device1": {"Name": "Fake Phone", "Connected": True}}))
+        self._ops.put(("add", PLAYER_PATH, {IFACE_PLAYER: {
+            "Status": "paused", "Track": {"Title": title, "Artist": artist}}}))
+        self._ops.put(("add", TRANSPORT_PATH, {IFACE_TRANSPORT: {"State": "idle", "Volume": volume}}))
+
+    def disconnect_device(self):
+        for path in (TRANSPORT_PATH, PLAYER_PATH, DEVICE_PATH):
+            self._ops.put(("remove", path, None))
+
+    def set_status(self, status):
+        self._ops.put(("set", PLAYER_PATH, (IFACE_PLAYER, {"Status": status})))
+
+    def set_track(self, title, artist):
+        self._ops.put(("set", PLAYER_PATH, (IFACE_PLAYER, {"Track": {"Title": title, "Artist": artist}})))
+
+    def set_volume(self, volume):
+        self._ops.put(("set", TRANSPORT_PATH, (IFACE_TRANSPORT, {"Volume": volume})))
+
+    # -------------------------------
+    # 服务线程
+    # -------------------------------
+    def _serve(self):
+        conn = open_dbus_connection(bus=self.bus)
+        try:
+            conn.send_and_get_reply(message_bus.RequestName(BLUEZ_SERVICE), timeout=2)
+            self._ready.set()
+            while not self._stop.is_set():
+                self._apply_ops(conn)
+                try:
+                    msg = conn.receive(timeout=0.05)
+                except TimeoutError:
+                    continue
+                if msg.header.message_type == MessageType.method_call:
+                    self._handle_call(conn, msg)
+        finally:
+            conn.close()
+
+    def _handle_call(self, conn, msg):
+        self.calls += 1
+        fields = msg.header.fields
+        path = fields.get(HeaderFields.path)
+        iface = fields.get(HeaderFields.interface)
+        member = fields.get(HeaderFields.member)
+
+        if iface == IFACE_OBJECT_MANAGER and member == "GetManagedObjects":
+            body = {p: {i: _wrap_props(props) for i, props in ifaces.items()}
+                    for p, ifaces in self.objects.items()}
+            conn.send_message(new_method_return(msg, "a{oa{sa{sv}}}", (body,)))
+        elif iface == IFACE_PROPERTIES and member == "GetAll":
+            props = self.objects.get(path, {}).get(msg.body[0], {})
+            conn.send_message(new_method_return(msg, "a{sv}", (_wrap_props(props),)))
+        elif iface == IFACE_PROPERTIES and member == "Get":
+            props = self.objects.get(path, {}).get(msg.body[0], {})
+            name = msg.body[1]
+            if name in props:
+                conn.send_message(new_method_return(msg, "v", (_wrap(name, props[name]),)))
+            else:
+                conn.send_message(new_error(msg, "org.freedesktop.DBus.Error.InvalidArgs"))
+        else:
+            conn.send_message(new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod"))
+
+    def _apply_ops(self, conn):
+        while True:
+            try:
+                op, path, arg = self._ops.get_nowait()
+            except queue.Empty:
+                return
+            root = DBusAddress("/", interface=IFACE_OBJECT_MANAGER)
+            if op == "add":
+                self.objects[path] = arg
+                conn.send_message(new_signal(root, "InterfacesAdded", "oa{sa{sv}}", (
+                    path, {i: _wrap_props(props) for i, props in arg.items()})))
+            elif op == "remove":
+                ifaces = list(self.objects.pop(path, {}))
+                conn.send_message(new_signal(root, "InterfacesRemoved", "oas", (path, ifaces)))
+            elif op == "set":
+                iface, changed = arg
+                self.objects.setdefault(path, {}).setdefault(iface, {}).update(changed)
+                addr = DBusAddress(path, interface=IFACE_PROPERTIES)
+                conn.send_message(new_signal(addr, "PropertiesChanged", "sa{sv}as", (
+                    iface, _wrap_props(changed), [])))
+
+
+def main():
+    fake = FakeBluez().start()
+    print(f"Fake BlueZ on session bus: {os.environ.get('DBUS_SESSION_BUS_ADDRESS', '?')}")
+    print("命令: connect | disconnect | play | pause | title <文字> | artist <文字> | volume <0-127> | quit")
+    track = {"title": "Fake Song", "artist": "Fake Artist"}
+
+    for line in sys.stdin:
+        parts = line.strip().split(" ", 1)
+        cmd = parts[0]
+        arg = parts[1] if len(parts) > 1 else ""
+        if cmd == "connect":
+            fake.connect_device(**track)
+        elif cmd == "disconnect":
+            fake.disconnect_device()
+        elif cmd in ("play", "pause"):
+            fake.set_status("playing" if cmd == "play" else "paused")
+        elif cmd in ("title", "artist"):
+            track[cmd] = arg
+            fake.set_track(**track)
+        elif cmd == "volume":
+            fake.set_volume(int(arg))
+        elif cmd == "quit":
+            break
+
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
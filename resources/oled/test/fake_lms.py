@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# resources/oled/test/fake_lms.py
+#
+# 本地假 LMS 服务器，用于离线测试 OLED 服务：
+#   - HTTP JSON-RPC (/jsonrpc.js): status / mode / current_title / artist / mixer volume
+#   - CLI (默认 9090): subscribe / listen，状态变化时推送通知
+#
+# 独立运行:
+#   python3 fake_lms.py --http-port 9000 --cli-port 9090 --player 00:11:22:33:44:55
+# 然后在标准输入中输入命令: play / pause / stop / title <文字> / artist <文字> / volume <0-100>
+
+import argparse
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lms_events import format_notification
+
+
+class FakeLMS:
+    """假 LMS：保存一个播放器的状态，并向 CLI 订阅者推送通知"""
+
+    def __init__(self, player_id="00:11:22:33:44:55", host="127.0.0.1", http_port=0, cli_port=0):
+        self.player_id = player_id
+        self.lock = threading.Lock()
+        self.state = {
+            "mode": "stop",
+            "title": "Fake Title",
+            "artist": "Fake Artist",
+            "volume": 50,
+            "duration": 240.0,
+            "time": 0.0,
+        }
+        self.http_requests = 0
+        self.cli_clients = []
+
+        fake = self
+
+        class JsonRpcHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    req = json.loads(self.rfile.read(length) or b"{}")
+                    result = fake.handle_jsonrpc(req.get("params", [None, []])[1])
+                    body = json.dumps({"id": req.get("id"), "method": "slim.request",
+                                       "result": result}).encode()
+                    self.send_response(200)
+                except Exception as e:
+                    body = json.dumps({"error": str(e)}).encode()
+                    self.send_response(500)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class CliHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with fake.lock:
+                    fake.cli_clients.append(self)
+                try:
+                    for raw in self.rfile:
+                        line = raw.decode("utf-8", errors="ignore").strip()
+                        if line:
+                            # CLI 协议：回显命令本身
+                            self.wfile.write((line + "\n").encode())
+                finally:
+                    with fake.lock:
+                        if self in fake.cli_clients:
+                            fake.cli_clients.remove(self)
+
+        self.http_server = http.server.ThreadingHTTPServer((host, http_port), JsonRpcHandler)
+        self.cli_server = socketserver.ThreadingTCPServer((host, cli_port), CliHandler)
+        self.cli_server.daemon_threads = True
+        self.http_server.daemon_threads = True
+
+    @property
+    def http_port(self):
+        return self.http_server.server_address[1]
+
+    @property
+    def cli_port(self):
+        return self.cli_server.server_address[1]
+
+    def start(self):
+        for server in (self.http_server, self.cli_server):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in (self.http_server, self.cli_server):
+            server.shutdown()
+            server.server_close()
+
+    # -------------------------------
+    # JSON-RPC
+    # -------------------------------
+    def handle_jsonrpc(self, cmd):
+        with self.lock:
+            self.http_requests += 1
+            st = dict(self.state)
+        if not cmd:
+            return {}
+        if cmd[0] == "status":
+            return {
+                "mode": st["mode"],
+                "time": st["time"],
+                "duration": st["duration"],
+                "mixer volume": st["volume"],
+                "playlist_loop": [{"title": st["title"], "artist": st["artist"],
+                                   "duration": st["duration"]}],
+            }
+        if cmd[0] == "mode":
+            return {"_mode": st["mode"]}
+        if cmd[0] == "current_title":
+            return {"_current_title": st["title"]}
+        if cmd[0] == "artist":
+            return {"_artist": st["artist"]}
+        if cmd[:2] == ["mixer", "volume"]:
+            return {"_volume": str(st["volume"])}
+        return {}
+
+    # -------------------------------
+    # 状态修改 + CLI 通知
+    # -------------------------------
+    def update(self, **changes):
+        """修改播放器状态，并按字段推送对应的 CLI 通知"""
+        with self.lock:
+            self.state.update(changes)
+        if "mode" in changes:
+            mode = changes["mode"]
+            if mode == "play":
+                self.notify("play")
+            elif mode == "pause":
+                self.notify("pause", "1")
+            else:
+                self.notify("stop")
+        if "title" in changes or "artist" in changes:
+            self.notify("playlist", "newsong", self.state["title"], "0")
+        if "volume" in changes:
+            self.notify("mixer", "volume", str(changes["volume"]))
+
+    def notify(self, *fields):
+        line = format_notification(self.player_id, *fields).encode()
+        with self.lock:
+            clients = list(self.cli_clients)
+        for client in clients:
+            try:
+                client.wfile.write(line)
+                client.wfile.flush()
+            except OSError:
+                pass
+
+    def drop_cli_clients(self):
+        """断开所有 CLI 连接（测试回退到轮询）"""
+        with self.lock:
+            clients = list(self.cli_clients)
+        for client in clients:
+            try:
+                client.connection.shutdown(2)
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake LMS server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, default=9000)
+    parser.add_argument("--cli-port", type=int, default=9090)
+    parser.add_argument("--player", default="00:11:22:33:44:55")
+    args = parser.parse_args()
+
+    fake = FakeLMS(args.player, args.host, args.http_port, args.cli_port).start()
+    print(f"Fake LMS: http={args.host}:{fake.http_port} cli={args.host}:{fake.cli_port} player={args.player}")
+    print("命令: play | pause | stop | title <文字> | artist <文字> | volume <0-100> | drop | quit")
+
+    for line in sys.stdin:
+        parts = line.strip().split(" ", 1)
+        cmd = parts[0]
+        arg = parts[1] if len(parts) > 1 else ""
+        if cmd in ("play", "pause", "stop"):
+            fake.update(mode=cmd)
+        elif cmd in ("title", "artist"):
+            fake.update(**{cmd: arg})
+        elif cmd == "volume":
+            fake.update(volume=int(arg))
+        elif cmd == "drop":
+            fake.drop_cli_clients()
+        elif cmd == "quit":
+            break
+        print(f"state={fake.state} http_requests={fake.http_requests}")
+
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
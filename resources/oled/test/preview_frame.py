@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# resources/oled/test/preview_frame.py
+#
+# 读取共享内存帧导出（display 配置 frame_export_path，默认 /dev/shm/oled-frame），
+# 在终端中用半高方块字符显示 OLED 当前画面，或保存为 PNG。不访问 I2C 总线。
+#
+# 运行（在设备上，或通过 ssh）:
+#   python3 preview_frame.py                  # 显示一帧
+#   python3 preview_frame.py --watch          # 持续刷新
+#   python3 preview_frame.py --png shot.png   # 保存截图（放大 4 倍）
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_export import DEFAULT_PATH, FrameReader
+
+# 上半像素/下半像素 -> 字符
+_BLOCKS = {(0, 0): " ", (1, 0): "▀", (0, 1): "▄", (1, 1): "█"}
+
+
+def to_text(image):
+    """把 1-bit 图像转为文本（每个字符表示上下两个像素）"""
+    w, h = image.size
+    px = image.load()
+    lines = []
+    for y in range(0, h, 2):
+        row = []
+        for x in range(w):
+            top = 1 if px[x, y] else 0
+            bottom = 1 if y + 1 < h and px[x, y + 1] else 0
+            row.append(_BLOCKS[(top, bottom)])
+        lines.append("".join(row))
+    return lines
+
+
+def print_frame(reader, seq, ts, image):
+    border = "+" + "-" * reader.width + "+"
+    print(border)
+    for line in to_text(image):
+        print("|" + line + "|")
+    print(border)
+    age = time.time() - ts if ts else 0.0
+    print(f"frame #{seq // 2}  {reader.width}x{reader.height}  {age:.1f}s ago")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OLED frame preview")
+    ap.add_argument("--path", default=DEFAULT_PATH, help="帧导出文件")
+    ap.add_argument("--watch", action="store_true", help="持续刷新")
+    ap.add_argument("--png", help="保存为 PNG 文件")
+    ap.add_argument("--scale", type=int, default=4, help="PNG 放大倍数")
+    args = ap.parse_args()
+
+    try:
+        reader = FrameReader(args.path)
+    except (OSError, ValueError) as e:
+        print(f"无法打开帧导出文件 {args.path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    seq, ts, image = reader.read()
+    if args.png:
+        image.resize((image.width * args.scale, image.height * args.scale)).save(args.png)
+        print(f"已保存 {args.png} (frame #{seq // 2})")
+        return
+
+    if not args.watch:
+        print_frame(reader, seq, ts, image)
+        return
+
+    try:
+        while True:
+            # 光标回到左上角后重绘，避免闪烁
+            sys.stdout.write("\033[H\033[J")
+            print_frame(reader, seq, ts, image)
+            sys.stdout.flush()
+            # 滚动时帧率可达数十 fps，终端刷新限制在 10 fps
+            time.sleep(0.1)
+            frame = reader.wait_next(seq, timeout=1.0)
+            if frame is not None:
+                seq, ts, image = frame
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# resources/oled/test/replay.py
+#
+# 回放 [CAPTURE] 录制的后端输入（不需要 SSD1306 / PipeWire / BlueZ / LMS）
+#
+# pactl / dbus-send / LMS / BlueZ 的查询结果按"时刻 t 之前最近一次的录制结果"返回，
+# AirPlay 管道字节按时间顺序送入解析器。main.StateTicker 在虚拟时钟上运行：
+# 每条录制记录的时刻（原主循环被事件唤醒的时刻）以及每隔 1 秒各 tick 一次。
+# 画面切换、音量弹窗和屏保动作写入时间线；时钟文字使用录制时的墙钟时间（按 --tz 时区）。
+#
+# 用途:
+#   - 复现：回放现场录制，逐条查看 BT/LMS 状态抖动等问题
+#   - 回归：--save 保存时间线，修改代码后用 --expect 对比，不一致时退出码为 1
+#   - 吞吐：默认以最快速度运行，报告每分钟墙钟能模拟多少小时（--loop 重复回放）
+#
+# 运行:
+#   python3 replay.py capture.jsonl.gz
+#   python3 replay.py capture.jsonl.gz --speed 1          # 按原速回放
+#   python3 replay.py capture.jsonl.gz --loop 200 -q      # 吞吐测试
+#   python3 replay.py capture.jsonl.gz --save golden.txt
+#   python3 replay.py capture.jsonl.gz --expect golden.txt
+
+import argparse
+import bisect
+import difflib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time as _time
+from collections import Counter, defaultdict
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+OLED_DIR = os.path.dirname(TEST_DIR)
+sys.path.insert(0, OLED_DIR)
+
+import recorder
+import screen_state
+
+TEMPLATE = os.path.join(OLED_DIR, "..", "..", "templates", "configs", "oled.ini.template")
+# 没有录制记录时的 tick 间隔（秒），与主循环轮询间隔一致
+TICK_INTERVAL = 1.0
+# 不是查询结果、只作为 tick 时刻的记录
+STREAM_KINDS = ("airplay", "pactl-event", "lms-cli")
+
+
+# ============================================
+# 虚拟时钟 / 录制数据源 / 假显示
+# ============================================
+class VirtualClock:
+    """代替各模块中的 time 模块：time() / monotonic() 返回回放时间线上的时刻"""
+
+    def __init__(self, start_wall):
+        self.start_wall = start_wall
+        self.t = 0.0
+
+    def time(self):
+        return self.start_wall + self.t
+
+    def monotonic(self):
+        return self.t
+
+    def localtime(self, secs=None):
+        return _time.localtime(self.time() if secs is None else secs)
+
+    def strftime(self, fmt, t=None):
+        return _time.strftime(fmt, self.localtime() if t is None else t)
+
+    def sleep(self, seconds):
+        pass
+
+    def __getattr__(self, name):
+        # perf_counter 等其余函数使用真实时间（只影响指标）
+        return getattr(_time, name)
+
+
+class ReplaySource:
+    """按 (kind, key) 索引的查询结果，lookup() 返回时刻 now 之前最近的一条"""
+
+    def __init__(self, records):
+        self._times = defaultdict(list)
+        self._results = defaultdict(list)
+        for t, kind, key, value, error in records:
+            if kind in STREAM_KINDS:
+                continue
+            self._times[(kind, key)].append(t)
+            self._results[(kind, key)].append((value, error))
+        self.now = 0.0
+        self.misses = Counter()
+
+    def has(self, kind):
+        return any(k == kind for k, _ in self._times)
+
+    def result(self, kind, key):
+        """
+        Returns:
+            tuple: (value, error)；该时刻之前没有录制时返回 (None, "未录制")
+        """
+        times = self._times.get((kind, key))
+        i = bisect.bisect_right(times, self.now) if times else 0
+        if i == 0:
+            self.misses[kind] += 1
+            return None, f"未录制: {kind} {key}"
+        return self._results[(kind, key)][i - 1]
+
+    def lookup(self, kind, key):
+        value, error = self.result(kind, key)
+        if error is not None:
+            raise RuntimeError(error)
+        return value
+
+
+class ReplayBluez:
+    """代替进程内 BlueZ 客户端（录制时客户端就绪，查询结果记录为 bluez）"""
+
+    ready = True
+
+    def __init__(self, source):
+        self.source = source
+
+    def get_metadata(self):
+        value, error = self.source.result("bluez", "metadata")
+        return tuple(value) if error is None else ("", "", "unknown")
+
+    def get_volume(self):
+        value, error = self.source.result("bluez", "volume")
+        return value if error is None else -1
+
+
+class FakeDisplay:
+    """代替 OLED：记录画面切换、音量弹窗和屏保动作"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.ctx = {"width": 128, "height": 64, "default_brightness": 255, "dim_brightness": 8}
+        self.timeline = []      # [(t, text), ...]
+        self.requests = 0
+        self._state = None
+
+    def log(self, text):
+        self.timeline.append((self.clock.t, text))
+
+    def show_screen(self, ctx, state):
+        self.requests += 1
+        regions = screen_state.diff(self._state, state)
+        self._state = state
+        # 时钟每秒走字，只记录进入时钟模式和日期变化
+        if state.is_clock:
+            if regions & screen_state.TOP:
+                self.log(f"时钟 {state.top_text}")
+        elif regions & (screen_state.TOP | screen_state.BOTTOM):
+            # 区域名标出合成线程会重绘的部分（只有 bottom 才会从头滚动）
+            names = ",".join(screen_state.region_names(regions & ~(screen_state.VOLUME | screen_state.CLOCK)))
+            self.log(f"[{names}] {state.top_text} | {state.bottom_text}"
+                     + (" [封面]" if state.artwork is not None else ""))
+
+    def show_volume(self, volume, duration):
+        self.log(f"音量 {volume}")
+
+    def set_brightness(self, ctx, level):
+        self.log(f"亮度 {level}")
+
+    def turn_off(self, ctx):
+        self.log("关屏")
+
+    def turn_on(self, ctx):
+        self.log("开屏")
+
+
+# ============================================
+# 环境
+# ============================================
+def load_replay_config():
+    """用配置模板生成配置（录制回放不访问任何后端地址）"""
+    import config
+
+    with open(TEMPLATE, encoding="utf-8") as f:
+        ini = f.read()
+    for key, value in {
+        "{{LMS_SERVER_IP}}": "127.0.0.1", "{{LMS_SERVER_PORT}}": "9000",
+        "{{PLAYER_ID}}": "00:00:00:00:00:00", "{{OLED_BUS}}": "1", "{{OLED_ADDR}}": "0x3C",
+        "{{OLED_WIDTH}}": "128", "{{OLED_HEIGHT}}": "64",
+        "{{METADATA_PIPE}}": os.path.join(tempfile.gettempdir(), "oled-replay-no-pipe"),
+    }.items():
+        ini = ini.replace(key, value)
+    fd, path = tempfile.mkstemp(prefix="oled-replay-", suffix=".ini")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(ini)
+    try:
+        config.CONFIG_FILE = path
+        return config.load_config()
+    finally:
+        os.remove(path)
+
+
+def setup(records, header):
+    """替换查询的出口、时间和显示，返回 (ticker, clock, source, display)"""
+    clock = VirtualClock(header.get("start_wall", 0.0))
+    source = ReplaySource(records)
+    display = FakeDisplay(clock)
+
+    cfg = load_replay_config()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    import main
+    import query
+    import screensaver
+    import state_handlers
+    import status
+    import volume_popup
+
+    for module in (main, query, screensaver, state_handlers, status, volume_popup):
+        module.time = clock
+
+    query._run_pactl = lambda env, *args: source.lookup("pactl", " ".join(args))
+    query._dbus_send = lambda cmd, timeout=1, stderr=None: source.lookup("dbus-send", " ".join(cmd))
+
+    def get_player_status(cmd, host_ip, host_port, player_id, retries=3, delay=2):
+        value, error = source.result("lms", json.dumps(cmd))
+        return error, value
+
+    query.get_player_status = get_player_status
+    if source.has("bluez"):
+        query._bluez_client = ReplayBluez(source)
+    query.init_airplay_pipe(cfg["airplay"]["metadata_pipe"])
+
+    main.show_screen = display.show_screen
+    screensaver.set_brightness = display.set_brightness
+    screensaver.turn_off_display = display.turn_off
+    screensaver.turn_on_display = display.turn_on
+    volume_popup.configure(display.show_volume, cfg["volume"]["popup_duration"])
+    # 回放中的查询都是内存查找，预算放宽，结果不受机器快慢影响
+    state_handlers.configure_probes(cfg["probe"]["workers"], 5.0)
+
+    saver = screensaver.ScreenSaver(
+        display.ctx,
+        dim_timeout=cfg["screensaver"]["dim_timeout"],
+        off_timeout=cfg["screensaver"]["off_timeout"]
+    )
+    ticker = main.StateTicker(cfg, display.ctx, {}, saver)
+    return ticker, clock, source, display
+
+
+# ============================================
+# 回放
+# ============================================
+def replay(records, ticker, clock, source, speed=0.0, loops=1):
+    """
+    Returns:
+        dict: ticks / source_changes / sim_seconds / wall_seconds
+    """
+    import query
+
+    duration = records[-1][0] if records else 0.0
+    stream = [(t, value) for t, kind, _, value, _ in records if kind == "airplay"]
+    times = sorted({t for t, _, _, _, _ in records})
+
+    ticks = 0
+    source_changes = 0
+    last_source = None
+    wall_start = _time.perf_counter()
+    for n in range(loops):
+        offset = n * (duration + TICK_INTERVAL)
+        t = times[0] if times else 0.0
+        i_stream = 0
+        i_time = 0
+        while t <= duration:
+            source.now = t
+            clock.t = offset + t
+            if speed:
+                delay = wall_start + clock.t / speed - _time.perf_counter()
+                if delay > 0:
+                    _time.sleep(delay)
+
+            while i_stream < len(stream) and stream[i_stream][0] <= t:
+                query.feed_airplay_bytes(stream[i_stream][1])
+                i_stream += 1
+
+            ticker.tick()
+            ticks += 1
+            if ticker.active_player_type != last_source:
+                source_changes += 1
+                last_source = ticker.active_player_type
+
+            # 下一个 tick：下一条录制记录的时刻，最多间隔 TICK_INTERVAL
+            while i_time < len(times) and times[i_time] <= t:
+                i_time += 1
+            next_t = t + TICK_INTERVAL
+            if i_time < len(times):
+                next_t = min(next_t, times[i_time])
+            t = next_t
+
+    return {
+        "ticks": ticks,
+        "source_changes": source_changes,
+        "sim_seconds": loops * (duration + TICK_INTERVAL),
+        "wall_seconds": _time.perf_counter() - wall_start,
+    }
+
+
+def format_timeline(timeline):
+    return [f"{t:10.3f}  {text}" for t, text in timeline]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OLED capture replay")
+    ap.add_argument("capture", help="录制文件 ([CAPTURE] path)")
+    ap.add_argument("--speed", type=float, default=0.0, help="回放倍速 (0 = 尽快, 1 = 原速)")
+    ap.add_argument("--loop", type=int, default=1, help="重复回放次数（吞吐测试）")
+    ap.add_argument("--tz", default="UTC", help="时钟文字使用的时区（保证时间线可复现）")
+    ap.add_argument("--save", help="保存时间线")
+    ap.add_argument("--expect", help="与保存的时间线对比，不一致时退出码为 1")
+    ap.add_argument("-q", "--quiet", action="store_true", help="不打印时间线")
+    args = ap.parse_args()
+
+    os.environ["TZ"] = args.tz
+    _time.tzset()
+
+    header, records = recorder.read_capture(args.capture)
+    ticker, clock, source, display = setup(records, header)
+    if args.quiet:
+        # 录制开始前的查询失败已计入"未录制的查询"
+        logging.getLogger().setLevel(logging.ERROR)
+    result = replay(records, ticker, clock, source, speed=args.speed, loops=max(1, args.loop))
+    lines = format_timeline(display.timeline)
+
+    if not args.quiet:
+        print("\n".join(lines))
+        print()
+
+    kinds = Counter(kind for _, kind, _, _, _ in records)
+    sim_hours = result["sim_seconds"] / 3600
+    wall = max(result["wall_seconds"], 1e-9)
+    print(f"录制: {records[-1][0] if records else 0:.1f}s, {len(records)} 条记录 "
+          f"({', '.join(f'{k} {n}' for k, n in sorted(kinds.items()))})")
+    print(f"回放: {result['ticks']} 次 tick, {display.requests} 次画面请求, "
+          f"{len(display.timeline)} 条时间线, 音源切换 {result['source_changes']} 次")
+    if source.misses:
+        print(f"未录制的查询: {dict(source.misses)}")
+    print(f"吞吐: 模拟 {sim_hours:.3f}h 用时 {wall:.2f}s -> "
+          f"{sim_hours / wall * 60:.1f} 模拟小时/墙钟分钟, {result['ticks'] / wall:.0f} tick/s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        print(f"时间线已保存: {args.save}")
+    if args.expect:
+        with open(args.expect, encoding="utf-8") as f:
+            expected = f.read().splitlines()
+        diff = list(difflib.unified_diff(expected, lines, "expected", "replay", lineterm=""))
+        if diff:
+            print("\n".join(diff))
+            print("时间线与预期不一致")
+            sys.exit(1)
+        print("时间线与预期一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# resources/oled/text_cache.py
+#
+# 文本渲染缓存（LRU + 字节预算）
+#
+# 以 (文本, 字体文件, 字号) 为键，缓存 textbbox 测量结果和预先光栅化的 1-bit 图像。
+# 测量和渲染只在离屏 Image 上进行，不会触碰显示设备；超出字节预算时按最近最少使用淘汰，
+# 长时间运行、频繁切歌时内存占用保持平稳。
+
+import threading
+from collections import OrderedDict, namedtuple
+
+from PIL import Image, ImageDraw
+
+import metrics
+
+# 默认字节预算（图像数据 + 估算的对象开销）
+DEFAULT_BUDGET_BYTES = 256 * 1024
+# 每个条目除图像数据外的估算开销（Image 对象、键、元组）
+ENTRY_OVERHEAD = 256
+
+# 供测量使用的离屏画布（只用于 textbbox，不绘制）
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("1", (1, 1)))
+
+
+class RenderedText(namedtuple("RenderedText", "image bbox origin")):
+    """
+    image:  1-bit 图像，已包含文字的全部墨迹
+    bbox:   与 draw.textbbox((0, 0), text, font) 相同的包围盒
+    origin: 文字绘制原点在 image 中的位置，paste 到 (x - ox, y - oy) 等价于 draw.text((x, y))
+    """
+    __slots__ = ()
+
+    @property
+    def width(self):
+        return self.bbox[2] - self.bbox[0]
+
+    @property
+    def height(self):
+        return self.bbox[3] - self.bbox[1]
+
+    def paste_into(self, target, xy):
+        """把文字叠加到 target 上（只点亮墨迹像素，与 draw.text 结果一致）"""
+        x, y = xy
+        ox, oy = self.origin
+        target.paste(255, (x - ox, y - oy), self.image)
+
+
+def font_key(font):
+    """字体标识：TrueType 字体用 (文件, 字号)，内置位图字体用对象 id"""
+    path = getattr(font, "path", None)
+    if path is None:
+        return ("<builtin>", id(font))
+    return (path, getattr(font, "size", None))
+
+
+def _image_bytes(image):
+    return ((image.width + 7) // 8) * image.height
+
+
+class TextCache:
+    """线程安全的文本渲染 LRU 缓存"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()   # key -> (RenderedText, size)
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text, font):
+        """
+        获取文字的测量结果和 1-bit 图像（未命中时渲染并缓存）
+
+        Returns:
+            RenderedText
+        """
+        key = (text, font_key(font))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        with metrics.timed("display.text_render"):
+            rendered = render_text(text, font)
+        size = _image_bytes(rendered.image) + len(text) * 4 + ENTRY_OVERHEAD
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (rendered, size)
+                self._bytes += size
+                self._evict()
+        return rendered
+
+    def measure(self, text, font):
+        """只需要包围盒时使用，同样走缓存"""
+        return self.get(text, font).bbox
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        # 至少保留最新的一个条目，即使它本身超过预算
+        while self._bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def render_text(text, font):
+    """渲染单个文字串（不经过缓存）；字形图集等自带渲染的字体交给它自己拼接"""
+    own_render = getattr(font, "render_text", None)
+    if own_render is not None:
+        return own_render(text)
+    bbox = _MEASURE_DRAW.textbbox((0, 0), text, font=font)
+    # 墨迹可能出现在原点左侧/上方（负的 bbox），此时整体平移
+    ox = max(0, -bbox[0])
+    oy = max(0, -bbox[1])
+    w = max(1, bbox[2] + ox)
+    h = max(1, bbox[3] + oy)
+    image = Image.new("1", (w, h))
+    ImageDraw.Draw(image).text((ox, oy), text, font=font, fill=255)
+    return RenderedText(image, bbox, (ox, oy))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# resources/oled/volume_popup.py
+#
+# 事件驱动的音量弹窗
+#
+# 各后端在自己的线程中收到音量变化时直接调用 report(通道, 音量)：
+#   "system"     pactl subscribe：默认 sink 音量
+#   "airplay"    AirPlay 元数据管道中的 pvol
+#   "bluetooth"  BlueZ MediaTransport1.Volume 属性变化
+#   "lms"        LMS CLI 的 mixer volume 通知（+N / -N 为相对值，见 report_delta）
+# 主循环每个 tick 通过 track() 告知当前画面的音量来自哪个通道，只有该通道的变化才弹出。
+# 弹窗直接交给合成线程（只重绘底部音量条，连续事件合并，到期自行撤下），
+# 不等待主循环的下一个 tick；没有事件源时，track() 发现的轮询结果也走同一路径。
+
+import threading
+import time
+
+import metrics
+import wakeup
+
+_lock = threading.Lock()
+_show = None            # show(volume, duration)，由 configure() 设置
+_duration = 0.0
+_channel = None         # 当前画面使用的音量通道；暂停 / 空闲时为 None
+_volumes = {}           # 通道 -> 最近一次的音量
+_visible_until = 0.0    # time.monotonic()
+_activity = False       # 自上次 consume_activity() 以来是否弹出过
+
+
+def configure(show, duration):
+    """
+    Args:
+        show: 弹窗函数 show(volume, duration)，不能阻塞（通常为 display.show_volume_popup）
+        duration: 弹窗显示时长（秒）
+    """
+    global _show, _duration
+    with _lock:
+        _show = show
+        _duration = duration
+
+
+def report(channel, volume):
+    """
+    后端报告音量（线程安全）
+
+    Returns:
+        bool: 是否弹出（通道首次报告、音量未变或不是当前通道时不弹出）
+    """
+    global _visible_until, _activity
+    volume = max(0, min(100, int(volume)))
+    with _lock:
+        previous = _volumes.get(channel)
+        _volumes[channel] = volume
+        if previous is None or previous == volume or channel != _channel or _show is None:
+            return False
+        _visible_until = time.monotonic() + _duration
+        _activity = True
+        # 在锁内投递，多个线程同时报告时合成线程收到的顺序与这里一致
+        _show(volume, _duration)
+    metrics.inc("volume.popups")
+    # 屏保由主循环管理：唤醒它检查 consume_activity()
+    wakeup.notify()
+    return True
+
+
+def report_delta(channel, delta):
+    """后端报告相对变化；该通道的当前音量未知时忽略（等待下一次查询得到绝对值）"""
+    with _lock:
+        previous = _volumes.get(channel)
+    if previous is None:
+        return False
+    return report(channel, previous + delta)
+
+
+def track(channel, volume=None):
+    """
+    主循环每个 tick 调用：设置当前画面的音量通道（None 表示不弹出），
+    并把本次查询到的音量交给 report()；切换通道时只记录音量，不弹出。
+    切换到的通道若本次没有音量，丢弃该通道之前记录的值（可能已过时），
+    下一次取到的音量只作为基准，不会与过时的值比较而误弹。
+    """
+    global _channel
+    with _lock:
+        switched = channel != _channel
+        _channel = channel
+        if switched and channel is not None and (volume is None or volume < 0):
+            _volumes.pop(channel, None)
+        if channel is None or volume is None or volume < 0:
+            return False
+        if switched:
+            _volumes[channel] = max(0, min(100, int(volume)))
+            return False
+    return report(channel, volume)
+
+
+def is_visible():
+    return time.monotonic() < _visible_until
+
+
+def consume_activity():
+    """自上次调用以来是否弹出过（主循环据此唤醒屏保），调用后清除"""
+    global _activity
+    with _lock:
+        activity, _activity = _activity, False
+    return activity
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# resources/oled/wakeup.py
+#
+# 主循环唤醒通知（self-pipe）：后台事件源（LMS CLI、D-Bus、pactl 等线程）调用 notify()，
+# 向管道写入一个字节；主循环把 fileno() 注册到 selector 中，被唤醒后调用 drain()。
+
+import os
+import select
+
+_read_fd, _write_fd = os.pipe()
+os.set_blocking(_read_fd, False)
+os.set_blocking(_write_fd, False)
+
+
+def notify():
+    """通知主循环有状态变化（线程安全，可在任意线程调用）"""
+    try:
+        os.write(_write_fd, b"\0")
+    except BlockingIOError:
+        # 管道已满：主循环必然会被唤醒，无需再写
+        pass
+
+
+def fileno():
+    """供 selector 注册的可读 fd"""
+    return _read_fd
+
+
+def drain():
+    """清空管道中积压的通知"""
+    try:
+        while os.read(_read_fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def wait(timeout):
+    """
+    阻塞等待通知或超时（不使用事件循环时的简单用法）
+
+    Returns:
+        bool: True 表示被事件唤醒，False 表示超时
+    """
+    readable, _, _ = select.select([_read_fd], [], [], timeout)
+    drain()
+    return bool(readable)